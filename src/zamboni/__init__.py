@@ -2,10 +2,12 @@ from .db_con import DBConnector
 from .sql.table_creator import TableCreator
 from .api_caller import APICaller
 from .sql.sql_handler import SQLHandler
+from .exporter import Exporter
 
 __all__ = [
     "DBConnector",
     "TableCreator",
     "APICaller",
     "SQLHandler",
+    "Exporter",
 ]
@@ -1,17 +1,53 @@
 import requests
 import logging
+import itertools
+import time
+from functools import cache
+from pydantic import TypeAdapter
+from requests.adapters import HTTPAdapter
 from typing import Union, Dict, Any
 
+from zamboni.http_cache import ttl_for_record
+from zamboni.rate_limit import TokenBucket, RetryPolicy
 from zamboni.nhl_models import (
     GameScheduleResponse,
     PlayerResponse,
     StandingsResponse,
     RosterResponse,
+    LeanGameScheduleResponse,
+    LeanStandingsResponse,
+    LeanRosterResponse,
 )
 
 logger = logging.getLogger(__name__)
 
 
+# Models used for each record type at the "full" and "lean" validation levels
+full_models = {
+    "game": GameScheduleResponse,
+    "player": PlayerResponse,
+    "standings": StandingsResponse,
+    "roster": RosterResponse,
+}
+lean_models = {
+    "game": LeanGameScheduleResponse,
+    "player": PlayerResponse,
+    "standings": LeanStandingsResponse,
+    "roster": LeanRosterResponse,
+}
+validation_levels = ("full", "sampled", "lean")
+
+
+@cache
+def type_adapter(model):
+    """
+    Build the TypeAdapter for a model once and reuse it for every response
+
+    :param model: Pydantic model class
+    """
+    return TypeAdapter(model)
+
+
 class NHLAPIValidationError(Exception):
     """Custom exception for NHL API validation errors."""
 
@@ -23,54 +59,115 @@ class APICaller:
 
     url_base = "https://api-web.nhle.com/v1/"
 
-    def __init__(self):
+    def __init__(
+        self,
+        pool_size=10,
+        connect_timeout=5.0,
+        read_timeout=30.0,
+        keep_alive=True,
+        session=None,
+        cache=None,
+        rate_limiter=None,
+        retry_policy=None,
+        archive=None,
+        validation="full",
+        sample_rate=100,
+    ):
         """
-        Set URL variables and record type
+        Set URL variables and record type, and open a pooled HTTP session
 
-        :param record_type: The type of record to be requested
+        :param pool_size: Maximum number of connections kept open to the API host
+        :param connect_timeout: Seconds to wait when establishing a connection
+        :param read_timeout: Seconds to wait for the API to send a response
+        :param keep_alive: Reuse connections between requests if True
+        :param session: Existing requests.Session to use instead of creating one
+        :param cache: ResponseCache used to skip or revalidate repeated queries
+        :param rate_limiter: TokenBucket shared by all threads using this caller
+        :param retry_policy: RetryPolicy for timeouts, connection errors and 429/5xx
+        :param archive: RawArchive keeping a compressed copy of every downloaded response
+        :param validation: "full" validates every response against the complete models,
+            "lean" validates only the fields that are written out, and "sampled" fully
+            validates one in sample_rate responses and uses the lean models otherwise
+        :param sample_rate: Fully validate one in this many responses when sampling
         """
+        if validation not in validation_levels:
+            raise ValueError(f"Unknown validation level: {validation}")
         self.url_base = APICaller.url_base
-        self.url = None
-        self.record_type = None
+        self.timeout = (connect_timeout, read_timeout)
+        if session is None:
+            session = self._build_session(pool_size, keep_alive)
+        self.session = session
+        self.cache = cache
+        self.rate_limiter = rate_limiter if rate_limiter is not None else TokenBucket()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.archive = archive
+        self.validation = validation
+        self.sample_rate = sample_rate
+        self.response_counter = itertools.count()
+
+    @staticmethod
+    def _build_session(pool_size, keep_alive):
+        """
+        Create a requests.Session with a connection pool sized for the API host
+
+        :param pool_size: Maximum number of connections kept open to the API host
+        :param keep_alive: Reuse connections between requests if True
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+        return session
+
+    def close(self):
+        """
+        Close the HTTP session and release pooled connections
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def set_url_template(self, record_type):
         """
-        Append the relevant string to the base URL based on record type
+        Build the URL template for a record type by appending the relevant string to the base URL
+
+        Nothing is stored on the caller, so threads sharing it can query different
+        record types at once.
 
         :param record_type: The type of record to be requested
+        :returns: URL template with one {} per record ID
+        :raises ValueError: If no endpoint is associated with the record type
         """
-        self.record_type = record_type
         if record_type == "standings":
-            self.url = self.url_base + "standings/{}"
+            return self.url_base + "standings/{}"
         elif record_type == "player":
-            self.url = self.url_base + "player/{}/landing"
+            return self.url_base + "player/{}/landing"
         elif record_type == "game":
-            self.url = self.url_base + "schedule/{}"
+            return self.url_base + "schedule/{}"
         elif record_type == "roster":
-            self.url = self.url_base + "roster/{}/{}{}"
+            return self.url_base + "roster/{}/{}{}"
         elif record_type == "schedule":
-            self.url = self.url_base + "schedule-calendar/{}"
-        else:
-            print(f"ERROR: no endpoint associated with the record type {record_type}")
+            return self.url_base + "schedule-calendar/{}"
+        raise ValueError(f"No endpoint associated with the record type {record_type}")
 
     def query_url(self, record_ids=[], record_type=None):
         """
         Return the URL that would be queried for the given record IDs.
 
         :param record_ids: List of values to fill to URL
-        :param record_type: Type of record being queried (game, player, standings, roster)
-        :returns: Raw JSON response from NHL API
-        :raises ValueError: If network error occurs
+        :param record_type: Type of record being queried (game, player, standings, roster),
+            or None to join the record IDs onto the base URL
+        :returns: URL to query
         """
         if record_type:
-            self.set_url_template(record_type)
-            url = self.url.format(*record_ids)
-        elif self.record_type:
-            url = self.url.format(*record_ids)
-        else:
-            ids_str = [str(record_id) for record_id in record_ids]
-            url = self.url_base + "/".join(ids_str)
-        return url
+            return self.set_url_template(record_type).format(*record_ids)
+        ids_str = [str(record_id) for record_id in record_ids]
+        return self.url_base + "/".join(ids_str)
 
     def query(self, record_ids, record_type=None, throw_error=True):
         """
@@ -83,21 +180,11 @@ class APICaller:
         :raises NHLAPIValidationError: If API response fails Pydantic validation
         :raises ValueError: If network error occurs and throw_error is True
         """
-        # if record_type:
-        #    self.set_url_template(record_type)
-        #    url = self.url.format(*record_ids)
-        # elif self.record_type:
-        #    url = self.url.format(*record_ids)
-        # else:
-        #    ids_str = [str(record_id) for record_id in record_ids]
-        #    url = self.url_base + '/'.join(ids_str)
         url = self.query_url(record_ids, record_type=record_type)
 
         logger.debug(f"Attempting to query URL: {url}")
         try:
-            api_out = requests.get(url)
-            api_out.raise_for_status()  # Raise an HTTPError for bad responses
-            json_data = api_out.json()
+            json_data = self._fetch_json(url, record_type, record_ids)
             logger.debug(f"Received JSON from API call: {json_data}")
         except requests.exceptions.HTTPError as http_err:
             if throw_error:
@@ -147,6 +234,90 @@ class APICaller:
                 )
                 return None
 
+    def _fetch_json(self, url, record_type=None, record_ids=()):
+        """
+        Get the decoded JSON for a URL, using the response cache if configured.
+
+        Fresh cache entries are returned without a request. Stale entries are
+        revalidated with their ETag/Last-Modified headers.
+
+        :param url: URL to query
+        :param record_type: Type of record being queried, used to pick the TTL
+        :param record_ids: Values used to fill the URL, used to pick the TTL
+        :returns: Decoded JSON body
+        :raises requests.exceptions.RequestException: If the request fails
+        """
+        entry = None
+        headers = {}
+        if self.cache is not None:
+            entry = self.cache.get(url)
+            if entry is not None:
+                if self.cache.is_fresh(entry):
+                    logger.debug(f"Using cached response for {url}")
+                    if self.archive is not None and not self.archive.has(
+                        record_type, record_ids
+                    ):
+                        self.archive.put(record_type, record_ids, entry["body"])
+                    return entry["body"]
+                headers = self.cache.revalidation_headers(entry)
+
+        api_out = self._get_with_retry(url, headers)
+        if entry is not None and api_out.status_code == 304:
+            logger.debug(f"Cached response for {url} is still valid")
+            self.cache.refresh(entry, ttl_for_record(record_type, record_ids))
+            return entry["body"]
+        api_out.raise_for_status()  # Raise an HTTPError for bad responses
+        json_data = api_out.json()
+        if self.archive is not None:
+            self.archive.put(record_type, record_ids, json_data)
+        if self.cache is not None:
+            ttl = ttl_for_record(record_type, record_ids)
+            self.cache.put(url, json_data, api_out.headers, ttl)
+        return json_data
+
+    def _get_with_retry(self, url, headers=None):
+        """
+        Send a rate-limited GET request, retrying transient failures.
+
+        Timeouts, connection errors and retryable status codes are retried with
+        exponential backoff. A Retry-After header on a 429 pauses every thread
+        sharing the rate limiter.
+
+        :param url: URL to query
+        :param headers: Extra request headers
+        :returns: Final HTTP response
+        :raises requests.exceptions.RequestException: If the last attempt fails
+        """
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            try:
+                api_out = self.session.get(url, timeout=self.timeout, headers=headers)
+            except (
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ) as err:
+                if not self.retry_policy.should_retry(attempt):
+                    raise
+                delay = self.retry_policy.backoff(attempt)
+                logger.info(f"Retrying {url} in {delay:.1f}s after error: {err}")
+            else:
+                if (
+                    api_out.status_code not in RetryPolicy.retry_statuses
+                    or not self.retry_policy.should_retry(attempt)
+                ):
+                    return api_out
+                delay = self.retry_policy.retry_after(api_out)
+                if delay is None:
+                    delay = self.retry_policy.backoff(attempt)
+                if api_out.status_code == 429:
+                    self.rate_limiter.pause(delay)
+                logger.info(
+                    f"Retrying {url} in {delay:.1f}s after status {api_out.status_code}"
+                )
+            time.sleep(delay)
+            attempt += 1
+
     def _validate_response(
         self, json_data: Dict[str, Any], record_type: str
     ) -> Union[
@@ -154,6 +325,9 @@ class APICaller:
         PlayerResponse,
         StandingsResponse,
         RosterResponse,
+        LeanGameScheduleResponse,
+        LeanStandingsResponse,
+        LeanRosterResponse,
         Dict[str, Any],
     ]:
         """
@@ -164,15 +338,17 @@ class APICaller:
         :returns: Validated Pydantic model instance
         :raises ValidationError: If JSON fails Pydantic validation
         """
-        if record_type == "game":
-            return GameScheduleResponse(**json_data)
-        elif record_type == "player":
-            return PlayerResponse(**json_data)
-        elif record_type == "standings":
-            return StandingsResponse(**json_data)
-        elif record_type == "roster":
-            return RosterResponse(**json_data)
-        else:
+        if record_type not in full_models:
             # Return raw dict if record type is not recognized
             logger.warning(f"Unknown record type: {record_type}, returning raw JSON")
             return json_data
+
+        if self.validation == "full":
+            model = full_models[record_type]
+        elif self.validation == "lean":
+            model = lean_models[record_type]
+        elif next(self.response_counter) % self.sample_rate == 0:
+            model = full_models[record_type]
+        else:
+            model = lean_models[record_type]
+        return type_adapter(model).validate_python(json_data)
@@ -1,11 +1,18 @@
 from zamboni import APICaller
 from zamboni.api_caller import NHLAPIValidationError
+from zamboni.archive import RawArchive, ReplayCaller
+from zamboni.checkpoint import GamesCheckpoint
+from zamboni.download_engine import fetch_in_order
+from zamboni.http_cache import ResponseCache
+from zamboni.landing import ParquetGameWriter, landing_path, last_date_played
+from zamboni.rate_limit import TokenBucket
 from zamboni.utils import zero_pad
 from datetime import datetime, date, timedelta
 import copy
 import logging
 import os
 import json
+import shutil
 
 logger = logging.getLogger(__name__)
 today_date = date.today()
@@ -32,45 +39,110 @@ def query_date_games(caller, in_date):
         return None
 
 
-def write_game_data(f, game, completed=True):
+def date_range(start_date, end_date, step=timedelta(days=1)):
     """
-    Write game data to file using Game Pydantic model.
+    List dates from start_date up to but not including end_date.
+
+    :param start_date: First date in range
+    :param end_date: Date at which to stop
+    :param step: Distance between consecutive dates
+    :returns: List of dates
+    """
+    dates = []
+    range_date = start_date
+    while range_date < end_date:
+        dates.append(range_date)
+        range_date += step
+    return dates
+
+
+def schedule_days(responses, end_date, stride):
+    """
+    Yield each GameDay in the schedule responses exactly once and in date order.
+
+    The schedule endpoint returns the week starting at the queried date, so
+    only days before the next queried date (and before end_date) are kept.
+
+    :param responses: Iterable of (query date, GameScheduleResponse) tuples
+    :param end_date: Date at which to stop
+    :param stride: Distance between consecutive query dates
+    :returns: Generator of (query date, GameDay) tuples
+    """
+    for query_date, response in responses:
+        if not response:
+            yield query_date, None
+            continue
+        window_end = min(query_date + stride, end_date)
+        for day in response.gameWeek:
+            day_date = date.fromisoformat(day.date)
+            if query_date <= day_date < window_end:
+                yield query_date, day
+
+
+def game_fields(game):
+    """
+    Extract the fields written for each game from the Game Pydantic model.
 
-    :param f: File object to write to
     :param game: Game Pydantic model
-    :param completed: Whether game is completed
+    :returns: Dict of typed fields, or None if the game could not be read
     """
     try:
-        api_id = game.id
-        season_id = game.season
         datetime_utc = datetime.fromisoformat(game.startTimeUTC.replace("Z", "+00:00"))
         timezone_offset = game.venueUTCOffset
         hour_offset, minute_offset = timezone_offset.split(":")
         offset = timedelta(hours=int(hour_offset), minutes=int(minute_offset))
         datetime_local = datetime_utc + offset
-        day_of_yr = datetime_local.timetuple().tm_yday
-        year = datetime_local.year
-        home_id = game.homeTeam.id
-        home_abbrev = game.homeTeam.abbrev
-        away_id = game.awayTeam.id
-        away_abbrev = game.awayTeam.abbrev
-        type_id = game.gameType
         home_goals = getattr(game.homeTeam, "score", None)
         away_goals = getattr(game.awayTeam, "score", None)
         game_outcome = getattr(game, "gameOutcome", None)
+        last_period_type = None
         if game_outcome:
             last_period_type = getattr(game.gameOutcome, "lastPeriodType", None)
         if home_goals is None or away_goals is None or game_outcome is None or last_period_type is None:
-            home_goals = ""
-            away_goals = ""
-            last_period_type = ""
+            home_goals = None
+            away_goals = None
+            last_period_type = None
+        fields = {
+            "apiID": game.id,
+            "seasonID": game.season,
+            "homeTeamApiID": game.homeTeam.id,
+            "homeAbbrev": game.homeTeam.abbrev,
+            "awayTeamApiID": game.awayTeam.id,
+            "awayAbbrev": game.awayTeam.abbrev,
+            "datePlayed": datetime_local.date(),
+            "dayOfYrPlayed": datetime_local.timetuple().tm_yday,
+            "yrPlayed": datetime_local.year,
+            "timePlayed": datetime_local.time().replace(tzinfo=None),
+            "homeTeamGoals": home_goals,
+            "awayTeamGoals": away_goals,
+            "gameTypeID": game.gameType,
+            "lastPeriodType": last_period_type,
+        }
     except (AttributeError, ValueError) as e:
         logger.warning(f"Error extracting game data: {e}")
-        return
+        return None
+    return fields
+
 
-    game_string = f"{api_id}, {season_id}, {home_id}, {home_abbrev}, {away_id}, {away_abbrev}, {datetime_local.date()}, {day_of_yr}, {year}, {datetime_local.time()}, {home_goals}, {away_goals}, {type_id}, {last_period_type}\n"
+def write_game_data(f, game, completed=True):
+    """
+    Write game data to file using Game Pydantic model.
+
+    :param f: File object to write to
+    :param game: Game Pydantic model
+    :param completed: Whether game is completed
+    """
+    fields = game_fields(game)
+    if fields is None:
+        return False
+    csv_fields = {
+        key: "" if value is None else value for key, value in fields.items()
+    }
+
+    game_string = ", ".join(str(value) for value in csv_fields.values()) + "\n"
     logger.debug(f"About to write game string: {game_string}")
     f.write(game_string)
+    return True
 
 
 def write_game_data_all(f, game, first_line=False):
@@ -107,6 +179,18 @@ def write_game_data_all(f, game, first_line=False):
         f.write(values + "\n")
     except Exception as e:
         logger.error(f"Error flattening or writing game data: {e}")
+        return False
+    return True
+
+
+def default_end_date():
+    """
+    End of the latest season, used when downloading the full schedule.
+    """
+    current_year = today_date.year
+    if today_date > date(current_year, 5, 1):
+        return date(current_year + 1, 5, 1)
+    return date(current_year, 5, 1)
 
 
 def download_games(
@@ -115,70 +199,94 @@ def download_games(
         out_path_completed="data/games_completed.txt",  
         out_path_today="data/games_today.txt",  
         out_path_all="data/games_all.txt",  
-        write_all_fields=False):
+        write_all_fields=False,
+        caller=None,
+        concurrency=8,
+        week_stride=True,
+        landing_format="txt"):
     """
     Download NHL game data from API and write to file.
 
     :param start_date: Date to start downloading from
     :param out_path_completed: Path to output file with completed games
     :param all: If True, write all fields; if False, write subset
+    :param caller: APICaller whose session is shared across downloads
+    :param concurrency: Number of dates queried in parallel
+    :param week_stride: Query once per week and use every day in the response
+    :param landing_format: "txt" for CSV text files or "parquet" for Parquet datasets
     """
-    caller = APICaller()
+    if caller is None:
+        caller = APICaller()
+    if landing_format == "parquet":
+        download_games_parquet(
+            start_date,
+            end_date,
+            landing_path(out_path_completed),
+            landing_path(out_path_today),
+            landing_path(out_path_all),
+            caller=caller,
+            concurrency=concurrency,
+            week_stride=week_stride,
+        )
+        return
+
+    def query_date(in_date):
+        return query_date_games(caller, in_date)
 
     # Date chosen to capture preseason
     sched_date = copy.deepcopy(start_date)
     day_delta = timedelta(days=1)
+    stride = timedelta(days=7) if week_stride else day_delta
 
     # Download up to previous day and load to main file
-    with open(out_path_completed, "a+") as f:
-        f.seek(0)
-        lines = f.readlines()
-        first_line = len(lines) == 0
-
+    checkpoint = GamesCheckpoint(out_path_completed)
+    with open(out_path_completed, "a") as f:
         # Start at date of latest game in file
-        if len(lines) > 0:
-            for line in lines:
-                pass
-            last_line = line
-            game_date = last_line.split(",")[6].strip()
-            last_date = datetime.fromisoformat(game_date).date()
+        last_date = checkpoint.load()
+        first_line = checkpoint.offset == 0
+        if last_date:
             sched_date = last_date + day_delta
             logger.info(f"Starting download at date {sched_date}")
         else:
             logger.info("No games downloaded, starting at the beginning..")
 
-        while sched_date < today_date:
-            response = query_date_games(caller, sched_date)
-            if not response:
-                sched_date += day_delta
-                continue
+        dates = date_range(sched_date, today_date, stride)
+        responses = fetch_in_order(query_date, dates, concurrency)
+        for sched_date, day in schedule_days(responses, today_date, stride):
+            if not day:
+                # Stop so that the next run resumes here instead of leaving a gap
+                logger.error(f"Failed to download games for {sched_date}, stopping")
+                break
 
-            day = response.gameWeek[0]
             logger.debug(f"Day in response: {day}")
             if not day.games:
                 logger.info(f"No games found for date {day.date}")
-                sched_date += day_delta
+                # Past days without games never need to be queried again
+                checkpoint.advance(f, day.date, 0)
                 continue
 
+            new_rows = 0
             for game in day.games:
                 logger.debug(f"Game in response: {game}")
                 if write_all_fields:
                     # Convert Pydantic model to dict for flattening
                     game_dict = game.model_dump()
-                    write_game_data_all(f, game_dict, first_line)
+                    new_rows += write_game_data_all(f, game_dict, first_line)
                     first_line = False
                 else:
-                    write_game_data(f, game)
-            sched_date += day_delta
+                    new_rows += write_game_data(f, game)
+            checkpoint.advance(f, day.date, new_rows)
 
     # Download current day and load into separate file
     with open(out_path_today, "w") as f:
         response = query_date_games(caller, today_date)
         if not response:
-            logger.info(f"No games found for date {today_date}")
-            return
-
-        for day in response.gameWeek:
+            # Carry on to the full schedule rather than returning early
+            logger.error(f"Failed to download games for {today_date}")
+            days = []
+        else:
+            days = response.gameWeek
+        for day in days:
             if day.date != str(today_date):
                 continue
             if not day.games:
@@ -188,119 +296,331 @@ def download_games(
                 write_game_data(f, game, completed=False)
 
     if not end_date:
-        # Download full schedule through the end of latest season
-        current_year = today_date.year
-        if today_date > date(current_year, 5, 1):
-            end_date = date(current_year + 1, 5, 1)
-        else:
-            end_date = date(current_year, 5, 1)
+        end_date = default_end_date()
     sched_date = start_date
 
-    with open(out_path_all, "a+") as f:
-        f.seek(0)
-        lines = f.readlines()
-        first_line = len(lines) == 0
-
+    checkpoint = GamesCheckpoint(out_path_all)
+    with open(out_path_all, "a") as f:
         # Start at date of latest game in file
-        if len(lines) > 0:
-            for line in lines:
-                pass
-            last_line = line
-            game_date = last_line.split(",")[6].strip()
-            last_date = datetime.fromisoformat(game_date).date()
+        last_date = checkpoint.load()
+        if last_date:
             sched_date = last_date + day_delta
             logger.info(f"Starting download at date {sched_date}")
         else:
             logger.info("No games downloaded, starting at the beginning..")
 
-        while sched_date < end_date:
-            response = query_date_games(caller, sched_date)
-            if not response:
-                logger.info(f"No games found for date {today_date}")
-                return
+        dates = date_range(sched_date, end_date, stride)
+        responses = fetch_in_order(query_date, dates, concurrency)
+        for sched_date, day in schedule_days(responses, end_date, stride):
+            if not day:
+                # Stop so that the next run resumes here instead of leaving a gap
+                logger.error(f"Failed to download games for {sched_date}, stopping")
+                break
+
+            new_rows = 0
+            for game in day.games:
+                new_rows += write_game_data(f, game, completed=False)
+            if day.games:
+                checkpoint.advance(f, day.date, new_rows)
+
+
+def download_games_parquet(
+    start_date,
+    end_date,
+    completed_dir="data/games_completed",
+    today_dir="data/games_today",
+    all_dir="data/games_all",
+    caller=None,
+    concurrency=8,
+    week_stride=True,
+):
+    """
+    Download NHL game data from API and write Parquet datasets partitioned by season.
+
+    Mirrors download_games, writing typed Arrow record batches in place of text lines.
+
+    :param start_date: Date to start downloading from
+    :param end_date: Date to stop downloading the full schedule at
+    :param completed_dir: Dataset directory for completed games
+    :param today_dir: Dataset directory for today's games, replaced on every run
+    :param all_dir: Dataset directory for the full schedule
+    :param caller: APICaller whose session is shared across downloads
+    :param concurrency: Number of dates queried in parallel
+    :param week_stride: Query once per week and use every day in the response
+    """
+    if caller is None:
+        caller = APICaller()
+
+    def query_date(in_date):
+        return query_date_games(caller, in_date)
 
-            for day in response.gameWeek:
+    day_delta = timedelta(days=1)
+    stride = timedelta(days=7) if week_stride else day_delta
+    if not end_date:
+        end_date = default_end_date()
+
+    for out_dir, stop_date in ((completed_dir, today_date), (all_dir, end_date)):
+        sched_date = start_date
+        last_date = last_date_played(out_dir)
+        if last_date:
+            sched_date = last_date + day_delta
+            logger.info(f"Starting download to {out_dir} at date {sched_date}")
+        dates = date_range(sched_date, stop_date, stride)
+        responses = fetch_in_order(query_date, dates, concurrency)
+        with ParquetGameWriter(out_dir) as writer:
+            for sched_date, day in schedule_days(responses, stop_date, stride):
+                if not day:
+                    # Stop so that the next run resumes here instead of leaving a gap
+                    logger.error(f"Failed to download games for {sched_date}, stopping")
+                    break
                 for game in day.games:
-                    write_game_data(f, game, completed=False)
+                    fields = game_fields(game)
+                    if fields is not None:
+                        writer.append(fields)
+
+    if os.path.isdir(today_dir):
+        shutil.rmtree(today_dir)
+    response = query_date_games(caller, today_date)
+    if not response:
+        logger.error(f"Failed to download games for {today_date}")
+        return
+    with ParquetGameWriter(today_dir) as writer:
+        for day in response.gameWeek:
+            if day.date != str(today_date):
+                continue
+            for game in day.games:
+                fields = game_fields(game)
+                if fields is not None:
+                    writer.append(fields)
+
+
+def read_team_abbrevs(teams_path="data/teams.txt"):
+    """
+    Read team abbreviations from the teams file written by download_teams.
+
+    :param teams_path: Path to teams file
+    :returns: List of team abbreviations
+    """
+    with open(teams_path, "r") as f_teams:
+        team_lines = f_teams.readlines()
+        team_lines = [line.split(",") for line in team_lines]
+        team_abbrevs = [line[1].strip() for line in team_lines]
+    return team_abbrevs
+
+
+def season_start_years(start_year):
+    """
+    List the starting years of seasons from start_year through the current season.
+
+    :param start_year: Starting year of the first season
+    :returns: List of years
+    """
+    # Seasons start in the fall, so before July the current season began last year
+    current_start_year = today_date.year if today_date.month >= 7 else today_date.year - 1
+    return list(range(start_year, current_start_year + 1))
+
+
+def fetch_rosters(caller, pairs, concurrency=8):
+    """
+    Query rosters for (team abbreviation, season start year) pairs concurrently.
+
+    :param caller: APICaller instance
+    :param pairs: Iterable of (team abbreviation, season start year) tuples
+    :param concurrency: Number of rosters queried in parallel
+    :returns: Generator of ((team, start year), RosterResponse or None) in pair order
+    """
+
+    def query_roster(pair):
+        team, start_year = pair
+        logger.debug(f"Querying API for {team} {start_year}-{start_year + 1} roster")
+        return caller.query(
+            [team, start_year, start_year + 1], "roster", throw_error=False
+        )
+
+    return fetch_in_order(query_roster, pairs, concurrency)
+
+
+def roster_players(roster):
+    """
+    All players in a roster response.
+
+    :param roster: RosterResponse model
+    :returns: List of RosterPlayer models
+    """
+    return roster.forwards + roster.defensemen + roster.goalies
+
 
-            sched_date += day_delta
+def discover_player_ids(caller, team_abbrevs, start_year, concurrency=8):
+    """
+    Collect the IDs of every player on a roster since start_year.
+
+    :param caller: APICaller instance
+    :param team_abbrevs: Team abbreviations to query rosters for
+    :param start_year: Starting year of the first season
+    :param concurrency: Number of rosters queried in parallel
+    :returns: Sorted list of player API IDs
+    """
+    pairs = [
+        (team, year) for year in season_start_years(start_year) for team in team_abbrevs
+    ]
+    player_ids = set()
+    for _, roster in fetch_rosters(caller, pairs, concurrency):
+        if roster is None:
+            continue
+        player_ids.update(player.id for player in roster_players(roster))
+    logger.info(f"Found {len(player_ids)} players on {len(pairs)} rosters")
+    return sorted(player_ids)
+
+
+def read_downloaded_ids(path):
+    """
+    Read the IDs in the first column of a previously written file.
+
+    :param path: Path to file
+    :returns: Set of IDs as strings, empty if the file does not exist
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r") as f:
+        return {line.split(",")[0].strip() for line in f if line.strip()}
+
+
+def download_players(
+    out_path="data/players.txt",
+    caller=None,
+    player_ids=None,
+    start_year=2024,
+    teams_path="data/teams.txt",
+    concurrency=8,
+):
+    """
+    Download player information from NHL API player endpoint.
+
+    Player IDs are discovered from team rosters unless given explicitly.
+    Players already in out_path are skipped, so an interrupted run resumes.
+
+    :param out_path: Path to output file
+    :param caller: APICaller whose session is shared across downloads
+    :param player_ids: Player API IDs to download instead of discovering them
+    :param start_year: Starting year of the first season whose rosters are used
+    :param teams_path: Path to teams file written by download_teams
+    :param concurrency: Number of players queried in parallel
+    """
+    if caller is None:
+        caller = APICaller()
 
+    if player_ids is None:
+        team_abbrevs = read_team_abbrevs(teams_path)
+        player_ids = discover_player_ids(caller, team_abbrevs, start_year, concurrency)
 
-def download_players(out_path="data/players.txt"):
-    caller = APICaller()
+    downloaded_ids = read_downloaded_ids(out_path)
+    player_ids = [api_id for api_id in player_ids if str(api_id) not in downloaded_ids]
+    logger.info(f"Downloading {len(player_ids)} players")
 
-    # api_id = 8475104
-    api_id = 8440000
-    # Less than 2500 players in the league
-    # end_id = 8477604
-    end_id = 8500000
-    with open("data/players.txt", "w") as f:
-        while api_id < end_id:
-            player = caller.query([api_id], "player", throw_error=False)
+    def query_player(api_id):
+        return caller.query([api_id], "player", throw_error=False)
+
+    with open(out_path, "a") as f:
+        for api_id, player in fetch_in_order(query_player, player_ids, concurrency):
             if not player:
-                api_id += 1
                 continue
-            first_name = player["firstName"]["default"]
-            last_name = player["lastName"]["default"]
+            first_name = player.firstName.default
+            last_name = player.lastName.default
             full_name = f"{first_name} {last_name}"
-            if "sweaterNumber" not in player.keys():
+            if player.sweaterNumber is None:
                 number = "-1"
             else:
-                number = str(player["sweaterNumber"])
-            if "position" not in player.keys():
+                number = str(player.sweaterNumber)
+            if player.position is None:
                 position = "U"
             else:
-                position = player["position"]
+                position = player.position
             write_string = ",".join(
                 [str(api_id), full_name, first_name, last_name, number, position]
             )
             f.write(write_string + "\n")
-            api_id += 1
-
 
-def download_rosters(start_year=2024, out_path="data/rosterEntries.txt"):
-    from datetime import datetime
 
-    caller = APICaller()
-
-    with open("data/teams.txt", "r") as f_teams:
-        team_lines = f_teams.readlines()
-        team_lines = [line.split(",") for line in team_lines]
-        team_abbrevs = [line[1].strip() for line in team_lines]
+def download_rosters(
+    start_year=2024,
+    out_path="data/rosterEntries.txt",
+    caller=None,
+    teams_path="data/teams.txt",
+    concurrency=8,
+    manifest_path=None,
+):
+    """
+    Download roster entries for every team and season from NHL API roster endpoint.
 
-    end_year = start_year + 1
+    Rosters are queried concurrently and written in season then team order.
+    Finished (team, season) pairs are listed in a manifest so that a rerun
+    skips them, and rows already in out_path are never written twice.
 
-    with open("data/rosterEntries.txt", "a") as roster_f:
-        while start_year < datetime.now().year:
-            end_year = start_year + 1
-            logger.info(f"Querying API for {start_year}-{end_year} season rosters")
-            for team in team_abbrevs:
-                api_ids = [team, start_year, end_year]
-                out = caller.query(api_ids, "roster", throw_error=False)
-                if out is None:
+    :param start_year: Starting year of the first season
+    :param out_path: Path to output file
+    :param caller: APICaller whose session is shared across downloads
+    :param teams_path: Path to teams file written by download_teams
+    :param concurrency: Number of rosters queried in parallel
+    :param manifest_path: Path to manifest of completed pairs, defaults next to out_path
+    """
+    if caller is None:
+        caller = APICaller()
+    if manifest_path is None:
+        manifest_path = f"{out_path}.manifest"
+
+    team_abbrevs = read_team_abbrevs(teams_path)
+    seasons = season_start_years(start_year)
+    # The current season's rosters still change, so it is never marked complete
+    current_start_year = seasons[-1] if seasons else None
+
+    completed_pairs = read_downloaded_ids(manifest_path)
+    pairs = [
+        (team, year)
+        for year in seasons
+        for team in team_abbrevs
+        if f"{team}/{year}" not in completed_pairs
+    ]
+    logger.info(f"Downloading {len(pairs)} rosters")
+
+    written_rows = set()
+    if os.path.exists(out_path):
+        with open(out_path, "r") as roster_f:
+            for line in roster_f:
+                written_rows.add(tuple(entry.strip() for entry in line.split(",")[:3]))
+
+    with open(out_path, "a") as roster_f, open(manifest_path, "a") as manifest_f:
+        for (team, year), roster in fetch_rosters(caller, pairs, concurrency):
+            if roster is None:
+                logger.warning(f"Failed to get {team} {year}-{year + 1} roster")
+                continue
+            for player in roster_players(roster):
+                first_name = player.firstName.default
+                last_name = player.lastName.default
+                api_id = player.id
+                row_key = (str(api_id), team, str(year))
+                if row_key in written_rows:
                     continue
-                forwards = out["forwards"]
-                defensemen = out["defensemen"]
-                goalies = out["goalies"]
-                players = forwards + defensemen + goalies
-                for player in players:
-                    first_name = player["firstName"]["default"]
-                    last_name = player["lastName"]["default"]
-                    api_id = player["id"]
-                    entry_str = f"{api_id}, {team}, {start_year}, {first_name}, {last_name}, {start_year}, {end_year}\n"
-                    roster_f.write(entry_str)
-            start_year += 1
+                written_rows.add(row_key)
+                entry_str = f"{api_id}, {team}, {year}, {first_name}, {last_name}, {year}, {year + 1}\n"
+                roster_f.write(entry_str)
+            if year != current_start_year:
+                # Rows are flushed before the pair is recorded as complete
+                roster_f.flush()
+                manifest_f.write(f"{team}/{year}\n")
+                manifest_f.flush()
 
 
-def download_teams(start_year=2024, out_path="data/teams.txt"):
+def download_teams(start_year=2024, out_path="data/teams.txt", caller=None):
     """
     Download team information from NHL API standings endpoint.
 
     :param start_year: Year to start downloading from
     :param out_path: Path to output file
+    :param caller: APICaller whose session is shared across downloads
     """
 
-    caller = APICaller()
+    if caller is None:
+        caller = APICaller()
     query_year = start_year
     cur_year = today_date.year
     teams_to_write = set()
@@ -362,18 +682,54 @@ def download_seasons(start_year, out_path="data/seasons.txt"):
             i += 1
 
 
-def main(config, start_date, end_date):
+def make_caller(config, replay=False):
+    """
+    Build the APICaller shared by every download from the data config.
+
+    :param config: Data config
+    :param replay: Answer queries from the raw archive instead of the network
+    """
+    download_dir = config["dir"]
+    archive = None
+    if replay or config.get("archive_raw", False):
+        archive = RawArchive(config.get("raw_archive_dir", f"{download_dir}/raw"))
+    if replay:
+        logger.info(f"Replaying API responses from {archive.archive_dir}")
+        return ReplayCaller(archive, **config.get("api", {}))
+
+    cache = None
+    if config.get("use_api_cache", True):
+        cache = ResponseCache(config.get("api_cache_dir", f"{download_dir}/api_cache"))
+    rate_limiter = TokenBucket(rate=config.get("requests_per_second", 10.0))
+    return APICaller(
+        cache=cache,
+        rate_limiter=rate_limiter,
+        archive=archive,
+        **config.get("api", {}),
+    )
+
+
+def main(config, start_date, end_date, replay=False):
     download_dir = config["dir"]
     if not os.path.isdir(download_dir):
         os.mkdir(download_dir)
     download_seasons(start_year=start_date.year, out_path=f"{download_dir}/seasons.txt")
-    download_teams(start_year=start_date.year, out_path=f"{download_dir}/teams.txt")
-    download_games(start_date=start_date, 
-                    end_date=end_date,
-                    out_path_completed=config["completed_file"]["local"],
-                    out_path_today=config["today_file"]["local"],
-                    out_path_all=config["all_file"]["local"],
-                    )
+    # One pooled session is shared by every download so connections are reused
+    with make_caller(config, replay=replay) as caller:
+        download_teams(
+            start_year=start_date.year,
+            out_path=f"{download_dir}/teams.txt",
+            caller=caller,
+        )
+        download_games(start_date=start_date, 
+                        end_date=end_date,
+                        out_path_completed=config["completed_file"]["local"],
+                        out_path_today=config["today_file"]["local"],
+                        out_path_all=config["all_file"]["local"],
+                        caller=caller,
+                        concurrency=config.get("concurrency", 8),
+                        landing_format=config.get("landing_format", "txt"),
+                        )
     # download_players()
     # download_rosters(start_year=start_year)
 
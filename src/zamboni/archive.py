@@ -0,0 +1,142 @@
+import gzip
+import json
+import logging
+import os
+import tempfile
+from datetime import date, timedelta
+
+import requests
+
+from zamboni.api_caller import APICaller
+
+logger = logging.getLogger(__name__)
+
+
+class ArchiveMissError(requests.exceptions.RequestException):
+    """Raised in replay mode when a response was never archived."""
+
+
+class RawArchive:
+    """Gzip-compressed raw API responses keyed by record type and IDs"""
+
+    def __init__(self, archive_dir="data/raw"):
+        """
+        Store location of archive
+
+        :param archive_dir: Directory holding one subdirectory per record type
+        """
+        self.archive_dir = archive_dir
+
+    def path(self, record_type, record_ids):
+        """
+        Path of the archived response, e.g. data/raw/game/2025-01-24.json.gz
+
+        :param record_type: Type of record (game, player, standings, roster)
+        :param record_ids: Values used to fill the URL
+        """
+        key = "_".join(str(record_id) for record_id in record_ids)
+        return os.path.join(self.archive_dir, str(record_type), f"{key}.json.gz")
+
+    def has(self, record_type, record_ids):
+        """
+        Check whether a response has been archived
+
+        :param record_type: Type of record (game, player, standings, roster)
+        :param record_ids: Values used to fill the URL
+        """
+        return os.path.exists(self.path(record_type, record_ids))
+
+    def put(self, record_type, record_ids, body):
+        """
+        Store a raw JSON response, replacing any earlier copy. Each day of a
+        schedule week is also stored under its own date, since the weeks that
+        get queried depend on where a download resumed.
+
+        :param record_type: Type of record (game, player, standings, roster)
+        :param record_ids: Values used to fill the URL
+        :param body: Decoded JSON body
+        """
+        if record_type == "game" and isinstance(body, dict):
+            for day in body.get("gameWeek") or []:
+                if isinstance(day, dict) and "date" in day:
+                    self.write("game_day", [day["date"]], day)
+        self.write(record_type, record_ids, body)
+
+    def write(self, record_type, record_ids, body):
+        """
+        Write one JSON body atomically
+
+        :param record_type: Type of record, or game_day for a single schedule day
+        :param record_ids: Values used to fill the URL
+        :param body: Decoded JSON body
+        """
+        path = self.path(record_type, record_ids)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f, gzip.open(f, "wt", encoding="utf-8") as gz:
+            json.dump(body, gz)
+        os.replace(tmp_path, path)
+
+    def get(self, record_type, record_ids):
+        """
+        Read an archived response
+
+        :param record_type: Type of record (game, player, standings, roster)
+        :param record_ids: Values used to fill the URL
+        :returns: Decoded JSON body or None if it was never archived
+        """
+        path = self.path(record_type, record_ids)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def schedule_week(self, week_start):
+        """
+        Rebuild the schedule response for the week starting at a date from the
+        days archived by any earlier query
+
+        :param week_start: First date of the week, as a date or ISO string
+        :returns: Schedule JSON body or None if no day of the week was archived
+        :raises ArchiveMissError: If only some days of the week were archived
+        """
+        week_start = date.fromisoformat(str(week_start))
+        week = [week_start + timedelta(days=offset) for offset in range(7)]
+        days = {day: self.get("game_day", [day]) for day in week}
+        missing = [str(day) for day, body in days.items() if body is None]
+        if len(missing) == len(week):
+            return None
+        if missing:
+            # Replaying a partial week would leave gaps the checkpoint then skips
+            raise ArchiveMissError(
+                f"Week starting {week_start} is missing archived days {', '.join(missing)}"
+            )
+        return {
+            "nextStartDate": str(week_start + timedelta(days=7)),
+            "previousStartDate": str(week_start - timedelta(days=7)),
+            "gameWeek": list(days.values()),
+        }
+
+
+class ReplayCaller(APICaller):
+    """APICaller that answers every query from a RawArchive without network access"""
+
+    def __init__(self, archive, **kwargs):
+        """
+        Store archive to replay
+
+        :param archive: RawArchive filled by an earlier download
+        :param kwargs: Other APICaller arguments, e.g. validation
+        """
+        super().__init__(**kwargs)
+        self.archive = archive
+
+    def _fetch_json(self, url, record_type=None, record_ids=()):
+        body = self.archive.get(record_type, record_ids)
+        if body is None and record_type == "game" and record_ids:
+            body = self.archive.schedule_week(record_ids[0])
+        if body is None:
+            raise ArchiveMissError(f"No archived response for {url}")
+        logger.debug(f"Replaying archived response for {url}")
+        return body
@@ -82,11 +82,7 @@ def main():
             [predicter.predict(game) for game in zamboni_data.data.itertuples()]
         )
         labels = np.array(zamboni_data.data["outcome"].values)
-    for i in range(len(games_df)):
-        game = games_df.iloc[[i]]
-        game_id = game["id"].item()
-        prediction = preds[i]
-        sql_handler.record_game_prediction(game_id, predicter.id, prediction)
+    sql_handler.record_game_predictions(predicter.id, games_df.assign(preds=preds.ravel()))
 
     results = ResultsAnalyzer(preds, labels)
     print(f"Accuracy at 50%: {results.get_accuracy():.2%}")
@@ -0,0 +1,132 @@
+import json
+import logging
+import os
+import tempfile
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+
+def read_last_line(path, block_size=4096):
+    """
+    Read the last non-empty line of a file by seeking backwards from the end.
+
+    :param path: Path to file
+    :param block_size: Number of bytes read per step
+    :returns: Last line without trailing newline, or None if the file is empty
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b""
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            tail = f.read(read_size) + tail
+            stripped = tail.rstrip(b"\r\n")
+            if b"\n" in stripped:
+                return stripped.rsplit(b"\n", 1)[1].decode("utf-8")
+        stripped = tail.rstrip(b"\r\n")
+        return stripped.decode("utf-8") if stripped else None
+
+
+def count_lines(path, block_size=1 << 20):
+    """
+    Count newline-terminated lines without decoding the file.
+
+    :param path: Path to file
+    :param block_size: Number of bytes read per step
+    """
+    rows = 0
+    with open(path, "rb") as f:
+        while block := f.read(block_size):
+            rows += block.count(b"\n")
+    return rows
+
+
+class GamesCheckpoint:
+    """Sidecar file recording where the last download to a games file stopped"""
+
+    def __init__(self, games_path, date_column=6):
+        """
+        Store paths and start with an empty state
+
+        :param games_path: Path to games file written by download_games
+        :param date_column: Index of the date field in a games file line
+        """
+        self.games_path = str(games_path)
+        self.path = f"{self.games_path}.ckpt"
+        self.date_column = date_column
+        self.last_date = None
+        self.rows = 0
+        self.offset = 0
+
+    def load(self):
+        """
+        Restore the state from the sidecar, or from the tail of the games file
+        if the sidecar is missing or does not match the file size.
+
+        :returns: Date of the last downloaded game or None
+        """
+        if not os.path.exists(self.games_path):
+            return None
+        size = os.path.getsize(self.games_path)
+        try:
+            with open(self.path, "r") as f:
+                state = json.load(f)
+            if state["offset"] == size:
+                self.last_date = (
+                    date.fromisoformat(state["last_date"])
+                    if state["last_date"]
+                    else None
+                )
+                self.rows = state["rows"]
+                self.offset = state["offset"]
+                return self.last_date
+            logger.info(f"Checkpoint {self.path} is out of date, reading file tail")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+
+        self.offset = size
+        self.rows = count_lines(self.games_path) if size else 0
+        self.last_date = None
+        last_line = read_last_line(self.games_path) if size else None
+        if last_line:
+            try:
+                game_date = last_line.split(",")[self.date_column].strip()
+                self.last_date = date.fromisoformat(game_date)
+            except (IndexError, ValueError):
+                logger.warning(f"Could not read a date from the end of {self.games_path}")
+        return self.last_date
+
+    def advance(self, f, last_date, new_rows):
+        """
+        Record rows just appended to the games file and atomically save the state
+
+        :param f: Open games file
+        :param last_date: Date of the last game written
+        :param new_rows: Number of rows written since the previous call
+        """
+        f.flush()
+        self.last_date = date.fromisoformat(str(last_date))
+        self.rows += new_rows
+        self.offset = f.tell()
+        self.save()
+
+    def save(self):
+        """
+        Write the sidecar through a temporary file so it is never half written
+        """
+        state = {
+            "last_date": str(self.last_date) if self.last_date else None,
+            "rows": self.rows,
+            "offset": self.offset,
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
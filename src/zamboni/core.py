@@ -1,10 +1,13 @@
 import datetime
 import logging
+import pandas as pd
 from zamboni.api_download import main as download_main
 from zamboni import SQLHandler, DBConnector, TableCreator
+from zamboni.db_con import dispose_engines
 from zamboni.predicters.predicter import initialize_predicter
 from zamboni.data_management import ZamboniData
 from zamboni.sport import TeamService
+from zamboni.snapshots import SnapshotStore, write_snapshots
 
 loglevels = {
     "DEBUG": logging.DEBUG,
@@ -21,6 +24,7 @@ def run(
     earliest_date = datetime.date.fromisoformat("2025-09-01"),
     latest_date = datetime.date.fromisoformat("2026-09-01"),
     download=True,
+    replay=False,
     create_tables=True,
     force_recreate_tables=False,
     load_db=True,
@@ -45,7 +49,9 @@ def run(
     logger.info(f'DB URI: {db_uri}')
 
     if download:
-        download_main(data_config, start_date=earliest_date, end_date=latest_date)
+        download_main(
+            data_config, start_date=earliest_date, end_date=latest_date, replay=replay
+        )
 
     db_connector = DBConnector(db_uri)
     engine = db_connector.connect_db()
@@ -58,12 +64,22 @@ def run(
     if load_db or report:
         team_service = TeamService(engine)
 
+    # Dates whose /api/{date} payload changed through loaded games, predicter
+    # changes or new predictions
+    snapshot_dates = set()
+
     if load_db:
         sql_handler.load_seasons()
         sql_handler.load_teams()
         team_service.build_abbrev_id_dicts()
-        sql_handler.load_games_to_db()
-        sql_handler.load_predicters(predicters)
+        snapshot_dates.update(
+            sql_handler.load_games_to_db(
+                landing_format=data_config.get("landing_format", "txt")
+            )
+        )
+        # Activating or deactivating a predicter changes every date it predicted
+        changed_predicter_ids = sql_handler.load_predicters(predicters)
+        snapshot_dates.update(sql_handler.get_prediction_dates(changed_predicter_ids))
         # sql_handler.load_players()
         # sql_handler.load_roster_entries()
 
@@ -101,9 +117,19 @@ def run(
             # Add preds column with predictions
             predicter.update(games_data)
             sql_handler.record_game_predictions(predicter.id, games_data.data)
+            snapshot_dates.update(
+                pd.to_datetime(games_data.data["datePlayed"]).dt.date
+            )
+
+    snapshot_dir = data_config.get("snapshot_dir")
+    if snapshot_dir and (load_db or train):
+        write_snapshots(sql_handler, SnapshotStore(snapshot_dir), snapshot_dates)
 
     # Upload files back to S3 if configured
     if s3_storage is not None:
+        # Commits still in the WAL are not in the db file that gets uploaded
+        db_connector.checkpoint()
+        dispose_engines()
         logger.info("Uploading files back to S3...")
         s3_storage.upload_files()
 
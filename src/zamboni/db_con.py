@@ -1,38 +1,224 @@
-from sqlalchemy import create_engine
+import os
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 
 # import sqlite3
 import logging
 
 logger = logging.getLogger(__name__)
 
+default_db_uri = "sqlite:///data/zamboni.db"
+
+# Applied to every new SQLite connection; WAL lets readers run alongside the loader
+sqlite_pragmas = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,
+    "cache_size": -65536,
+}
+
+# asyncio drivers used in place of the sync DBAPI of each backend
+async_drivers = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+# One engine per URI for the whole process, with the pool settings it was created with
+engines = {}
+async_engines = {}
+engine_settings = {}
+async_engine_settings = {}
+engines_lock = threading.Lock()
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Connect event listener applying sqlite_pragmas to a new SQLite connection
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def is_sqlite_file(url):
+    """
+    Check whether a URL points at an SQLite database file rather than memory
+    """
+    return url.get_backend_name() == "sqlite" and url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def async_url(url):
+    """
+    Same URL with the asyncio driver of its backend
+
+    :param url: SQLAlchemy URL of db
+    :raises ValueError: If the backend has no supported asyncio driver
+    """
+    backend = url.get_backend_name()
+    if backend not in async_drivers:
+        raise ValueError(f"No asyncio driver for {backend}")
+    return url.set(drivername=f"{backend}+{async_drivers[backend]}")
+
+
+def dispose_engines():
+    """
+    Dispose of and forget every cached engine, including the asyncio engines
+    """
+    with engines_lock:
+        for engine in engines.values():
+            engine.dispose()
+        for engine in async_engines.values():
+            engine.sync_engine.dispose()
+        engines.clear()
+        engine_settings.clear()
+        async_engines.clear()
+        async_engine_settings.clear()
+
 
 class DBConnector:
     """Get connection to SQLite db"""
 
-    def __init__(self, db_uri):
+    def __init__(
+        self, db_uri=None, pool_size=5, max_overflow=10, pool_recycle=1800
+    ):
         """
         Store path to db
 
-        :param db_path: Path to db
+        :param db_uri: URI of db, defaults to ZAMBONI_DB_URI or the local SQLite db
+        :param pool_size: Number of connections kept open in the pool
+        :param max_overflow: Number of connections allowed beyond pool_size
+        :param pool_recycle: Seconds after which a pooled connection is replaced
         """
-        self.db_uri = db_uri
+        self.db_uri = db_uri or os.environ.get("ZAMBONI_DB_URI", default_db_uri)
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_recycle = pool_recycle
+
+    def settings(self):
+        """
+        Pool settings requested for this connector
+        """
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_recycle": self.pool_recycle,
+        }
+
+    def check_settings(self, cached_settings):
+        """
+        Warn if the engine cached for this URI was created with other pool settings
+
+        :param cached_settings: Settings the cached engine was created with
+        """
+        if cached_settings != self.settings():
+            logger.warning(
+                f"Reusing engine for {make_url(self.db_uri).render_as_string()} created "
+                f"with {cached_settings}, ignoring requested {self.settings()}"
+            )
+
+    def engine_kwargs(self, url):
+        """
+        Keyword arguments to create_engine for a URL
+
+        :param url: SQLAlchemy URL of db
+        """
+        kwargs = {"pool_pre_ping": True}
+        # In-memory SQLite uses a single connection pool that takes no sizing
+        if url.get_backend_name() != "sqlite" or is_sqlite_file(url):
+            kwargs.update(
+                pool_size=self.pool_size,
+                max_overflow=self.max_overflow,
+                pool_recycle=self.pool_recycle,
+            )
+        return kwargs
 
     def connect_db(self):
         """
-        Connect to db or create if it doesn't exist
+        Connect to db or create if it doesn't exist, reusing the engine already
+        created for this URI. Pool settings only apply when the engine is created.
+        """
+        with engines_lock:
+            engine = engines.get(self.db_uri)
+            if engine is None:
+                url = make_url(self.db_uri)
+                engine = create_engine(url, **self.engine_kwargs(url))
+                if is_sqlite_file(url):
+                    event.listen(engine, "connect", set_sqlite_pragmas)
+                engines[self.db_uri] = engine
+                engine_settings[self.db_uri] = self.settings()
+                logger.info(f"Created engine for {url.render_as_string()}")
+            else:
+                self.check_settings(engine_settings[self.db_uri])
+        return engine
+
+    def connect_async_db(self):
+        """
+        Asyncio engine for the same db, reusing the one already created for this URI
+
+        :raises ImportError: If the asyncio driver or greenlet is not installed
         """
-        engine = create_engine(self.db_uri)
-        # if self.db_path.is_file():
-        #    logger.info(f"Opening existing DB at {self.db_path}")
-        # else:
-        #    logger.info(f"Creating new DB at {self.db_path}")
-        #    os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        # self.conn = sqlite3.connect(self.db_path)
-        # self.conn.row_factory = sqlite3.Row  # Enable column access by name
+        with engines_lock:
+            engine = async_engines.get(self.db_uri)
+            if engine is None:
+                # create_async_engine only needs greenlet on first use, so fail here instead
+                import greenlet  # noqa: F401
+                from sqlalchemy.ext.asyncio import create_async_engine
+
+                url = async_url(make_url(self.db_uri))
+                engine = create_async_engine(url, **self.engine_kwargs(url))
+                if is_sqlite_file(url):
+                    event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+                async_engines[self.db_uri] = engine
+                async_engine_settings[self.db_uri] = self.settings()
+                logger.info(f"Created asyncio engine for {url.render_as_string()}")
+            else:
+                self.check_settings(async_engine_settings[self.db_uri])
         return engine
 
+    async def close_async(self):
+        """
+        Dispose of the asyncio engine for this URI
+        """
+        with engines_lock:
+            engine = async_engines.pop(self.db_uri, None)
+            async_engine_settings.pop(self.db_uri, None)
+        if engine is not None:
+            await engine.dispose()
+
+    def checkpoint(self):
+        """
+        Move the commits in the write-ahead log of an SQLite file into the db
+        file and truncate the log, so the db file alone holds every commit,
+        e.g. before copying it elsewhere
+
+        :returns: False if other connections kept part of the log from being
+            checkpointed, otherwise True
+        """
+        url = make_url(self.db_uri)
+        if not is_sqlite_file(url):
+            return True
+        with self.connect_db().connect() as connection:
+            busy, _, _ = connection.exec_driver_sql(
+                "PRAGMA wal_checkpoint(TRUNCATE)"
+            ).one()
+        if busy:
+            logger.warning(
+                f"Could not checkpoint all of the WAL of {url.render_as_string()}, "
+                "other connections are still reading or writing"
+            )
+        return not busy
+
     def close(self):
         """
-        Close connection
+        Dispose of the engine for this URI
         """
-        self.conn.close()
+        with engines_lock:
+            engine = engines.pop(self.db_uri, None)
+            engine_settings.pop(self.db_uri, None)
+        if engine is not None:
+            engine.dispose()
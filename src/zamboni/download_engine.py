@@ -0,0 +1,50 @@
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def _fetch_batch(fetch, keys, concurrency):
+    """
+    Run fetch for every key with at most concurrency calls in flight
+
+    :param fetch: Blocking callable taking a single key
+    :param keys: Keys to fetch
+    :param concurrency: Maximum number of simultaneous calls
+    :returns: Results in the same order as keys
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_one(key):
+        async with semaphore:
+            return await asyncio.to_thread(fetch, key)
+
+    return await asyncio.gather(*(fetch_one(key) for key in keys))
+
+
+def fetch_in_order(fetch, keys, concurrency=8, batch_size=None):
+    """
+    Fetch records for many keys concurrently and yield them in key order.
+
+    Keys are processed in batches so that callers can write results as they
+    arrive and an interrupted run keeps everything up to the last full batch.
+
+    :param fetch: Blocking callable taking a single key, e.g. an API query
+    :param keys: Iterable of keys, e.g. dates
+    :param concurrency: Maximum number of simultaneous calls
+    :param batch_size: Keys per batch, defaults to four times the concurrency
+    :returns: Generator of (key, result) tuples
+    """
+    keys = list(keys)
+    if concurrency <= 1:
+        for key in keys:
+            yield key, fetch(key)
+        return
+
+    if batch_size is None:
+        batch_size = concurrency * 4
+    for start in range(0, len(keys), batch_size):
+        batch = keys[start : start + batch_size]
+        logger.debug(f"Fetching batch of {len(batch)} keys starting at {batch[0]}")
+        results = asyncio.run(_fetch_batch(fetch, batch, concurrency))
+        yield from zip(batch, results)
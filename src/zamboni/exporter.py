@@ -1,8 +1,6 @@
 import logging
-import pandas as pd
-from .db_con import DBConnector
+import pyarrow.parquet as pq
 from zamboni.sql.sql_handler import SQLHandler
-from zamboni.sql.export_statements import export_statements
 from zamboni.utils import get_today_date, get_tomorrow_date
 
 logger = logging.getLogger(__name__)
@@ -12,45 +10,36 @@ today_date = str(get_today_date())
 class Exporter:
     """Class for exporting data from database to file for training"""
 
-    def __init__(self, con=None):
+    def __init__(self, con, sql_handler=None):
         """
         Initialize Exporter
 
-        :param conn: Connection
+        :param con: SQLAlchemy Engine of the db
+        :param sql_handler: SQLHandler to query with, defaults to one on con
         """
-        self.sql_handler = SQLHandler()
-        if not con:
-            self.db_connector = DBConnector()
-            self.con = self.db_connector.connect_db()
-        else:
-            self.con = con
-        self.export_statements = export_statements
+        self.con = con
+        self.sql_handler = sql_handler or SQLHandler(engine=con)
 
-    def last_game_export(self):
-        """
-        Get the last date for which games were exported
+    def export(self, sql, dest, params=None):
         """
-        last_game_sql = self.export_statements["games_last_export"]
+        Export the data returned by sql to the given destination
 
-        df = pd.read_sql(last_game_sql, self.con)
-        last_export_col = df["lastExportDate"]
-        if len(last_export_col) == 0:
-            out = None
-        elif len(last_export_col) == 1:
-            out = last_export_col[0]
-        else:
-            raise ValueError("Multiple rows found in gamesLastExport")
-        return out
+        :param sql: SQL string, SQLAlchemy text(), or SQLAlchemy selectable
+        :param dest: Path to export data
+        :param params: optional dict of parameters
+        """
+        self.write(self.sql_handler.query_arrow(sql, params), dest)
 
-    def export(self, df, dest):
+    def write(self, table, dest):
         """
-        Export the data returned by sql to the given destination
+        Write a pyarrow Table to Parquet
 
-        :param sql: SQL statement to query information from db
+        :param table: pyarrow Table to export
         :param dest: Path to export data
         """
-        if df is not None:
-            df.to_parquet(dest)
+        if table.num_rows > 0:
+            pq.write_table(table, dest)
+            logger.info(f"Exported {table.num_rows} rows to {dest}")
         else:
             logger.info("Nothing to export")
 
@@ -64,9 +53,9 @@ class Exporter:
         :param before_date: Date to filter games before
         """
         games = self.sql_handler.query_games(
-            after_date=after_date, before_date=before_date
+            start_date=after_date, end_date=before_date, as_arrow=True
         )
-        self.export(games, dest)
+        self.write(games, dest)
 
     def export_todays_games(self, dest="data/todays_games.parquet"):
         """
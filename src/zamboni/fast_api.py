@@ -1,43 +1,376 @@
-from fastapi import FastAPI
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+import io
+import json
+import logging
+import os
+import threading
+import time
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from fastapi.responses import StreamingResponse
+import pyarrow as pa
 import uvicorn
+from zamboni.db_con import DBConnector
 from zamboni.sql import SQLHandler
-from zamboni.utils import confidence_from_prediction
+from zamboni.sql.sql_handler import prediction_listeners
+from zamboni.snapshots import SnapshotStore, date_payload, game_response, version_key
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+# Seconds a response for a date near today stays fresh. Results and predictions
+# of those dates still change as games finish and predicters run.
+current_date_ttl = 60
+
+# Days before today whose responses get current_date_ttl, for late score corrections
+recent_days = 3
+
+# Seconds between checks of the db's data version. The daily pipeline runs in
+# another process, so its loads and predictions never reach the listeners here.
+version_check_interval = 30
+
+# Media types of the formats the bulk endpoints stream
+stream_media_types = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+stream_schema = pa.schema(
+    [
+        ("datePlayed", pa.date32()),
+        ("homeAbbrev", pa.string()),
+        ("awayAbbrev", pa.string()),
+        ("homeTeamGoals", pa.int64()),
+        ("awayTeamGoals", pa.int64()),
+        ("outcome", pa.int64()),
+        ("inOT", pa.bool_()),
+        ("prediction", pa.float64()),
+        ("predicterName", pa.string()),
+        ("predictedWinner", pa.string()),
+        ("predictedConfidence", pa.float64()),
+    ]
+)
+
+
+class DateResponseCache:
+    """In-memory LRU cache of serialized responses keyed by date"""
+
+    def __init__(
+        self,
+        max_entries=512,
+        ttl=current_date_ttl,
+        recent_days=recent_days,
+        version_interval=version_check_interval,
+    ):
+        """
+        Create empty cache
+
+        :param max_entries: Number of dates kept before the least recently used is dropped
+        :param ttl: Seconds entries for dates near today stay fresh
+        :param recent_days: Days before today that count as near today
+        :param version_interval: Seconds between checks of the db's data version
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.recent_days = recent_days
+        self.version_interval = version_interval
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.version = None
+        self.version_checked_at = None
+
+    def expires_at(self, day, today=None):
+        """
+        Time an entry for a date goes stale, or None if only a data version
+        change makes it stale
+
+        :param day: Date of the games in the response
+        :param today: Date treated as today, defaults to the current date
+        """
+        if today is None:
+            today = date.today()
+        if day < today - timedelta(days=self.recent_days):
+            return None
+        return time.monotonic() + self.ttl
+
+    def version_check_due(self):
+        """
+        Whether the db's data version should be checked again
+        """
+        with self.lock:
+            return (
+                self.version_checked_at is None
+                or self.version_checked_at + self.version_interval <= time.monotonic()
+            )
+
+    def validate(self, version):
+        """
+        Drop every cached response if the db's data version changed since the last check
+
+        :param version: Data version returned by SQLHandler.data_version
+        :returns: Whether the version differs from the last one, or is the first
+        """
+        with self.lock:
+            new_version = version != self.version
+            changed = self.version is not None and new_version
+            if changed:
+                self.entries.clear()
+            self.version = version
+            self.version_checked_at = time.monotonic()
+        if changed:
+            logger.info("Data version changed, cleared API response cache")
+        return new_version
+
+    def get(self, day):
+        """
+        Cached response body for a date
+
+        :param day: Date of the games in the response
+        :returns: Serialized body or None if missing or stale
+        """
+        with self.lock:
+            entry = self.entries.get(day)
+            if entry is None:
+                return None
+            body, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self.entries[day]
+                return None
+            self.entries.move_to_end(day)
+            return body
+
+    def put(self, day, body):
+        """
+        Store a response body for a date
+
+        :param day: Date of the games in the response
+        :param body: Serialized body
+        """
+        with self.lock:
+            self.entries[day] = (body, self.expires_at(day))
+            self.entries.move_to_end(day)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Drop every cached response and check the data version on the next request
+        """
+        with self.lock:
+            self.entries.clear()
+            self.version_checked_at = None
+        logger.debug("Cleared API response cache")
+
+
+def dated_game_response(row):
+    """
+    Response dict of a row with the date it was played, for responses spanning dates
+    """
+    return {"datePlayed": row.datePlayed, **game_response(row)}
+
+
+async def partitions(sql_handler, **filters):
+    """
+    Chunks of games with predictions, from the asyncio engine if there is one
+    and from the sync engine on the threadpool otherwise
+
+    :param sql_handler: SQLHandler to query
+    :param filters: Keyword arguments of games_with_predictions_select
+    """
+    if sql_handler.async_engine is not None:
+        async for rows in sql_handler.stream_games_with_predictions_async(**filters):
+            yield rows
+    else:
+        chunks = sql_handler.stream_games_with_predictions(**filters)
+        async for rows in iterate_in_threadpool(chunks):
+            yield rows
+
+
+async def ndjson_stream(chunks):
+    """
+    Encode chunks of rows as newline-delimited JSON, one chunk at a time
+    """
+    async for rows in chunks:
+        yield "".join(
+            json.dumps(dated_game_response(row), default=date.isoformat) + "\n"
+            for row in rows
+        ).encode()
+
+
+async def arrow_stream(chunks):
+    """
+    Encode chunks of rows as an Arrow IPC stream with one record batch per chunk
+    """
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, stream_schema)
+
+    def flush():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    # The stream's schema message is written before the first batch
+    yield flush()
+    async for rows in chunks:
+        batch = pa.RecordBatch.from_pylist(
+            [dated_game_response(row) for row in rows], schema=stream_schema
+        )
+        writer.write_batch(batch)
+        yield flush()
+    writer.close()
+    yield flush()
+
+
+def stream_response(sql_handler, output_format, **filters):
+    """
+    StreamingResponse of the games with predictions matching filters
+    """
+    chunks = partitions(sql_handler, **filters)
+    encode = arrow_stream if output_format == "arrow" else ndjson_stream
+    return StreamingResponse(
+        encode(chunks), media_type=stream_media_types[output_format]
+    )
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """
+    Create the data layer and response cache once for the life of the server
+    """
+    db_connector = DBConnector()
+    try:
+        async_engine = db_connector.connect_async_db()
+    except (ImportError, ValueError) as e:
+        logger.info(f"Querying on the threadpool, no asyncio engine available: {e}")
+        async_engine = None
+    app.state.sql_handler = SQLHandler(
+        engine=db_connector.connect_db(), async_engine=async_engine
+    )
+    app.state.response_cache = DateResponseCache()
+    snapshot_dir = os.environ.get("ZAMBONI_SNAPSHOT_DIR")
+    app.state.snapshots = SnapshotStore(snapshot_dir) if snapshot_dir else None
+    app.state.content_version = None
+    app.state.snapshots_current = False
+    prediction_listeners.append(app.state.response_cache.clear)
+    try:
+        yield
+    finally:
+        prediction_listeners.remove(app.state.response_cache.clear)
+        app.state.sql_handler.close()
+        await db_connector.close_async()
+        db_connector.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/health")
 @app.head("/health")
-def health():
+async def health():
         return {"status": "ok"}
 
+@app.get("/api/range")
+async def read_range(
+    request: Request,
+    start: date,
+    end: date,
+    predicter: str | None = None,
+    output_format: str = Query("ndjson", alias="format", pattern="^(ndjson|arrow)$"),
+):
+    if end < start:
+        raise HTTPException(status_code=422, detail="end is before start")
+    return stream_response(
+        request.app.state.sql_handler,
+        output_format,
+        start_date=start,
+        end_date=end,
+        predicter_name=predicter,
+    )
+
+@app.get("/api/team/{team_abbrev}")
+async def read_team(
+    team_abbrev: str,
+    request: Request,
+    start: date | None = None,
+    end: date | None = None,
+    predicter: str | None = None,
+    output_format: str = Query("ndjson", alias="format", pattern="^(ndjson|arrow)$"),
+):
+    return stream_response(
+        request.app.state.sql_handler,
+        output_format,
+        start_date=start,
+        end_date=end,
+        predicter_name=predicter,
+        team_abbrev=team_abbrev.upper(),
+    )
+
+async def check_data_version(state):
+    """
+    Validate the response cache against the db's data version and check whether
+    the snapshots were written from the db's current data
+
+    :param state: State of the app
+    """
+    sql_handler = state.sql_handler
+    if sql_handler.async_engine is not None:
+        version = await sql_handler.data_version_async()
+    else:
+        version = await run_in_threadpool(sql_handler.data_version)
+    changed = state.response_cache.validate(version)
+    if state.snapshots is None:
+        return
+    # The aggregates read whole tables, so only recompute them after a change
+    if changed:
+        if sql_handler.async_engine is not None:
+            content_version = await sql_handler.content_version_async()
+        else:
+            content_version = await run_in_threadpool(sql_handler.content_version)
+        state.content_version = version_key(content_version)
+    # Read on every check, as the pipeline rewrites snapshots after its db changes
+    state.snapshots_current = state.snapshots.read_version() == state.content_version
+
+
 @app.get("/api/{date_str}")
-def read_root(date_str):
-    sql_handler = SQLHandler()
-    games_df = sql_handler.query_games_with_predictions(date_str, date_str)
-
-    if games_df is None:
-        return []
-
-    out = []
-    for index, row in games_df.iterrows():
-        game = {
-            "homeAbbrev": row["homeAbbrev"],
-            "awayAbbrev": row["awayAbbrev"],
-            "homeTeamGoals": row["homeTeamGoals"],
-            "awayTeamGoals": row["awayTeamGoals"],
-            "outcome": row["outcome"],
-            "inOT": row["inOT"],
-            "prediction": row["prediction"],
-            "predicterName": row["predicterName"],
-        }
-        if game["prediction"] >= 0.5:
-            game["predictedWinner"] = game["homeAbbrev"]
+async def read_root(date_str, request: Request):
+    try:
+        day = date.fromisoformat(date_str)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid date {date_str}")
+
+    cache = request.app.state.response_cache
+    sql_handler = request.app.state.sql_handler
+    if cache.version_check_due():
+        await check_data_version(request.app.state)
+
+    # Snapshots written by the daily pipeline from the current data need no DB work
+    snapshots = request.app.state.snapshots
+    if snapshots is not None and request.app.state.snapshots_current:
+        snapshot = snapshots.read_date(
+            day, request.headers.get("accept-encoding", "")
+        )
+        if snapshot is not None:
+            body, encoding = snapshot
+            headers = {"Vary": "Accept-Encoding"}
+            if encoding is not None:
+                headers["Content-Encoding"] = encoding
+            return Response(
+                content=body, media_type="application/json", headers=headers
+            )
+
+    body = cache.get(day)
+    if body is None:
+        if sql_handler.async_engine is not None:
+            rows = await sql_handler.query_games_with_predictions_async(day)
         else:
-            game["predictedWinner"] = game["awayAbbrev"]
-        game["predictedConfidence"] = confidence_from_prediction(game["prediction"])
-        out.append(game)
-    return out
+            rows = await run_in_threadpool(
+                sql_handler.query_games_with_predictions, day
+            )
+        body = date_payload(rows)
+        cache.put(day, body)
+    return Response(content=body, media_type="application/json")
 
 
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="0.0.0.0", port=8000)
+    uvicorn.run("zamboni.fast_api:app", host="0.0.0.0", port=8000)
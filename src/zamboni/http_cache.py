@@ -0,0 +1,166 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+logger = logging.getLogger(__name__)
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+
+def ttl_for_record(record_type, record_ids, today=None):
+    """
+    Seconds an API response stays fresh, or None if it never changes.
+
+    :param record_type: Type of record being queried (game, player, standings, roster)
+    :param record_ids: Values used to fill the URL
+    :param today: Date treated as today, defaults to the current date
+    :returns: Time to live in seconds or None for records that are final
+    """
+    if today is None:
+        today = date.today()
+    record_ids = [str(record_id) for record_id in record_ids]
+
+    if record_type == "game" and record_ids:
+        # Response holds the week starting at the queried date. Once the last
+        # day is more than a day old every game in it has finished.
+        week_start = date.fromisoformat(record_ids[0])
+        week_end = week_start + timedelta(days=6)
+        if week_end < today - timedelta(days=1):
+            return None
+        if week_start > today:
+            return 6 * HOUR
+        return 5 * MINUTE
+    if record_type == "standings" and record_ids:
+        if date.fromisoformat(record_ids[0]) < today - timedelta(days=1):
+            return None
+        return 5 * MINUTE
+    if record_type == "roster" and len(record_ids) == 3:
+        # Seasons finish by the end of June
+        end_year = int(record_ids[2])
+        if (end_year, 7) <= (today.year, today.month):
+            return None
+        return DAY
+    if record_type in ("player", "schedule"):
+        return DAY
+    return HOUR
+
+
+class ResponseCache:
+    """On-disk cache of API responses keyed by URL"""
+
+    def __init__(self, cache_dir="data/api_cache"):
+        """
+        Store location of cache files
+
+        :param cache_dir: Directory holding cached responses
+        """
+        self.cache_dir = cache_dir
+
+    def path(self, url):
+        """
+        Path of the cache file for a URL
+
+        :param url: Queried URL
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, url):
+        """
+        Read the cached entry for a URL
+
+        :param url: Queried URL
+        :returns: Entry dict or None if nothing is cached
+        """
+        path = self.path(url)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache file {path}: {e}")
+            return None
+        if entry.get("url") != url:
+            return None
+        return entry
+
+    @staticmethod
+    def is_fresh(entry, now=None):
+        """
+        Check whether an entry can be used without contacting the API
+
+        :param entry: Entry dict returned by get
+        :param now: Current time in seconds since the epoch
+        """
+        if entry["ttl"] is None:
+            return True
+        if now is None:
+            now = time.time()
+        return now < entry["fetched_at"] + entry["ttl"]
+
+    @staticmethod
+    def revalidation_headers(entry):
+        """
+        Conditional request headers for a stale entry
+
+        :param entry: Entry dict returned by get
+        """
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url, body, headers, ttl):
+        """
+        Write a response to the cache
+
+        :param url: Queried URL
+        :param body: Decoded JSON body
+        :param headers: Response headers
+        :param ttl: Time to live in seconds or None if the record is final
+        """
+        entry = {
+            "url": url,
+            "fetched_at": time.time(),
+            "ttl": ttl,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "body": body,
+        }
+        self._write(url, entry)
+
+    def refresh(self, entry, ttl):
+        """
+        Mark an entry as fetched now after the API reported it unchanged
+
+        :param entry: Entry dict returned by get
+        :param ttl: Time to live in seconds or None if the record is final
+        """
+        entry["fetched_at"] = time.time()
+        entry["ttl"] = ttl
+        self._write(entry["url"], entry)
+
+    def _write(self, url, entry):
+        """
+        Atomically replace the cache file for a URL
+        """
+        path = self.path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache file {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
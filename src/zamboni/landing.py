@@ -0,0 +1,137 @@
+import logging
+import os
+import uuid
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Typed columns of a downloaded game, matching the fields in the games text files
+GAME_SCHEMA = pa.schema(
+    [
+        ("apiID", pa.int64()),
+        ("seasonID", pa.int32()),
+        ("homeTeamApiID", pa.int32()),
+        ("homeAbbrev", pa.string()),
+        ("awayTeamApiID", pa.int32()),
+        ("awayAbbrev", pa.string()),
+        ("datePlayed", pa.date32()),
+        ("dayOfYrPlayed", pa.int16()),
+        ("yrPlayed", pa.int16()),
+        ("timePlayed", pa.time32("s")),
+        ("homeTeamGoals", pa.int16()),
+        ("awayTeamGoals", pa.int16()),
+        ("gameTypeID", pa.int8()),
+        ("lastPeriodType", pa.string()),
+    ]
+)
+PARTITIONING = ds.partitioning(pa.schema([("season", pa.int32())]), flavor="hive")
+
+
+def landing_path(txt_path):
+    """
+    Directory holding the Parquet dataset that replaces a games text file
+
+    :param txt_path: Path to games text file, e.g. data/games_completed.txt
+    """
+    root, _ = os.path.splitext(str(txt_path))
+    return root
+
+
+class ParquetGameWriter:
+    """Buffer downloaded games and write them as Parquet files partitioned by season"""
+
+    def __init__(self, root_dir, batch_rows=5000):
+        """
+        Store dataset location
+
+        :param root_dir: Directory of the dataset
+        :param batch_rows: Number of buffered games that triggers a write
+        """
+        self.root_dir = root_dir
+        self.batch_rows = batch_rows
+        self.records = []
+
+    def append(self, fields):
+        """
+        Add one game, as returned by api_download.game_fields
+
+        :param fields: Dict of typed game fields
+        """
+        self.records.append(fields)
+        if len(self.records) >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered games as one new Parquet file per season
+        """
+        if not self.records:
+            return
+        batch = pa.RecordBatch.from_pylist(self.records, schema=GAME_SCHEMA)
+        table = pa.Table.from_batches([batch])
+        part_name = f"part-{uuid.uuid4().hex}.parquet"
+        seasons = pc.unique(table["seasonID"]).to_pylist()
+        for season in sorted(seasons):
+            season_table = table.filter(pc.equal(table["seasonID"], season))
+            season_dir = os.path.join(self.root_dir, f"season={season}")
+            os.makedirs(season_dir, exist_ok=True)
+            pq.write_table(season_table, os.path.join(season_dir, part_name))
+        logger.debug(f"Wrote {table.num_rows} games to {self.root_dir}")
+        self.records = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
+
+
+def read_games(root_dir, columns=None):
+    """
+    Read a landing dataset into an Arrow table
+
+    :param root_dir: Directory of the dataset
+    :param columns: Columns to read, defaults to all game columns
+    :returns: pyarrow.Table sorted by date, empty if the dataset does not exist
+    """
+    if not os.path.isdir(root_dir):
+        return GAME_SCHEMA.empty_table()
+    dataset = ds.dataset(
+        root_dir, schema=GAME_SCHEMA, format="parquet", partitioning=PARTITIONING
+    )
+    table = dataset.to_table(columns=columns or GAME_SCHEMA.names)
+    sort_keys = [
+        (name, "ascending")
+        for name in ("datePlayed", "apiID")
+        if name in table.column_names
+    ]
+    return table.sort_by(sort_keys)
+
+
+def last_date_played(root_dir):
+    """
+    Latest game date in a landing dataset, read from Parquet column statistics
+
+    :param root_dir: Directory of the dataset
+    :returns: Date or None if the dataset is empty
+    """
+    if not os.path.isdir(root_dir):
+        return None
+    dataset = ds.dataset(
+        root_dir, schema=GAME_SCHEMA, format="parquet", partitioning=PARTITIONING
+    )
+    column = GAME_SCHEMA.get_field_index("datePlayed")
+    last_date = None
+    for fragment in dataset.get_fragments():
+        metadata = fragment.metadata
+        for row_group in range(metadata.num_row_groups):
+            stats = metadata.row_group(row_group).column(column).statistics
+            if stats is None or not stats.has_min_max:
+                continue
+            if last_date is None or stats.max > last_date:
+                last_date = stats.max
+    return last_date
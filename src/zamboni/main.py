@@ -42,6 +42,14 @@ def cli():
     )
     parser.set_defaults(download=True)
 
+    # Flag to rebuild downloaded files from the raw response archive
+    parser.add_argument(
+        "--replay",
+        action="store_true",
+        help="Rebuild downloaded files from the raw API archive without network access",
+    )
+    parser.set_defaults(replay=False)
+
     # Flag to control creating tables in the database.
     parser.add_argument(
         "--create-tables", action="store_true", help="Create database tables"
@@ -123,6 +131,7 @@ def cli():
     latest_date = config["latest_date"]
     predicters = config.get("predicters", [])
     download = config["download"]
+    replay = config["replay"]
     create_tables = config["create_tables"]
     load_db = config["load_db"]
     export = config["export"]
@@ -137,6 +146,7 @@ def cli():
         latest_date=latest_date,
         predicters=predicters,
         download=download,
+        replay=replay,
         create_tables=create_tables,
         force_recreate_tables=force_recreate_tables,
         load_db=load_db,
@@ -439,3 +439,77 @@ class RosterResponse(BaseModel):
     forwards: List[RosterPlayer]
     defensemen: List[RosterPlayer]
     goalies: List[RosterPlayer]
+
+
+# ============================================================================
+# Lean Projection Models
+# ============================================================================
+# These models keep only the fields read by api_download and run no custom
+# validators. They are used for bulk ingestion when full validation is not needed.
+
+
+class LeanTeamDetails(BaseModel):
+    """Team fields of a game that are written to the games files."""
+
+    id: int
+    abbrev: str
+    score: int | None = None
+
+
+class LeanGame(BaseModel):
+    """Game fields that are written to the games files."""
+
+    id: int
+    season: int
+    gameType: int
+    startTimeUTC: str
+    venueUTCOffset: str
+    gameState: str | None = None
+    awayTeam: LeanTeamDetails
+    homeTeam: LeanTeamDetails
+    gameOutcome: GameOutcome | None = None
+
+
+class LeanGameDay(BaseModel):
+    """Games for a single day."""
+
+    date: str
+    games: list[LeanGame]
+
+
+class LeanGameScheduleResponse(BaseModel):
+    """Schedule response with only the fields used for downloading games."""
+
+    nextStartDate: str | None = None
+    gameWeek: list[LeanGameDay]
+
+
+class LeanStandingsEntry(BaseModel):
+    """Standings fields used for downloading teams."""
+
+    teamName: LocalizedString
+    teamAbbrev: LocalizedString
+    conferenceAbbrev: str
+    divisionAbbrev: str
+
+
+class LeanStandingsResponse(BaseModel):
+    """Standings response with only the fields used for downloading teams."""
+
+    standings: list[LeanStandingsEntry]
+
+
+class LeanRosterPlayer(BaseModel):
+    """Roster fields used for downloading roster entries and players."""
+
+    id: int
+    firstName: LocalizedString
+    lastName: LocalizedString
+
+
+class LeanRosterResponse(BaseModel):
+    """Roster response with only the fields used for downloading rosters."""
+
+    forwards: list[LeanRosterPlayer]
+    defensemen: list[LeanRosterPlayer]
+    goalies: list[LeanRosterPlayer]
@@ -0,0 +1,113 @@
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the rate of API requests"""
+
+    def __init__(self, rate=10.0, capacity=None):
+        """
+        Start with a full bucket
+
+        :param rate: Tokens added per second, i.e. sustained requests per second
+        :param capacity: Maximum burst size, defaults to one second of tokens
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """
+        Block until a token is available and take it
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Stop handing out tokens for a while, e.g. after the API returns 429
+
+        :param seconds: Time to wait before the next request
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + seconds)
+            self.tokens = 0
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter for failed API requests"""
+
+    retry_statuses = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, max_retries=5, backoff_base=0.5, backoff_max=60.0):
+        """
+        Store retry settings
+
+        :param max_retries: Number of retries after the first attempt
+        :param backoff_base: Delay in seconds before the first retry
+        :param backoff_max: Longest delay between two attempts
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def should_retry(self, attempt):
+        """
+        Check whether another attempt is allowed
+
+        :param attempt: Number of the attempt that just failed, starting at 0
+        """
+        return attempt < self.max_retries
+
+    def backoff(self, attempt):
+        """
+        Delay before the next attempt using full jitter
+
+        :param attempt: Number of the attempt that just failed, starting at 0
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return random.uniform(0, ceiling)
+
+    def retry_after(self, response):
+        """
+        Delay requested by the server in a Retry-After header
+
+        :param response: HTTP response
+        :returns: Seconds to wait or None if the header is missing or invalid
+        """
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                retry_time = parsedate_to_datetime(value)
+            except (TypeError, ValueError):
+                return None
+            seconds = retry_time.timestamp() - time.time()
+        return min(max(seconds, 0.0), self.backoff_max)
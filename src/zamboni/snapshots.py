@@ -0,0 +1,242 @@
+import gzip
+import json
+import logging
+import os
+import tempfile
+
+from zamboni.utils import confidence_from_prediction
+
+logger = logging.getLogger(__name__)
+
+# Encodings of the compressed siblings, in order of preference when serving
+encodings = {"br": ".br", "gzip": ".gz"}
+
+
+def game_response(row):
+    """
+    Response dict of a row returned by query_games_with_predictions
+    """
+    game = {
+        "homeAbbrev": row.homeAbbrev,
+        "awayAbbrev": row.awayAbbrev,
+        "homeTeamGoals": row.homeTeamGoals,
+        "awayTeamGoals": row.awayTeamGoals,
+        "outcome": row.outcome,
+        "inOT": row.inOT,
+        "prediction": row.prediction,
+        "predicterName": row.predicterName,
+    }
+    if game["prediction"] >= 0.5:
+        game["predictedWinner"] = game["homeAbbrev"]
+    else:
+        game["predictedWinner"] = game["awayAbbrev"]
+    game["predictedConfidence"] = confidence_from_prediction(game["prediction"])
+    return game
+
+
+def date_payload(rows):
+    """
+    Serialized /api/{date} response body of the rows of one date
+    """
+    return json.dumps([game_response(row) for row in rows]).encode()
+
+
+def compress(body, encoding):
+    """
+    Compress a body with a content encoding
+
+    :param body: Bytes to compress
+    :param encoding: Key of encodings
+    :returns: Compressed bytes, or None if the encoder is not installed
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, mtime=0)
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(body)
+
+
+def accepted_encodings(accept_encoding):
+    """
+    Quality values of the content encodings in an Accept-Encoding header
+
+    :param accept_encoding: Accept-Encoding header of a request
+    :returns: Dict of encoding to quality, without the encodings refused with q=0
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        encoding, *params = (part.strip() for part in item.split(";"))
+        if not encoding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[encoding.lower()] = quality
+    # A wildcard covers the encodings the header does not name
+    wildcard = accepted.pop("*", None)
+    if wildcard is not None:
+        for encoding in encodings:
+            accepted.setdefault(encoding, wildcard)
+    return {encoding: quality for encoding, quality in accepted.items() if quality > 0}
+
+
+def version_key(version):
+    """
+    Serialized data version returned by SQLHandler.content_version
+    """
+    return json.dumps(list(version), default=str)
+
+
+def write_file(path, body):
+    """
+    Replace a file atomically so the API never reads a partial snapshot
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+class SnapshotStore:
+    """Static JSON files of the /api/{date} payloads with compressed siblings"""
+
+    def __init__(self, snapshot_dir="data/snapshots"):
+        """
+        Store location of snapshots
+
+        :param snapshot_dir: Directory holding dates/ and seasons/ subdirectories
+        """
+        self.snapshot_dir = snapshot_dir
+
+    def date_path(self, day):
+        """
+        Path of the snapshot of a date, e.g. data/snapshots/dates/2025-01-24.json
+        """
+        return os.path.join(self.snapshot_dir, "dates", f"{day.isoformat()}.json")
+
+    def version_path(self):
+        """
+        Path of the data version the snapshots were written from
+        """
+        return os.path.join(self.snapshot_dir, "version.json")
+
+    def write_version(self, version):
+        """
+        Record the data version all snapshots are current with
+
+        :param version: Data version returned by SQLHandler.content_version
+        """
+        write_file(self.version_path(), version_key(version).encode())
+
+    def read_version(self):
+        """
+        Serialized data version the snapshots are current with, or None if unknown
+        """
+        try:
+            with open(self.version_path()) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def season_path(self, season_id):
+        """
+        Path of the index of a season, e.g. data/snapshots/seasons/20242025.json
+        """
+        return os.path.join(self.snapshot_dir, "seasons", f"{season_id}.json")
+
+    def write(self, path, body):
+        """
+        Write a JSON body and its compressed siblings
+
+        :param path: Path of the uncompressed file
+        :param body: Serialized JSON
+        """
+        for encoding, suffix in encodings.items():
+            compressed = compress(body, encoding)
+            if compressed is not None:
+                write_file(path + suffix, compressed)
+            elif os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        # Written last so a snapshot is only found once its siblings exist
+        write_file(path, body)
+
+    def write_date(self, day, rows):
+        """
+        Write the snapshot of one date
+
+        :param day: Date of the games
+        :param rows: Rows returned by query_games_with_predictions for the date
+        """
+        self.write(self.date_path(day), date_payload(rows))
+
+    def write_season(self, season_id, dates):
+        """
+        Write the index of the dates with snapshots in a season
+
+        :param season_id: API ID of season
+        :param dates: List of (date, number of games) tuples
+        """
+        index = {
+            "season": season_id,
+            "dates": [
+                {"date": day.isoformat(), "games": games} for day, games in dates
+            ],
+        }
+        self.write(self.season_path(season_id), json.dumps(index).encode())
+
+    def read_date(self, day, accept_encoding=""):
+        """
+        Read the snapshot of a date in the best encoding the client accepts
+
+        :param day: Date of the games
+        :param accept_encoding: Accept-Encoding header of the request
+        :returns: Tuple of body and content encoding (None if uncompressed), or
+            None if there is no snapshot
+        """
+        path = self.date_path(day)
+        accepted = accepted_encodings(accept_encoding)
+        # Highest quality first, ties in order of encodings
+        preferred = sorted(
+            (encoding for encoding in encodings if encoding in accepted),
+            key=lambda encoding: -accepted[encoding],
+        )
+        candidates = [
+            (path + encodings[encoding], encoding) for encoding in preferred
+        ] + [(path, None)]
+        for candidate, encoding in candidates:
+            try:
+                with open(candidate, "rb") as f:
+                    return f.read(), encoding
+            except FileNotFoundError:
+                continue
+        return None
+
+
+def write_snapshots(sql_handler, store, dates):
+    """
+    Render the /api/{date} payload of each date and the index of their seasons
+
+    :param sql_handler: SQLHandler to query
+    :param store: SnapshotStore to write to
+    :param dates: Dates whose predictions changed. Snapshots of the other dates
+        must already be current, as they are then marked current with the db.
+    :returns: Number of date snapshots written
+    """
+    dates = sorted(set(dates))
+    # Taken first, so changes made while writing leave the snapshots marked stale
+    version = sql_handler.content_version()
+    for day in dates:
+        store.write_date(day, sql_handler.query_games_with_predictions(day))
+    for season_id, season_dates in sql_handler.season_prediction_dates(dates).items():
+        store.write_season(season_id, season_dates)
+    store.write_version(version)
+    logger.info(f"Wrote snapshots of {len(dates)} dates to {store.snapshot_dir}")
+    return len(dates)
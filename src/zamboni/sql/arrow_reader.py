@@ -0,0 +1,146 @@
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import Boolean, Date, Float, Integer, Text, text
+from sqlalchemy.sql.expression import TextClause
+
+logger = logging.getLogger(__name__)
+
+# Arrow types of SQLAlchemy column types, used to give every backend the same result types
+arrow_types = {
+    Integer: pa.int64(),
+    Float: pa.float64(),
+    Boolean: pa.bool_(),
+    Date: pa.date32(),
+    Text: pa.string(),
+}
+
+
+def compile_sql(engine, sql, params=None):
+    """
+    Render a statement as a SQL string with its parameters inlined
+
+    :param engine: SQLAlchemy Engine whose dialect is used
+    :param sql: SQL string, SQLAlchemy text(), or SQLAlchemy selectable
+    :param params: optional dict of parameters
+    """
+    stmt = text(sql) if isinstance(sql, str) else sql
+    if params:
+        stmt = stmt.bindparams(**params) if isinstance(stmt, TextClause) else stmt.params(**params)
+    return str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def result_schema(sql):
+    """
+    Arrow types of the columns selected by a statement, where they are known
+
+    :param sql: SQL string, SQLAlchemy text(), or SQLAlchemy selectable
+    :returns: Dict of column name to Arrow type
+    """
+    columns = getattr(sql, "selected_columns", None)
+    if columns is None:
+        return {}
+    schema = {}
+    for column in columns:
+        for sql_type, arrow_type in arrow_types.items():
+            if isinstance(column.type, sql_type):
+                schema[column.key] = arrow_type
+                break
+    return schema
+
+
+class NativeReadError(Exception):
+    """Raised when an Arrow-native driver fails to run a query."""
+
+
+def read_adbc(engine, query_sql):
+    """
+    Run a query with an ADBC driver, which returns Arrow data without Python row objects
+    """
+    url = engine.url
+    if url.get_backend_name() == "sqlite":
+        from adbc_driver_sqlite import dbapi
+
+        target = url.database
+    else:
+        from adbc_driver_postgresql import dbapi
+
+        target = url.set(drivername="postgresql").render_as_string(hide_password=False)
+    try:
+        with dbapi.connect(target) as connection, connection.cursor() as cursor:
+            cursor.execute(query_sql)
+            return cursor.fetch_arrow_table()
+    except dbapi.Error as e:
+        raise NativeReadError(str(e)) from e
+
+
+def read_connectorx(engine, query_sql):
+    """
+    Run a query with connectorx, which also returns Arrow data directly
+    """
+    import connectorx as cx
+
+    url = engine.url
+    if url.get_backend_name() == "sqlite":
+        uri = f"sqlite://{url.database}"
+    else:
+        uri = url.set(drivername="postgresql").render_as_string(hide_password=False)
+    try:
+        return cx.read_sql(uri, query_sql, return_type="arrow")
+    except RuntimeError as e:
+        # connectorx reports connection and query errors as RuntimeError
+        raise NativeReadError(str(e)) from e
+
+
+native_readers = [("adbc", read_adbc), ("connectorx", read_connectorx)]
+
+
+def read_arrow(engine, sql, params=None):
+    """
+    Query the database into a pyarrow Table using an Arrow-native driver if one
+    is installed and succeeds, falling back to pd.read_sql
+
+    :param engine: SQLAlchemy Engine
+    :param sql: SQL string, SQLAlchemy text(), or SQLAlchemy selectable
+    :param params: optional dict of parameters
+    :returns: pyarrow.Table
+    """
+    table = None
+    url = engine.url
+    native = url.get_backend_name() in ("sqlite", "postgresql") and url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+    if native:
+        query_sql = compile_sql(engine, sql, params)
+        for name, reader in native_readers:
+            try:
+                table = reader(engine, query_sql)
+            except ImportError:
+                continue
+            except NativeReadError as e:
+                # Drivers can reject SQL or URIs that SQLAlchemy accepts
+                logger.warning(f"Reading with {name} failed, falling back: {e}")
+                continue
+            logger.debug(f"Read {table.num_rows} rows with {name}")
+            break
+    if table is None:
+        df = pd.read_sql(sql, engine, params=params)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+    # SQLite has no date or boolean storage types, so cast to the selected column types
+    for name, arrow_type in result_schema(sql).items():
+        if name not in table.column_names:
+            continue
+        index = table.column_names.index(name)
+        column = table.column(index)
+        if column.type == arrow_type:
+            continue
+        try:
+            table = table.set_column(index, name, pc.cast(column, arrow_type))
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            logger.debug(f"Keeping column {name} as {column.type}: {e}")
+    return table
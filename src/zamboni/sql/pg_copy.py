@@ -0,0 +1,301 @@
+import logging
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    MetaData,
+    Table,
+    Text,
+    and_,
+    exists,
+    func,
+    literal_column,
+    or_,
+    select,
+    text,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.schema import CreateTable
+
+from .tables import Games, Players, RosterEntries, Teams
+
+logger = logging.getLogger(__name__)
+
+games_table = Games.__table__
+players_table = Players.__table__
+roster_entries_table = RosterEntries.__table__
+
+# Columns written to games by the loader; the updatable ones change once a game finishes
+game_columns = [column.name for column in games_table.columns if column.name != "id"]
+game_update_columns = [
+    "homeTeamGoals",
+    "awayTeamGoals",
+    "outcome",
+    "inOT",
+    "lastPeriodTypeID",
+    "homeTeamPointsAwarded",
+    "awayTeamPointsAwarded",
+]
+player_columns = [column.name for column in players_table.columns if column.name != "id"]
+
+
+def staging_table(name, columns):
+    """
+    Temporary table holding rows between COPY and the merge into the real table.
+    Each session gets its own copy, dropped when the load's transaction commits,
+    so concurrent loaders never see each other's rows.
+
+    :param name: Name of the staging table
+    :param columns: Columns to copy, as (name, type) tuples
+    """
+    return Table(
+        name,
+        MetaData(),
+        *[Column(column_name, column_type) for column_name, column_type in columns],
+        prefixes=["TEMPORARY"],
+        postgresql_on_commit="DROP",
+    )
+
+
+games_staging = staging_table(
+    "games_staging", [(name, games_table.c[name].type) for name in game_columns]
+)
+players_staging = staging_table(
+    "players_staging", [(name, players_table.c[name].type) for name in player_columns]
+)
+roster_entries_staging = staging_table(
+    "rosterEntries_staging",
+    [
+        ("apiID", Integer()),
+        ("teamAbbrev", Text()),
+        ("seasonID", Integer()),
+        ("firstName", Text()),
+        ("lastName", Text()),
+        ("startYear", Integer()),
+        ("endYear", Integer()),
+    ],
+)
+
+
+def csv_field(value):
+    """
+    CSV text of one value for COPY. NULL is an unquoted empty field and every
+    string is quoted, so empty strings stay empty strings as they do on SQLite.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+
+class RowStream:
+    """File-like object that turns rows into CSV text as COPY reads it"""
+
+    def __init__(self, rows, columns):
+        """
+        Store rows to stream
+
+        :param rows: Iterable of dicts
+        :param columns: Keys to write, in the order of the COPY column list
+        """
+        self.rows = iter(rows)
+        self.columns = columns
+        self.buffer = ""
+
+    def _next_line(self):
+        row = next(self.rows, None)
+        if row is None:
+            return ""
+        return ",".join(csv_field(row[column]) for column in self.columns) + "\n"
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            line = self._next_line()
+            if not line:
+                break
+            self.buffer += line
+        if size < 0:
+            size = len(self.buffer)
+        chunk, self.buffer = self.buffer[:size], self.buffer[size:]
+        return chunk
+
+
+def copy_rows(connection, table, rows):
+    """
+    Stream rows into a table with COPY FROM STDIN
+
+    :param connection: SQLAlchemy connection to a psycopg2 database
+    :param table: Table whose columns are copied
+    :param rows: Iterable of dicts keyed by column name
+    """
+    quote = connection.dialect.identifier_preparer.quote
+    columns = [column.name for column in table.columns]
+    copy_sql = (
+        f"COPY {quote(table.name)} ({', '.join(quote(name) for name in columns)}) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(copy_sql, RowStream(rows, columns))
+        return cursor.rowcount
+    finally:
+        cursor.close()
+
+
+def stage_rows(connection, staging, rows):
+    """
+    Empty a staging table, creating it if this transaction has not yet, and
+    copy rows into it
+
+    :param connection: SQLAlchemy connection to a psycopg2 database
+    :param staging: Staging table
+    :param rows: Iterable of dicts keyed by column name
+    :returns: Number of rows copied
+    """
+    # IF NOT EXISTS only looks at this session's temporary schema
+    connection.execute(CreateTable(staging, if_not_exists=True))
+    quote = connection.dialect.identifier_preparer.quote
+    connection.execute(text(f"TRUNCATE {quote(staging.name)}"))
+    return copy_rows(connection, staging, rows)
+
+
+def games_merge_statement(overwrite=False, update_finished=True):
+    """
+    INSERT ... ON CONFLICT moving staged games into games
+
+    :param overwrite: Update every game that already exists
+    :param update_finished: Update existing unfinished games that have now finished
+    """
+    stmt = pg_insert(games_table).from_select(
+        game_columns, select(*[games_staging.c[name] for name in game_columns])
+    )
+    if overwrite or update_finished:
+        where = None
+        if not overwrite:
+            where = and_(
+                or_(games_table.c.outcome.is_(None), games_table.c.outcome == -1),
+                stmt.excluded.homeTeamGoals.is_not(None),
+                stmt.excluded.awayTeamGoals.is_not(None),
+            )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["apiID"],
+            set_={name: stmt.excluded[name] for name in game_update_columns},
+            where=where,
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["apiID"])
+    # xmax is 0 for rows that were inserted rather than updated
+    return stmt.returning(
+        games_table.c.apiID, literal_column("xmax = 0").label("inserted")
+    )
+
+
+def merge_games(connection, rows, overwrite=False, update_finished=True):
+    """
+    Load games by copying them to a staging table and merging with one statement
+
+    :param connection: SQLAlchemy connection to a psycopg2 database
+    :param rows: Iterable of dicts keyed by games column name
+    :param overwrite: Update every game that already exists
+    :param update_finished: Update existing unfinished games that have now finished
+    :returns: Tuple of lists of API IDs of games inserted and updated
+    """
+    # ON CONFLICT needs a unique index on the conflict column
+    connection.execute(
+        text('CREATE UNIQUE INDEX IF NOT EXISTS "uq_games_apiID" ON games ("apiID")')
+    )
+    staged = stage_rows(connection, games_staging, rows)
+    merged = connection.execute(games_merge_statement(overwrite, update_finished)).all()
+    logger.debug(f"Merged {staged} staged games")
+    inserted = [api_id for api_id, was_inserted in merged if was_inserted]
+    updated = [api_id for api_id, was_inserted in merged if not was_inserted]
+    return inserted, updated
+
+
+def players_merge_statement():
+    """
+    INSERT ... SELECT moving staged players that are not in players yet
+    """
+    return pg_insert(players_table).from_select(
+        player_columns,
+        select(*[players_staging.c[name] for name in player_columns])
+        .distinct(players_staging.c.apiID)
+        .where(~exists().where(players_table.c.apiID == players_staging.c.apiID)),
+    )
+
+
+def merge_players(connection, rows):
+    """
+    Load players by copying them to a staging table and inserting the new ones
+
+    :param connection: SQLAlchemy connection to a psycopg2 database
+    :param rows: Iterable of dicts keyed by players column name
+    :returns: Number of players inserted
+    """
+    stage_rows(connection, players_staging, rows)
+    return connection.execute(players_merge_statement()).rowcount
+
+
+def roster_entries_merge_statement():
+    """
+    INSERT ... SELECT resolving team and player IDs of staged roster entries
+    """
+    staged = roster_entries_staging
+    player_ids = (
+        select(
+            players_table.c.firstName,
+            players_table.c.lastName,
+            func.min(players_table.c.id).label("id"),
+        )
+        .group_by(players_table.c.firstName, players_table.c.lastName)
+        .subquery()
+    )
+    team_id = Teams.__table__.c.id
+    entries = (
+        select(
+            staged.c.apiID,
+            player_ids.c.id,
+            team_id,
+            staged.c.seasonID,
+            staged.c.startYear,
+            staged.c.endYear,
+        )
+        # Rosters downloaded twice in one load would otherwise insert duplicates
+        .distinct(staged.c.apiID, team_id, staged.c.seasonID)
+        .join(Teams.__table__, Teams.__table__.c.nameAbbrev == staged.c.teamAbbrev)
+        .join(
+            player_ids,
+            and_(
+                player_ids.c.firstName == staged.c.firstName,
+                player_ids.c.lastName == staged.c.lastName,
+            ),
+        )
+        .where(
+            ~exists().where(
+                roster_entries_table.c.apiID == staged.c.apiID,
+                roster_entries_table.c.teamID == team_id,
+                roster_entries_table.c.seasonID == staged.c.seasonID,
+            )
+        )
+    )
+    return pg_insert(roster_entries_table).from_select(
+        ["apiID", "playerID", "teamID", "seasonID", "startYear", "endYear"], entries
+    )
+
+
+def merge_roster_entries(connection, rows):
+    """
+    Load roster entries by copying them to a staging table and inserting the new ones
+
+    :param connection: SQLAlchemy connection to a psycopg2 database
+    :param rows: Iterable of dicts keyed by roster_entries_staging column name
+    :returns: Number of roster entries inserted
+    """
+    staged = stage_rows(connection, roster_entries_staging, rows)
+    inserted = connection.execute(roster_entries_merge_statement()).rowcount
+    if inserted < staged:
+        logger.info(
+            f"Skipped {staged - inserted} roster entries that already exist or have no matching team or player"
+        )
+    return inserted
@@ -1,8 +1,11 @@
 from collections import defaultdict
 from datetime import datetime, date
 import logging
+import threading
 import pandas as pd
-from sqlalchemy import select, insert, update, text, func
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import select, insert, update, text, func, bindparam
 from sqlalchemy.exc import IntegrityError
 from .tables import (
     Teams,
@@ -13,13 +16,23 @@ from .tables import (
     GamePredictions,
     LastTraining,
     Seasons,
-    GamesHistoryView,
+    TeamGameHistory,
 )
-from .sql_helpers import upsert
+from .sql_helpers import upsert, upsert_many
+from .pg_copy import merge_games, merge_players, merge_roster_entries
+from .team_history import update_team_game_history
+from .arrow_reader import read_arrow, result_schema
 from zamboni.db_con import DBConnector
+from zamboni.landing import landing_path, read_games as read_landing_games
 from zamboni.sport import Game
 from zamboni.utils import split_csv_line, get_today_date, date_str_to_py
-from zamboni.sql.statements import games_with_predictions_select, games_select
+from zamboni.sql.statements import (
+    games_with_predictions_select,
+    games_select,
+    season_prediction_dates_select,
+    content_version_select,
+    data_version_select,
+)
 
 
 logger = logging.getLogger(__name__)
@@ -32,12 +45,111 @@ _ALLOWED_ACTION_TABLE_COLUMNS = {
 }
 
 
+def points_awarded(outcome, in_ot):
+    """
+    Standings points for the home and away team
+
+    :param outcome: 1 for a home win, 0 for an away win
+    :param in_ot: Whether the game went past regulation
+    :returns: Tuple of home and away points, or Nones if outcome is None
+    """
+    if outcome is None:
+        return None, None
+    home_points = 2 if outcome == 1 else (1 if in_ot else 0)
+    away_points = 2 if outcome == 0 else (1 if in_ot else 0)
+    return home_points, away_points
+
+
+def map_column(column, mapping):
+    """
+    Replace each value of an Arrow column by its value in mapping
+
+    :param column: pyarrow Array or ChunkedArray
+    :param mapping: Dict of column value to new value
+    """
+    keys = pa.array(list(mapping))
+    positions = pc.index_in(pc.cast(column, keys.type), value_set=keys)
+    return pc.take(pa.array(list(mapping.values())), positions)
+
+
+def game_rows_from_table(table, season_ids, team_ids):
+    """
+    Column values for the games table of a landing dataset, derived column by
+    column with the same rules as SQLHandler.game_row
+
+    :param table: pyarrow Table with the columns of landing.GAME_SCHEMA
+    :param season_ids: Dict of season API ID to db ID
+    :param team_ids: Dict of team abbreviation to db ID
+    :returns: pyarrow Table
+    """
+    home_goals = table["homeTeamGoals"]
+    away_goals = table["awayTeamGoals"]
+    completed = pc.and_(pc.is_valid(home_goals), pc.is_valid(away_goals))
+    # Comparisons are null for unfinished games, which get outcome -1 like ties
+    outcome = pc.if_else(
+        pc.greater(home_goals, away_goals),
+        1,
+        pc.if_else(pc.less(home_goals, away_goals), 0, -1),
+    ).fill_null(-1)
+    ties = pc.sum(pc.and_(completed, pc.equal(home_goals, away_goals))).as_py()
+    if ties:
+        logger.warning(f"{ties} games ended in a tie, which is not usually possible")
+    last_period_type = table["lastPeriodType"].fill_null("")
+    in_ot = pc.if_else(
+        completed,
+        pc.if_else(pc.equal(last_period_type, "REG"), 0, 1),
+        pa.scalar(None, pa.int64()),
+    )
+    went_long = pc.equal(in_ot, 1).fill_null(False)
+    return pa.table(
+        {
+            "apiID": pc.cast(table["apiID"], pa.int64()),
+            "seasonID": map_column(table["seasonID"], season_ids),
+            "homeTeamID": map_column(table["homeAbbrev"], team_ids),
+            "awayTeamID": map_column(table["awayAbbrev"], team_ids),
+            "datePlayed": table["datePlayed"],
+            "dayOfYrPlayed": table["dayOfYrPlayed"],
+            "yrPlayed": table["yrPlayed"],
+            "timePlayed": table["timePlayed"],
+            "homeTeamGoals": home_goals,
+            "awayTeamGoals": away_goals,
+            "gameTypeID": table["gameTypeID"],
+            "lastPeriodTypeID": last_period_type,
+            "outcome": outcome,
+            "inOT": in_ot,
+            "homeTeamPointsAwarded": pc.if_else(
+                pc.equal(outcome, 1), 2, pc.if_else(went_long, 1, 0)
+            ),
+            "awayTeamPointsAwarded": pc.if_else(
+                pc.equal(outcome, 0), 2, pc.if_else(went_long, 1, 0)
+            ),
+            "recordCreated": pa.repeat(today_date, table.num_rows),
+        }
+    )
+
+
+# Callables run after predictions are written, e.g. to drop cached API responses
+prediction_listeners = []
+
+
+def notify_prediction_listeners():
+    """
+    Tell every registered listener that games or game predictions changed
+    """
+    for listener in prediction_listeners:
+        listener()
+
+
 class SQLHandler:
     """Load information from text files into SQLite database"""
 
-    def __init__(self, txt_dir="data", engine=None):
+    def __init__(self, txt_dir="data", engine=None, async_engine=None):
         """
         Establish connection to db
+
+        :param txt_dir: Directory holding the downloaded text files
+        :param engine: SQLAlchemy Engine, defaults to the shared engine of DBConnector
+        :param async_engine: Optional SQLAlchemy AsyncEngine for the async query methods
         """
         self.txt_dir = txt_dir
         if not engine:
@@ -45,7 +157,10 @@ class SQLHandler:
             self.engine = db_connector.connect_db()
         else:
             self.engine = engine
+        self.async_engine = async_engine
         self.team_id_dict = defaultdict(lambda: "Undefined")
+        self.version_connection = None
+        self.version_lock = threading.Lock()
 
     def execute(self, sql, params=None):
         """
@@ -179,12 +294,7 @@ class SQLHandler:
                 .scalar_subquery()
             )
 
-            home_points_awarded = (
-                (2 if outcome == 1 else (1 if in_ot else 0)) if outcome is not None else None
-            )
-            away_points_awarded = (
-                (2 if outcome == 0 else (1 if in_ot else 0)) if outcome is not None else None
-            )
+            home_points_awarded, away_points_awarded = points_awarded(outcome, in_ot)
 
             logger.debug(f"About to insert game {game}")
             stmt = insert(Games).values(
@@ -208,6 +318,7 @@ class SQLHandler:
             )
             logging.debug(f"Inserting game: {repr(game)}")
             connection.execute(stmt)
+            update_team_game_history(connection, [game.api_id])
 
     def update_game(self, game):
         """
@@ -221,61 +332,273 @@ class SQLHandler:
                 awayTeamGoals=game.away_team_goals,
                 outcome=game.outcome,
                 inOT=game.in_ot,
-                lastPeriodTypeID=game.last_period_type_id,
+                lastPeriodTypeID=game.last_period_type,
             )
         )
         with self.engine.begin() as connection:
             connection.execute(stmt)
+            update_team_game_history(connection, [game.api_id])
+
+    def season_ids(self, season_api_ids):
+        """
+        Map season API IDs to db IDs, inserting any seasons that are missing
+
+        :param season_api_ids: Iterable of season API IDs, e.g. 20242025
+        :returns: Dict of season API ID to db ID
+        """
+        season_api_ids = {int(season_api_id) for season_api_id in season_api_ids}
+        stmt = select(Seasons.apiID, Seasons.id)
+        with self.engine.begin() as connection:
+            ids = dict(connection.execute(stmt).all())
+            missing = sorted(season_api_ids - ids.keys())
+            if missing:
+                connection.execute(
+                    insert(Seasons),
+                    [
+                        {
+                            "apiID": season_api_id,
+                            "startYear": season_api_id // 10000,
+                            "endYear": season_api_id % 10000,
+                        }
+                        for season_api_id in missing
+                    ],
+                )
+                ids = dict(connection.execute(stmt).all())
+        return ids
+
+    def team_ids(self, abbrevs):
+        """
+        Map team abbreviations to db IDs, inserting placeholder teams that are missing
+
+        :param abbrevs: Iterable of team abbreviations
+        :returns: Dict of team abbreviation to db ID
+        """
+        stmt = select(Teams.nameAbbrev, Teams.id)
+        with self.engine.begin() as connection:
+            ids = dict(connection.execute(stmt).all())
+            missing = sorted(set(abbrevs) - ids.keys())
+            if missing:
+                connection.execute(
+                    insert(Teams),
+                    [
+                        {
+                            "name": "Unknown",
+                            "nameAbbrev": abbrev,
+                            "conferenceAbbrev": "Unknown",
+                            "divisionAbbrev": "Unknown",
+                        }
+                        for abbrev in missing
+                    ],
+                )
+                ids = dict(connection.execute(stmt).all())
+        self.team_id_dict.update(ids)
+        return ids
+
+    def game_row(self, game, season_ids, team_ids):
+        """
+        Column values of a game for the games table
+
+        :param game: Game object
+        :param season_ids: Dict of season API ID to db ID
+        :param team_ids: Dict of team abbreviation to db ID
+        """
+        time_played = game.time_played
+        if time_played:
+            time_played = datetime.strptime(time_played, "%H:%M:%S").time()
+        outcome = game.outcome
+        in_ot = game.in_ot
+        home_points, away_points = points_awarded(outcome, in_ot)
+        return {
+            "apiID": int(game.api_id),
+            "seasonID": season_ids[int(game.season_id)],
+            "homeTeamID": team_ids[game.home_abbrev],
+            "awayTeamID": team_ids[game.away_abbrev],
+            "datePlayed": date_str_to_py(game.date_played),
+            "dayOfYrPlayed": game.day_of_year_played,
+            "yrPlayed": game.year_played,
+            "timePlayed": time_played or None,
+            "homeTeamGoals": game.home_team_goals,
+            "awayTeamGoals": game.away_team_goals,
+            "gameTypeID": game.game_type,
+            "lastPeriodTypeID": game.last_period_type,
+            "outcome": outcome,
+            "inOT": in_ot,
+            "homeTeamPointsAwarded": home_points,
+            "awayTeamPointsAwarded": away_points,
+            "recordCreated": today_date,
+        }
+
+    def load_games(self, games, overwrite=False, update_finished=True):
+        """
+        Insert new games and update games that have finished since they were loaded
+
+        :param games: Iterable of Game objects
+        :param overwrite: Update every game that already exists
+        :param update_finished: Update existing unfinished games that have now finished
+        :returns: Set of dates played of the games inserted or updated
+        """
+        games = list(games)
+        if not games:
+            return set()
+        season_ids = self.season_ids(game.season_id for game in games)
+        team_ids = self.team_ids(
+            {game.home_abbrev for game in games} | {game.away_abbrev for game in games}
+        )
+        rows = [self.game_row(game, season_ids, team_ids) for game in games]
+        return self.load_game_rows(rows, overwrite, update_finished)
+
+    def load_games_table(self, table, overwrite=False, update_finished=True):
+        """
+        Same as load_games for a landing dataset read as an Arrow table, deriving
+        the games columns column by column instead of through Game objects
 
-    def load_games_to_db(self, txt_path=None, overwrite=False):
+        :param table: pyarrow Table with the columns of landing.GAME_SCHEMA
+        :param overwrite: Update every game that already exists
+        :param update_finished: Update existing unfinished games that have now finished
+        :returns: Set of dates played of the games inserted or updated
+        """
+        if table.num_rows == 0:
+            return set()
+        season_ids = self.season_ids(pc.unique(table["seasonID"]).to_pylist())
+        team_ids = self.team_ids(
+            set(pc.unique(table["homeAbbrev"]).to_pylist())
+            | set(pc.unique(table["awayAbbrev"]).to_pylist())
+        )
+        rows = game_rows_from_table(table, season_ids, team_ids).to_pylist()
+        return self.load_game_rows(rows, overwrite, update_finished)
+
+    def load_game_rows(self, rows, overwrite=False, update_finished=True):
+        """
+        Insert new games and update games that have finished since they were loaded,
+        using a fixed number of statements however many games there are. On
+        PostgreSQL the games are copied to a staging table and merged in one statement.
+        The team game history of every changed game is brought up to date.
+
+        :param rows: Dicts of games column values, as returned by game_row
+        :param overwrite: Update every game that already exists
+        :param update_finished: Update existing unfinished games that have now finished
+        :returns: Set of dates played of the games inserted or updated
+        """
+        rows = {int(row["apiID"]): row for row in rows}
+        if not rows:
+            return set()
+        if self.engine.dialect.name == "postgresql":
+            with self.engine.begin() as connection:
+                inserted, updated = merge_games(
+                    connection, rows.values(), overwrite, update_finished
+                )
+                update_team_game_history(connection, inserted + updated)
+            logger.info(f"Inserted {len(inserted)} games and updated {len(updated)} games")
+            notify_prediction_listeners()
+            return {rows[int(api_id)]["datePlayed"] for api_id in inserted + updated}
+
+        with self.engine.connect() as connection:
+            existing = dict(connection.execute(select(Games.apiID, Games.outcome)).all())
+
+        new_rows = []
+        updated_rows = []
+        for api_id, row in rows.items():
+            if api_id not in existing:
+                new_rows.append(row)
+                continue
+            unfinished = existing[api_id] in (None, -1)
+            completed = (
+                row["homeTeamGoals"] is not None and row["awayTeamGoals"] is not None
+            )
+            if overwrite or (update_finished and unfinished and completed):
+                updated_rows.append(
+                    {
+                        "game_api_id": api_id,
+                        "home_goals": row["homeTeamGoals"],
+                        "away_goals": row["awayTeamGoals"],
+                        "game_outcome": row["outcome"],
+                        "in_ot": row["inOT"],
+                        "last_period_type": row["lastPeriodTypeID"],
+                        "home_points": row["homeTeamPointsAwarded"],
+                        "away_points": row["awayTeamPointsAwarded"],
+                    }
+                )
+
+        games_table = Games.__table__
+        update_stmt = (
+            update(games_table)
+            .where(games_table.c.apiID == bindparam("game_api_id"))
+            .values(
+                homeTeamGoals=bindparam("home_goals"),
+                awayTeamGoals=bindparam("away_goals"),
+                outcome=bindparam("game_outcome"),
+                inOT=bindparam("in_ot"),
+                lastPeriodTypeID=bindparam("last_period_type"),
+                homeTeamPointsAwarded=bindparam("home_points"),
+                awayTeamPointsAwarded=bindparam("away_points"),
+            )
+        )
+        with self.engine.begin() as connection:
+            if new_rows:
+                connection.execute(insert(games_table), new_rows)
+            if updated_rows:
+                connection.execute(update_stmt, updated_rows)
+            update_team_game_history(
+                connection,
+                [row["apiID"] for row in new_rows]
+                + [row["game_api_id"] for row in updated_rows],
+            )
+        logger.info(f"Inserted {len(new_rows)} games and updated {len(updated_rows)} games")
+        notify_prediction_listeners()
+        return {row["datePlayed"] for row in new_rows} | {
+            rows[row["game_api_id"]]["datePlayed"] for row in updated_rows
+        }
+
+    def read_games(self, txt_path):
+        """
+        Read games written by the download stage to a text file
+
+        :param txt_path: Path to games text file
+        :returns: List of Game objects
+        """
+        with open(txt_path, "r") as f:
+            return [Game.from_csv_line(line) for line in f]
+
+    def backfill_team_game_history(self):
+        """
+        Build the team game history of every game if the table is empty, e.g. for
+        a db created before the table existed
+        """
+        with self.engine.begin() as connection:
+            has_history = connection.execute(select(TeamGameHistory.gameID).limit(1)).first()
+            has_games = connection.execute(select(Games.id).limit(1)).first()
+            if has_games and not has_history:
+                logger.info("Building team game history for existing games")
+                update_team_game_history(connection)
+
+    def load_games_to_db(self, txt_path=None, overwrite=False, landing_format="txt"):
         """
         Load games from txt to db
+
+        :returns: Set of dates played of the games inserted or updated
         """
+        self.backfill_team_game_history()
+
+        if landing_format == "parquet":
+
+            def load(txt_path, **kwargs):
+                table = read_landing_games(landing_path(txt_path))
+                return self.load_games_table(table, **kwargs)
+
+        else:
+
+            def load(txt_path, **kwargs):
+                return self.load_games(self.read_games(txt_path), **kwargs)
+
         # Completed games
         if not txt_path:
             txt_path = f"{self.txt_dir}/games_completed.txt"
-        with open(txt_path, "r") as f:
-            for line in f.readlines():
-                game = Game.from_csv_line(line)
-                exists_out = self.check_game_exists(game)
-                if not exists_out:
-                    self.insert_game(game)
-                else:
-                    api_id, outcome = exists_out
-                    if outcome is None or overwrite:
-                        self.update_game(game)
-                    else:
-                        logger.debug(
-                            f"Game with ID {api_id} already exists in db with outcome {outcome}, skipping"
-                        )
+        changed_dates = load(txt_path, overwrite=overwrite)
 
-        # Today's games
-        txt_path = f"{self.txt_dir}/games_today.txt"
-        with open(txt_path, "r") as f:
-            for line in f.readlines():
-                game = Game.from_csv_line(line)
-                exists_out = self.check_game_exists(game)
-                if not exists_out:
-                    self.insert_game(game)
-                else:
-                    api_id, outcome = exists_out
-                    logger.debug(
-                        f"Game with ID {api_id} already exists in db with outcome {outcome}, skipping"
-                    )
-
-        # All games
-        txt_path = f"{self.txt_dir}/games_all.txt"
-        with open(txt_path, "r") as f:
-            for line in f.readlines():
-                game = Game.from_csv_line(line)
-                exists_out = self.check_game_exists(game)
-                if not exists_out:
-                    self.insert_game(game)
-                else:
-                    api_id, outcome = exists_out
-                    logger.debug(
-                        f"Game with ID {api_id} already exists in db with outcome {outcome}, skipping"
-                    )
+        # Today's games, then all games, are only inserted if missing
+        for file_name in ("games_today.txt", "games_all.txt"):
+            changed_dates |= load(f"{self.txt_dir}/{file_name}", update_finished=False)
+        return changed_dates
 
     def load_players(self, txt_path=None):
         """
@@ -283,22 +606,27 @@ class SQLHandler:
         """
         if not txt_path:
             txt_path = f"{self.txt_dir}/players.txt"
-        with open(txt_path) as f, self.engine.begin() as connection:
+        rows = []
+        with open(txt_path) as f:
             for line in f.readlines():
                 api_id, full_name, first_name, last_name, number, position = (
                     split_csv_line(line)
                 )
-                stmt = insert(Players).values(
-                    apiID=api_id,
-                    name=full_name,
-                    firstName=first_name,
-                    lastName=last_name,
-                    number=number,
-                    position=position,
+                rows.append(
+                    {
+                        "apiID": api_id,
+                        "name": full_name,
+                        "firstName": first_name,
+                        "lastName": last_name,
+                        "number": number,
+                        "position": position,
+                    }
                 )
-                # sql = f'''INSERT INTO players(apiID, name, firstName, lastName, number, position)
-                #        VALUES("{api_id}", "{full_name}", "{first_name}", "{last_name}", "{number}", "{position}")'''
-                connection.execute(stmt)
+        with self.engine.begin() as connection:
+            if self.engine.dialect.name == "postgresql":
+                merge_players(connection, rows)
+            elif rows:
+                connection.execute(insert(Players), rows)
 
     def load_roster_entries(self, txt_path=None):
         """
@@ -306,7 +634,8 @@ class SQLHandler:
         """
         if not txt_path:
             txt_path = f"{self.txt_dir}/rosterEntries.txt"
-        with open(txt_path, "r") as f, self.engine.begin() as connection:
+        rows = []
+        with open(txt_path, "r") as f:
             for line in f.readlines():
                 line = [entry.strip() for entry in line.split(",")]
                 (
@@ -318,7 +647,28 @@ class SQLHandler:
                     start_year,
                     end_year,
                 ) = line
+                rows.append(
+                    {
+                        "apiID": api_id,
+                        "teamAbbrev": team_abbrev,
+                        "seasonID": year,
+                        "firstName": first_name,
+                        "lastName": last_name,
+                        "startYear": start_year,
+                        "endYear": end_year,
+                    }
+                )
+
+        if self.engine.dialect.name == "postgresql":
+            with self.engine.begin() as connection:
+                merge_roster_entries(connection, rows)
+            return
 
+        with self.engine.begin() as connection:
+            for row in rows:
+                team_abbrev = row["teamAbbrev"]
+                first_name = row["firstName"]
+                last_name = row["lastName"]
                 team_id_stmt = select(Teams.id).where(Teams.nameAbbrev == team_abbrev)
                 team_id_res = connection.execute(team_id_stmt).first()
                 if not team_id_res:
@@ -338,12 +688,12 @@ class SQLHandler:
                 player_id = player_id_res[0]
 
                 insert_stmt = insert(RosterEntries).values(
-                    apiID=api_id,
+                    apiID=row["apiID"],
                     playerID=player_id,
                     teamID=team_id,
-                    seasonID=year,
-                    startYear=start_year,
-                    endYear=end_year,
+                    seasonID=row["seasonID"],
+                    startYear=row["startYear"],
+                    endYear=row["endYear"],
                 )
                 connection.execute(insert_stmt)
 
@@ -387,33 +737,101 @@ class SQLHandler:
     def load_predicters(self, predicters):
         """
         Load predicters from config.yaml to db
+
+        :returns: IDs of registered predicters whose active flag changed
         """
+        with self.engine.connect() as connection:
+            registered = {
+                name: (predicter_id, bool(active))
+                for predicter_id, name, active in connection.execute(
+                    select(
+                        PredicterRegister.id,
+                        PredicterRegister.predicterName,
+                        PredicterRegister.active,
+                    )
+                )
+            }
+        changed_ids = []
         for predicter in predicters:
             name = predicter["name"]
             class_name = predicter["class_name"]
             active = predicter.get("active", True)
             self.add_predicter_to_register(name, class_name, active=active)
+            if name in registered and registered[name][1] != bool(active):
+                changed_ids.append(registered[name][0])
+        return changed_ids
 
-    def query(self, sql, params=None):
+    def query(self, sql, params=None, chunksize=None, as_arrow=False):
         """
         Query the database with the given SQL statement or selectable.
 
         :param sql: SQL string, SQLAlchemy text(), or SQLAlchemy selectable
         :param params: optional dict of parameters
-        :return: DataFrame with queried data
+        :param chunksize: If set, return an iterator of chunks with at most this many rows
+            read through a server-side cursor, so the full result is never held in memory
+        :param as_arrow: Return a pyarrow Table (or RecordBatches when chunked) instead of DataFrames
+        :return: DataFrame with queried data, or iterator of chunks if chunksize is set
         """
         logger.debug(f"About to query: {sql}")
         logger.debug(f"engine: {self.engine}")
+        if chunksize is not None:
+            return self.query_chunks(sql, params, chunksize, as_arrow)
+        if as_arrow:
+            return self.query_arrow(sql, params)
         df = pd.read_sql(sql, self.engine, params=params)
         return df
 
-    def query_games(self, start_date=None, end_date=today_date):
+    def query_arrow(self, sql, params=None):
+        """
+        Query the database into a pyarrow Table, through ADBC or connectorx if
+        installed so that no Python object is created per value
+
+        :param sql: SQL string, SQLAlchemy text(), or SQLAlchemy selectable
+        :param params: optional dict of parameters
+        :return: pyarrow.Table with queried data
+        """
+        return read_arrow(self.engine, sql, params)
+
+    def query_chunks(self, sql, params=None, chunksize=10000, as_arrow=False):
+        """
+        Yield the result of a query in chunks read through a server-side cursor
+
+        :param sql: SQL string, SQLAlchemy text(), or SQLAlchemy selectable
+        :param params: optional dict of parameters
+        :param chunksize: Maximum number of rows per chunk
+        :param as_arrow: Yield pyarrow RecordBatches instead of DataFrames. Every batch
+            has the column types of the statement, so a column that is all NULL in
+            one chunk keeps its type. Columns of text SQL, whose types are not
+            known, take the type of the first chunk
+        """
+        schema = None
+        column_types = result_schema(sql) if as_arrow else {}
+        with self.engine.connect() as connection:
+            connection = connection.execution_options(stream_results=True)
+            for chunk in pd.read_sql(sql, connection, params=params, chunksize=chunksize):
+                if not as_arrow:
+                    yield chunk
+                    continue
+                if schema is None:
+                    inferred = pa.Schema.from_pandas(chunk, preserve_index=False)
+                    schema = pa.schema(
+                        [
+                            field.with_type(column_types.get(field.name, field.type))
+                            for field in inferred
+                        ]
+                    )
+                yield pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+
+    def query_games(self, start_date=None, end_date=today_date, chunksize=None, as_arrow=False):
         """
         Export games information with recency selection
+
+        :param chunksize: If set, return an iterator of chunks with at most this many games
+        :param as_arrow: Return pyarrow data instead of DataFrames
         """
         select_stmt = games_select(start_date, end_date)
         logger.debug(select_stmt)
-        games = self.query(select_stmt)
+        games = self.query(select_stmt, chunksize=chunksize, as_arrow=as_arrow)
         return games
 
     def query_games_with_predictions(self, start_date, end_date=None):
@@ -428,13 +846,136 @@ class SQLHandler:
             games_with_preds = connection.execute(select_stmt).fetchall()
         return games_with_preds
 
+    async def query_games_with_predictions_async(self, start_date, end_date=None):
+        """
+        Same as query_games_with_predictions on the asyncio engine, so the
+        event loop is not blocked while the query runs
+        """
+        if end_date is None:
+            end_date = start_date
+        select_stmt = games_with_predictions_select(start_date, end_date)
+        async with self.async_engine.connect() as connection:
+            result = await connection.execute(select_stmt)
+            return result.fetchall()
+
+    def data_version(self):
+        """
+        Value that changes whenever the games, predictions or predicters do, to
+        detect changes made by other processes
+
+        :returns: Tuple of the values of data_version_select
+        """
+        dialect = self.engine.dialect.name
+        if dialect != "sqlite":
+            with self.engine.connect() as connection:
+                return tuple(connection.execute(data_version_select(dialect)).one())
+        # PRAGMA data_version is per connection, so keep one open for it
+        with self.version_lock:
+            if self.version_connection is None:
+                self.version_connection = self.engine.connect()
+            result = self.version_connection.execute(data_version_select(dialect))
+            version = tuple(result.one())
+            self.version_connection.rollback()
+        return version
+
+    async def data_version_async(self):
+        """
+        Same as data_version on the asyncio engine
+        """
+        if self.engine.dialect.name == "sqlite":
+            # Only reads a counter from the open connection, so it does not block
+            return self.data_version()
+        async with self.async_engine.connect() as connection:
+            result = await connection.execute(
+                data_version_select(self.async_engine.dialect.name)
+            )
+            return tuple(result.one())
+
+    def content_version(self):
+        """
+        Aggregates of the games, predictions and predicters, which are the same
+        in every process for the same data
+
+        :returns: Tuple of aggregates
+        """
+        with self.engine.connect() as connection:
+            return tuple(connection.execute(content_version_select()).one())
+
+    async def content_version_async(self):
+        """
+        Same as content_version on the asyncio engine
+        """
+        async with self.async_engine.connect() as connection:
+            result = await connection.execute(content_version_select())
+            return tuple(result.one())
+
+    def close(self):
+        """
+        Close the connection kept open for data_version
+        """
+        with self.version_lock:
+            if self.version_connection is not None:
+                self.version_connection.close()
+                self.version_connection = None
+
+    def stream_games_with_predictions(self, chunksize=1000, **filters):
+        """
+        Games with predictions read through a server-side cursor
+
+        :param chunksize: Number of rows per chunk
+        :param filters: Keyword arguments of games_with_predictions_select
+        :returns: Generator of lists of rows
+        """
+        select_stmt = games_with_predictions_select(**filters)
+        with self.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True).execute(
+                select_stmt
+            )
+            yield from result.partitions(chunksize)
+
+    async def stream_games_with_predictions_async(self, chunksize=1000, **filters):
+        """
+        Same as stream_games_with_predictions on the asyncio engine
+        """
+        select_stmt = games_with_predictions_select(**filters)
+        async with self.async_engine.connect() as connection:
+            result = await connection.stream(select_stmt)
+            async for rows in result.partitions(chunksize):
+                yield rows
+
+    def season_prediction_dates(self, dates):
+        """
+        Dates with predictions in every season that contains one of dates
+
+        :param dates: Dates whose seasons are listed
+        :returns: Dict of season API ID to list of (date, number of games) tuples,
+            empty for seasons left without active predictions
+        """
+        seasons_stmt = (
+            select(Seasons.apiID)
+            .join(Games, Games.seasonID == Seasons.id)
+            .where(Games.datePlayed.in_(list(dates)))
+            .distinct()
+        )
+        seasons = defaultdict(list)
+        with self.engine.connect() as connection:
+            for season_id in connection.execute(seasons_stmt).scalars():
+                seasons[season_id] = []
+            for season_id, date_played, games in connection.execute(
+                season_prediction_dates_select(dates)
+            ):
+                seasons[season_id].append((date_played, games))
+        return dict(seasons)
+
     def get_earliest_date_played(self):
         """
-        Get game in db with earliest datePlayed.
+        Get the earliest datePlayed of the games returned by query_games.
         """
-        games = self.query_games()
-        games_ordered = games.sort_values(by="datePlayed")
-        earliest_date = games_ordered["datePlayed"][0]
+        stmt = select(func.min(Games.datePlayed)).where(
+            Games.outcome >= 0, Games.datePlayed <= today_date
+        )
+        with self.engine.connect() as connection:
+            earliest_date = connection.execute(stmt).scalar()
         return pd.to_datetime(earliest_date)
 
     def record_game_prediction(self, game_id, predicter_id, prediction):
@@ -452,9 +993,30 @@ class SQLHandler:
         upsert(
             self.engine, GamePredictions.__table__, values, ["gameID", "predicterID"]
         )
+        notify_prediction_listeners()
 
     def record_game_predictions(self, predicter_id, games: pd.DataFrame) -> None:
-        games.apply(lambda row: self.record_game_prediction(row['id'], predicter_id, row['preds']), axis=1)
+        """
+        Log the predictions of one predicter run to the database in one transaction
+
+        :param predicter_id: ID of predicter in predicterRegister
+        :param games: DataFrame with game IDs in column id and predictions in column preds
+        """
+        predictions = games["preds"].astype(float)
+        rows = [
+            {
+                "gameID": int(game_id),
+                "predicterID": predicter_id,
+                "prediction": prediction,
+                "predictionBinary": int(prediction >= 0.5),
+                "predictionDate": today_date,
+            }
+            for game_id, prediction in zip(games["id"], predictions)
+        ]
+        upsert_many(
+            self.engine, GamePredictions.__table__, rows, ["gameID", "predicterID"]
+        )
+        notify_prediction_listeners()
 
     def add_predicter_to_register(
         self, name, predicter_class_name, path="", active=True
@@ -546,6 +1108,24 @@ class SQLHandler:
             res = connection.execute(stmt).first()
         return res[0] if res else None
 
+    def get_prediction_dates(self, predicter_ids):
+        """
+        Dates played of the games predicted by any of the predicters
+
+        :param predicter_ids: IDs of predicters
+        :returns: Set of dates
+        """
+        if not predicter_ids:
+            return set()
+        stmt = (
+            select(Games.datePlayed)
+            .join(GamePredictions, Games.id == GamePredictions.gameID)
+            .where(GamePredictions.predicterID.in_(list(predicter_ids)))
+            .distinct()
+        )
+        with self.engine.connect() as connection:
+            return set(connection.execute(stmt).scalars())
+
     def get_last_prediction_date(self, predicter_id):
         """
         Read the date of the latest prediction for a predicter
@@ -591,10 +1171,10 @@ class SQLHandler:
 
     def wins_to_date(self, team_id: int, date: date) -> int:
         stmt = select(
-            GamesHistoryView.prevWonNum
+            TeamGameHistory.prevWonNum
         ).where(
-            team_id == GamesHistoryView.teamID,
-            date == GamesHistoryView.datePlayed
+            team_id == TeamGameHistory.teamID,
+            date == TeamGameHistory.datePlayed
         )
         with self.engine.connect() as connection:
             wins = connection.execute(stmt).first()
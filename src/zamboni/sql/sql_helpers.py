@@ -5,6 +5,9 @@ from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from zamboni.db_con import DBConnector
 
+# Bound parameters allowed in one statement; SQLite before 3.32 allows only 999
+max_bound_parameters = {"sqlite": 999, "postgresql": 32767}
+
 
 def upsert(engine, table, values, primary_key_columns):
     """
@@ -64,6 +67,69 @@ def upsert(engine, table, values, primary_key_columns):
             return connection.execute(stmt)
 
 
+def upsert_many(engine, table, rows, primary_key_columns, chunk_size=None):
+    """
+    Upsert many rows in one transaction using multi-row INSERT statements.
+
+    - For PostgreSQL and SQLite, each chunk of rows is written with one
+      insert(...).values([...]).on_conflict_do_update(...), setting the
+      non-key columns from the excluded row.
+    - For other backends, each row is inserted inside a savepoint and updated
+      instead on IntegrityError.
+
+    Parameters
+    - engine: SQLAlchemy Engine
+    - table: SQLAlchemy Table or declarative-mapped table
+    - rows: list of dicts of column -> value, all with the same keys
+    - primary_key_columns: list of column names (strings) or Column objects
+    - chunk_size: maximum number of rows per statement, defaults to as many
+      as keep the bound parameters within max_bound_parameters
+
+    Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+    dialect = engine.dialect.name
+    pk_names = [getattr(col, "name", col) for col in primary_key_columns]
+    update_names = [name for name in rows[0] if name not in pk_names]
+
+    with engine.begin() as connection:
+        if dialect in ("postgresql", "sqlite"):
+            insert_func = pg_insert if dialect == "postgresql" else sqlite_insert
+            rows_per_statement = max(1, max_bound_parameters[dialect] // len(rows[0]))
+            if chunk_size is not None:
+                rows_per_statement = min(chunk_size, rows_per_statement)
+            chunk_size = rows_per_statement
+            for start in range(0, len(rows), chunk_size):
+                stmt = insert_func(table).values(rows[start : start + chunk_size])
+                if update_names:
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=pk_names,
+                        set_={name: stmt.excluded[name] for name in update_names},
+                    )
+                else:
+                    stmt = stmt.on_conflict_do_nothing(index_elements=pk_names)
+                connection.execute(stmt)
+            return len(rows)
+
+        # Fallback for other dialects: insert, on unique constraint conflict update
+        for values in rows:
+            try:
+                with connection.begin_nested():
+                    connection.execute(insert(table).values(**values))
+            except IntegrityError:
+                if not update_names:
+                    continue
+                where_clause = and_(
+                    *[getattr(table.c, pk) == values[pk] for pk in pk_names]
+                )
+                update_values = {name: values[name] for name in update_names}
+                connection.execute(
+                    update(table).where(where_clause).values(**update_values)
+                )
+    return len(rows)
+
+
 def days_games(days_date=date.today()):
     db_connector = DBConnector()
     db_con = db_connector.connect_db()
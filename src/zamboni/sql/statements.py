@@ -42,24 +42,23 @@
 # }
 
 # Provide a callable factory to construct a selectable for games with predictions
-from sqlalchemy import select, case
+from sqlalchemy import bindparam, case, select, text
 from sqlalchemy.orm import aliased
-from sqlalchemy.sql import and_, func
+from sqlalchemy.sql import and_, or_, func
 from .tables import (
     Games,
     Teams,
     GamePredictions,
     PredicterRegister,
-    GamesPrevSameOppView,
-    GamesHistoryView,
+    TeamGameHistory,
+    Seasons,
 )
 
 
 def games_select(start_date, end_date):
     """Provide a selectable for games within date range to be used for training"""
-    hgh = aliased(GamesHistoryView, name="hgh")
-    agh = aliased(GamesHistoryView, name="agh")
-    gpso = aliased(GamesPrevSameOppView, name="gpso")
+    hgh = aliased(TeamGameHistory, name="hgh")
+    agh = aliased(TeamGameHistory, name="agh")
     stmt = (
         select(
             Games.id,
@@ -73,9 +72,9 @@ def games_select(start_date, end_date):
             agh.prevGoalsPerGame.label("awayPrevGoalsPerGame"),
             agh.prevOppGoalsPerGame.label("awayPrevOppGoalsPerGame"),
             (agh.prevNum + 1).label("awayGameOfSeason"),
-            func.coalesce(gpso.prevOutcome, 0).label("prevMatchupOutcome"),
-            func.coalesce(gpso.prevInOT, 0).label("prevMatchupInOT"),
-            (case((gpso.prevOutcome.is_(None), 0), else_=1)).label(
+            func.coalesce(hgh.prevMatchupOutcome, 0).label("prevMatchupOutcome"),
+            func.coalesce(hgh.prevMatchupInOT, 0).label("prevMatchupInOT"),
+            (case((hgh.prevMatchupGameID.is_(None), 0), else_=1)).label(
                 "hasPreviousMatchup"
             ),
             Games.outcome,
@@ -93,7 +92,6 @@ def games_select(start_date, end_date):
             and_(Games.id == agh.gameID, Games.awayTeamID == agh.teamID),
             isouter=True,
         )
-        .join(gpso, Games.id == gpso.gameID, isouter=True)
         .where(Games.outcome >= 0)
     )
     if start_date:
@@ -105,8 +103,17 @@ def games_select(start_date, end_date):
     return stmt
 
 
-def games_with_predictions_select(start_date, end_date):
-    """Provide a selectable for games with predictions within date range"""
+def games_with_predictions_select(
+    start_date=None, end_date=None, predicter_name=None, team_abbrev=None
+):
+    """
+    Provide a selectable for games with predictions within date range
+
+    :param start_date: Earliest date played, or None for no lower bound
+    :param end_date: Latest date played, or None for no upper bound
+    :param predicter_name: Only include predictions of this predicter
+    :param team_abbrev: Only include games of the team with this abbreviation
+    """
     home = aliased(Teams, name="home")
     away = aliased(Teams, name="away")
     stmt = (
@@ -132,12 +139,103 @@ def games_with_predictions_select(start_date, end_date):
         .join(home, Games.homeTeamID == home.id)
         .join(away, Games.awayTeamID == away.id)
         .where(PredicterRegister.active == 1)
-        .where(Games.datePlayed >= start_date)
-        .where(Games.datePlayed <= end_date)
+        .order_by(Games.datePlayed, Games.id, PredicterRegister.predicterName)
+    )
+    if start_date is not None:
+        stmt = stmt.where(Games.datePlayed >= start_date)
+    if end_date is not None:
+        stmt = stmt.where(Games.datePlayed <= end_date)
+    if predicter_name is not None:
+        stmt = stmt.where(PredicterRegister.predicterName == predicter_name)
+    if team_abbrev is not None:
+        stmt = stmt.where(
+            or_(home.nameAbbrev == team_abbrev, away.nameAbbrev == team_abbrev)
+        )
+    return stmt
+
+
+def season_prediction_dates_select(dates):
+    """
+    Provide a selectable for the dates with active predictions in the seasons
+    that contain any of dates, with the number of games predicted on each
+
+    :param dates: Dates whose seasons are listed
+    """
+    seasons = (
+        select(Games.seasonID).where(Games.datePlayed.in_(list(dates))).distinct()
+    )
+    stmt = (
+        select(
+            Seasons.apiID,
+            Games.datePlayed,
+            func.count(func.distinct(Games.id)).label("games"),
+        )
+        .select_from(Games)
+        .join(Seasons, Games.seasonID == Seasons.id)
+        .join(GamePredictions, Games.id == GamePredictions.gameID)
+        .join(PredicterRegister, GamePredictions.predicterID == PredicterRegister.id)
+        .where(PredicterRegister.active == 1)
+        .where(Games.seasonID.in_(seasons.scalar_subquery()))
+        .group_by(Seasons.apiID, Games.datePlayed)
+        .order_by(Seasons.apiID, Games.datePlayed)
     )
     return stmt
 
 
+def data_version_select(dialect):
+    """
+    Provide a cheap statement whose result changes whenever games, predictions or
+    predicters change, so a process can tell that another one changed the db.
+    On SQLite this is PRAGMA data_version, which only changes for commits made
+    through other connections, so it must always run on the same connection.
+    On PostgreSQL it is the number of rows written to the tables, from the
+    statistics collector, which can lag commits by about a second.
+
+    :param dialect: Name of SQLAlchemy dialect
+    """
+    if dialect == "sqlite":
+        return text("PRAGMA data_version")
+    if dialect == "postgresql":
+        return text(
+            "SELECT COALESCE(SUM(n_tup_ins + n_tup_upd + n_tup_del), 0) "
+            "FROM pg_stat_user_tables WHERE relname IN :tables"
+        ).bindparams(
+            bindparam(
+                "tables",
+                [
+                    Games.__tablename__,
+                    GamePredictions.__tablename__,
+                    PredicterRegister.__tablename__,
+                ],
+                expanding=True,
+            )
+        )
+    # Other backends aggregate the tables themselves
+    return content_version_select()
+
+
+def content_version_select():
+    """
+    Provide a selectable of aggregates of games, predictions and active predicters.
+    Unlike data_version_select, every process gets the same result for the same
+    data, but it reads the whole tables.
+    """
+    goals = func.coalesce(Games.homeTeamGoals, 0) + func.coalesce(Games.awayTeamGoals, 0)
+    active_ids = case((PredicterRegister.active == 1, PredicterRegister.id), else_=0)
+    return select(
+        select(func.count(Games.id)).scalar_subquery().label("games"),
+        select(func.sum(goals)).scalar_subquery().label("goals"),
+        select(func.count(GamePredictions.gameID)).scalar_subquery().label("predictions"),
+        select(func.sum(GamePredictions.prediction))
+        .scalar_subquery()
+        .label("predictionSum"),
+        select(func.max(GamePredictions.predictionDate))
+        .scalar_subquery()
+        .label("lastPredictionDate"),
+        select(func.sum(active_ids)).scalar_subquery().label("activePredicters"),
+    )
+
+
 # Replace the placeholder None with the callable factory so callers can detect it
 # export_statements["games_with_predictions"] = games_with_predictions_select
 # export_statements["games"] = games_select
@@ -1,7 +1,9 @@
+import hashlib
 import logging
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from .tables import Base, table_classes, view_classes
-from .view_statements import create_view_statement, drop_view_statement
+from .view_statements import create_view_statement, drop_view_statement, view_select
 
 logger = logging.getLogger(__name__)
 
@@ -38,9 +40,79 @@ class TableCreator:
             connection.execute(text(drop_statement))
 
     def create_view(self, view_name):
-        create_statement = create_view_statement(view_name, self.con.dialect.name)
+        dialect = self.con.dialect.name
+        create_statement = create_view_statement(view_name, dialect)
         with self.con.begin() as connection:
             connection.execute(text(create_statement))
+            if dialect == "postgresql":
+                # PostgreSQL normalises the stored definition, so keep a digest
+                # of the statement to compare against
+                digest = self.view_digest(view_name)
+                connection.execute(text(f"COMMENT ON VIEW {view_name} IS '{digest}'"))
+
+    def view_digest(self, view_name):
+        select = view_select(view_name, self.con.dialect.name)
+        return hashlib.sha256(select.encode()).hexdigest()
+
+    def view_is_current(self, view_name):
+        """
+        Check whether a view exists in the db with the current definition
+
+        :param view_name: Name of view
+        """
+        dialect = self.con.dialect.name
+        with self.con.connect() as connection:
+            if dialect == "sqlite":
+                stored = connection.execute(
+                    text(
+                        "SELECT sql FROM sqlite_master "
+                        "WHERE type = 'view' AND name = :name"
+                    ),
+                    {"name": view_name},
+                ).scalar()
+                select = view_select(view_name, dialect).rstrip()
+                return stored is not None and stored.rstrip().endswith(select)
+            if dialect == "postgresql":
+                stored = connection.execute(
+                    text("SELECT obj_description(to_regclass(:name), 'pg_class')"),
+                    {"name": view_name},
+                ).scalar()
+                return stored == self.view_digest(view_name)
+        return False
+
+    def create_views(self):
+        """
+        Create missing views and recreate views whose definition changed. Views
+        are in dependency order, so every view after the first changed one is
+        dropped and recreated as well
+        """
+        view_names = list(view_classes.keys())
+        stale = [name for name in view_names if not self.view_is_current(name)]
+        if not stale:
+            return
+        recreate = view_names[view_names.index(stale[0]) :]
+        for view_name in recreate[::-1]:
+            self.drop_view(view_name)
+        for view_name in recreate:
+            logger.info(f"Creating view {view_name}")
+            self.create_view(view_name)
+
+    def create_indexes(self, table_list):
+        """
+        Create indexes declared on the models that are missing, e.g. on tables
+        created before the index was added
+
+        :param table_list: Tables whose indexes are created
+        """
+        for table in table_list:
+            for index in sorted(table.indexes, key=lambda index: index.name):
+                try:
+                    index.create(self.con, checkfirst=True)
+                except IntegrityError as e:
+                    logger.warning(
+                        f"Could not create unique index {index.name} on {table.name}, "
+                        f"remove duplicate rows and run again: {e}"
+                    )
 
     def drop_all(self, table_list=None):
         view_names = list(view_classes.keys())
@@ -62,9 +134,8 @@ class TableCreator:
             self.drop_all(table_list=table_list)
         logging.info("Creating tables")
         Base.metadata.create_all(self.con, tables=table_list)
-        for view_name in view_classes.keys():
-            logging.info(f"Creating view {view_name}")
-            self.create_view(view_name)
+        self.create_indexes(table_list)
+        self.create_views()
 
     # def create_table(self, table_name, recreate=False, is_view=False):
     #    """
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, Text, Date, Time, Float, Boolean, ForeignKey
+from sqlalchemy import Integer, Text, Date, Time, Float, Boolean, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, DeclarativeBase
 
 
@@ -8,6 +8,10 @@ class Base(DeclarativeBase):
 
 class Players(Base):
     __tablename__ = "players"
+    __table_args__ = (
+        Index("ix_players_apiID", "apiID"),
+        Index("ix_players_name", "firstName", "lastName"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     apiID: Mapped[int] = mapped_column(Integer)
@@ -31,6 +35,13 @@ class Teams(Base):
 
 class Games(Base):
     __tablename__ = "games"
+    __table_args__ = (
+        Index("uq_games_apiID", "apiID", unique=True),
+        Index("ix_games_datePlayed", "datePlayed"),
+        Index("ix_games_home_season_date", "homeTeamID", "seasonID", "datePlayed"),
+        Index("ix_games_away_season_date", "awayTeamID", "seasonID", "datePlayed"),
+        Index("ix_games_season_type_date", "seasonID", "gameTypeID", "datePlayed"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     apiID: Mapped[int] = mapped_column(Integer)
@@ -63,6 +74,9 @@ class Seasons(Base):
 
 class RosterEntries(Base):
     __tablename__ = "rosterEntries"
+    __table_args__ = (
+        Index("ix_rosterEntries_player_team_season", "apiID", "teamID", "seasonID"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     apiID: Mapped[int] = mapped_column(Integer)
@@ -98,6 +112,9 @@ class PredicterRegister(Base):
 
 class GamePredictions(Base):
     __tablename__ = "gamePredictions"
+    __table_args__ = (
+        Index("ix_gamePredictions_predicter_date", "predicterID", "predictionDate"),
+    )
 
     gameID: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False)
     predicterID: Mapped[int] = mapped_column(Integer, primary_key=True, nullable=False)
@@ -106,6 +123,33 @@ class GamePredictions(Base):
     predictionDate: Mapped[Date] = mapped_column(Date)
 
 
+class TeamGameHistory(Base):
+    __tablename__ = "team_game_history"
+    __table_args__ = (
+        Index("ix_team_game_history_team_season_date", "teamID", "seasonID", "datePlayed"),
+    )
+
+    gameID: Mapped[int] = mapped_column(ForeignKey("games.id"), primary_key=True)
+    teamID: Mapped[int] = mapped_column(ForeignKey("teams.id"), primary_key=True)
+    oppTeamID: Mapped[int] = mapped_column(Integer)
+    seasonID: Mapped[int] = mapped_column(Integer)
+    gameTypeID: Mapped[int | None] = mapped_column(Integer)
+    datePlayed: Mapped[Date] = mapped_column(Date)
+    won: Mapped[int] = mapped_column(Integer)
+    goals: Mapped[int | None] = mapped_column(Integer)
+    oppGoals: Mapped[int | None] = mapped_column(Integer)
+    pointsAwarded: Mapped[int | None] = mapped_column(Integer)
+    prevNum: Mapped[int] = mapped_column(Integer)
+    prevWonNum: Mapped[int] = mapped_column(Integer)
+    prevWonPercentage: Mapped[float] = mapped_column(Float)
+    prevGoalsPerGame: Mapped[float] = mapped_column(Float)
+    prevOppGoalsPerGame: Mapped[float] = mapped_column(Float)
+    pointsToDate: Mapped[int] = mapped_column(Integer)
+    prevMatchupGameID: Mapped[int | None] = mapped_column(Integer)
+    prevMatchupOutcome: Mapped[int | None] = mapped_column(Integer)
+    prevMatchupInOT: Mapped[bool | None] = mapped_column(Boolean)
+
+
 class GamesPerTeamView(Base):
     __tablename__ = "games_per_team"
 
@@ -169,6 +213,7 @@ table_class_names = [
     LastTraining,
     PredicterRegister,
     GamePredictions,
+    TeamGameHistory,
 ]
 table_classes = {cls.__tablename__: cls for cls in table_class_names}
 view_class_names = [
@@ -0,0 +1,182 @@
+import logging
+from collections import defaultdict
+from itertools import groupby
+
+from sqlalchemy import delete, insert, or_, select
+
+from .tables import Games, TeamGameHistory
+
+logger = logging.getLogger(__name__)
+
+history_table = TeamGameHistory.__table__
+
+
+def equal_or_null(column, value):
+    """
+    Comparison that also matches NULL when value is None
+    """
+    if value is None:
+        return column.is_(None)
+    return column == value
+
+
+def affected_teams(connection, api_ids=None, chunk_size=500):
+    """
+    Teams whose history changes because games were inserted or updated
+
+    :param connection: SQLAlchemy connection
+    :param api_ids: API IDs of changed games, or None for every game
+    :param chunk_size: Number of IDs per query
+    :returns: Dict of (seasonID, gameTypeID) to dict of teamID to the earliest changed date
+    """
+    stmt = select(
+        Games.seasonID,
+        Games.gameTypeID,
+        Games.homeTeamID,
+        Games.awayTeamID,
+        Games.datePlayed,
+    )
+    if api_ids is None:
+        results = [connection.execute(stmt).all()]
+    else:
+        api_ids = sorted({int(api_id) for api_id in api_ids})
+        results = [
+            connection.execute(
+                stmt.where(Games.apiID.in_(api_ids[start : start + chunk_size]))
+            ).all()
+            for start in range(0, len(api_ids), chunk_size)
+        ]
+
+    groups = defaultdict(dict)
+    for rows in results:
+        for season_id, game_type_id, home_team_id, away_team_id, date_played in rows:
+            teams = groups[(season_id, game_type_id)]
+            for team_id in (home_team_id, away_team_id):
+                if team_id not in teams or date_played < teams[team_id]:
+                    teams[team_id] = date_played
+    return groups
+
+
+def team_history_rows(games, team_id):
+    """
+    Running history of one team over the games of a season, matching the
+    games_history and games_prev_same_opp views
+
+    :param games: Rows of the season's games for the team, ordered by date
+    :param team_id: ID of team
+    :returns: List of dicts, one per game
+    """
+    rows = []
+    num = won_num = goals = opp_goals = points = 0
+    last_matchup = {}
+    # Only games on earlier dates count as previous games
+    for _, day_games in groupby(games, key=lambda game: game.datePlayed):
+        day_rows = []
+        for game in day_games:
+            home = game.homeTeamID == team_id
+            opp_team_id = game.awayTeamID if home else game.homeTeamID
+            denominator = max(num, 1)
+            matchup = last_matchup.get(opp_team_id)
+            row = {
+                "gameID": game.id,
+                "teamID": team_id,
+                "oppTeamID": opp_team_id,
+                "seasonID": game.seasonID,
+                "gameTypeID": game.gameTypeID,
+                "datePlayed": game.datePlayed,
+                "won": int(game.outcome == (1 if home else 0)),
+                "goals": game.homeTeamGoals if home else game.awayTeamGoals,
+                "oppGoals": game.awayTeamGoals if home else game.homeTeamGoals,
+                "pointsAwarded": (
+                    game.homeTeamPointsAwarded if home else game.awayTeamPointsAwarded
+                ),
+                "prevNum": num,
+                "prevWonNum": won_num,
+                "prevWonPercentage": won_num / denominator,
+                "prevGoalsPerGame": goals / denominator,
+                "prevOppGoalsPerGame": opp_goals / denominator,
+                "pointsToDate": points,
+                "prevMatchupGameID": matchup.id if matchup else None,
+                "prevMatchupOutcome": matchup.outcome if matchup else None,
+                "prevMatchupInOT": matchup.inOT if matchup else None,
+            }
+            day_rows.append((row, game))
+        for row, game in day_rows:
+            num += 1
+            won_num += row["won"]
+            goals += row["goals"] or 0
+            opp_goals += row["oppGoals"] or 0
+            points += row["pointsAwarded"] or 0
+            last_matchup[row["oppTeamID"]] = game
+            rows.append(row)
+    return rows
+
+
+def update_team_game_history(connection, api_ids=None):
+    """
+    Rewrite the history rows of every team affected by changed games, from the
+    earliest changed date onwards
+
+    :param connection: SQLAlchemy connection
+    :param api_ids: API IDs of inserted or updated games, or None to rebuild everything
+    :returns: Number of history rows written
+    """
+    if api_ids is not None and not api_ids:
+        return 0
+    groups = affected_teams(connection, api_ids)
+    written = 0
+    for (season_id, game_type_id), teams in groups.items():
+        team_ids = list(teams)
+        stmt = (
+            select(
+                Games.id,
+                Games.seasonID,
+                Games.gameTypeID,
+                Games.homeTeamID,
+                Games.awayTeamID,
+                Games.datePlayed,
+                Games.homeTeamGoals,
+                Games.awayTeamGoals,
+                Games.homeTeamPointsAwarded,
+                Games.awayTeamPointsAwarded,
+                Games.outcome,
+                Games.inOT,
+            )
+            .where(Games.seasonID == season_id)
+            .where(equal_or_null(Games.gameTypeID, game_type_id))
+            .where(
+                or_(Games.homeTeamID.in_(team_ids), Games.awayTeamID.in_(team_ids))
+            )
+            .order_by(Games.datePlayed, Games.id)
+        )
+        season_games = connection.execute(stmt).all()
+
+        rows = []
+        for team_id, start_date in teams.items():
+            team_games = [
+                game
+                for game in season_games
+                if team_id in (game.homeTeamID, game.awayTeamID)
+            ]
+            if game_type_id is None:
+                # NULL never equals NULL in the views' joins, so a game without a
+                # type has no previous games and no previous matchup
+                history = [
+                    row for game in team_games for row in team_history_rows([game], team_id)
+                ]
+            else:
+                history = team_history_rows(team_games, team_id)
+            rows.extend(row for row in history if row["datePlayed"] >= start_date)
+            connection.execute(
+                delete(history_table).where(
+                    history_table.c.teamID == team_id,
+                    history_table.c.seasonID == season_id,
+                    equal_or_null(history_table.c.gameTypeID, game_type_id),
+                    history_table.c.datePlayed >= start_date,
+                )
+            )
+        if rows:
+            connection.execute(insert(history_table), rows)
+        written += len(rows)
+    logger.debug(f"Wrote {written} team game history rows")
+    return written
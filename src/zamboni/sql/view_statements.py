@@ -1,3 +1,5 @@
+import sqlite3
+
 drop_view_statement = "DROP VIEW IF EXISTS {view_name}"
 
 create_stmt_suffixes = {}
@@ -103,13 +105,110 @@ create_stmt_suffixes["games_history"] = """
     """
 
 
-def create_view_statement(view_name, dialect):
+# Window function versions of the views above that aggregate over earlier games.
+# Running totals are taken over a team's games in a season up to and including
+# the game's date, minus the totals of games on that date, so only games on
+# earlier dates count as previous games, as in games_with_previous. The self-joins
+# never match a NULL gameTypeID, so each game without a type gets its own partition.
+window_stmt_suffixes = {}
+window_stmt_suffixes["games_history"] = """
+    AS
+    SELECT
+        "gameID",
+        "teamID",
+        "datePlayed",
+        "prevWonNum",
+        "prevNum",
+        CAST("prevWonNum" AS REAL) / CASE WHEN "prevNum" = 0 THEN 1 ELSE "prevNum" END AS "prevWonPercentage",
+        CAST("prevGoals" AS REAL) / CASE WHEN "prevNum" = 0 THEN 1 ELSE "prevNum" END AS "prevGoalsPerGame",
+        CAST("prevOppGoals" AS REAL) / CASE WHEN "prevNum" = 0 THEN 1 ELSE "prevNum" END AS "prevOppGoalsPerGame",
+        "pointsToDate"
+    FROM (
+        SELECT
+            games_per_team."gameID" AS "gameID",
+            games_per_team."teamID" AS "teamID",
+            games."datePlayed" AS "datePlayed",
+            SUM(games_per_team.won) OVER running
+                - SUM(games_per_team.won) OVER same_day AS "prevWonNum",
+            COUNT(*) OVER running - COUNT(*) OVER same_day AS "prevNum",
+            SUM(COALESCE(games_per_team.goals, 0)) OVER running
+                - SUM(COALESCE(games_per_team.goals, 0)) OVER same_day AS "prevGoals",
+            SUM(COALESCE(games_per_team."oppGoals", 0)) OVER running
+                - SUM(COALESCE(games_per_team."oppGoals", 0)) OVER same_day AS "prevOppGoals",
+            SUM(COALESCE(games_per_team.pointsAwarded, 0)) OVER running
+                - SUM(COALESCE(games_per_team.pointsAwarded, 0)) OVER same_day AS "pointsToDate"
+        FROM games_per_team
+        INNER JOIN games
+            ON games_per_team."gameID" = games.id
+        INNER JOIN teams
+            ON games_per_team."teamID" = teams.id
+        WINDOW
+            running AS (
+                PARTITION BY games_per_team."teamID", games."seasonID", games."gameTypeID",
+                    CASE WHEN games."gameTypeID" IS NULL THEN games.id END
+                ORDER BY games."datePlayed"
+                RANGE BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+            ),
+            same_day AS (
+                PARTITION BY games_per_team."teamID", games."seasonID", games."gameTypeID", games."datePlayed",
+                    CASE WHEN games."gameTypeID" IS NULL THEN games.id END
+            )
+    ) team_games
+    """
+# The previous game between the same two teams is the one before it when the
+# games of each pair of teams in a season are ordered by date
+window_stmt_suffixes["games_prev_same_opp"] = """
+    AS
+    SELECT
+        matchups."gameID",
+        matchups."prevGameID",
+        games."outcome" AS "prevOutcome",
+        games."inOT" AS "prevInOT"
+    FROM (
+        SELECT
+            id AS "gameID",
+            LAG(id) OVER (
+                PARTITION BY
+                    CASE WHEN "homeTeamID" < "awayTeamID" THEN "homeTeamID" ELSE "awayTeamID" END,
+                    CASE WHEN "homeTeamID" < "awayTeamID" THEN "awayTeamID" ELSE "homeTeamID" END,
+                    "seasonID",
+                    "gameTypeID",
+                    CASE WHEN "gameTypeID" IS NULL THEN id END
+                ORDER BY "datePlayed", id
+            ) AS "prevGameID"
+        FROM games
+    ) matchups
+    INNER JOIN games
+        ON matchups."prevGameID" = games.id
+    """
+
+
+def supports_window_functions(dialect):
+    """
+    Check whether the views can be built with window functions
+
+    :param dialect: Name of SQLAlchemy dialect
+    """
     if dialect == "postgresql":
-        stmt = f"""
-    CREATE OR REPLACE VIEW {view_name}"""
-    else:
-        stmt = f"""
-    CREATE VIEW IF NOT EXISTS {view_name}"""
+        return True
+    if dialect == "sqlite":
+        return sqlite3.sqlite_version_info >= (3, 25, 0)
+    return False
+
+
+def view_select(view_name, dialect, window_functions=None):
+    """
+    Body of a view, starting with AS
+
+    :param view_name: Name of view
+    :param dialect: Name of SQLAlchemy dialect
+    :param window_functions: Use the window function version if there is one,
+        defaults to whether the dialect supports them
+    """
+    if window_functions is None:
+        window_functions = supports_window_functions(dialect)
+    if window_functions and view_name in window_stmt_suffixes:
+        return window_stmt_suffixes[view_name]
     suffix = create_stmt_suffixes.get(view_name)
     if view_name == "games_history":
         # Adjust for SQL dialect differences
@@ -117,5 +216,15 @@ def create_view_statement(view_name, dialect):
             suffix = suffix.format(null_func="COALESCE")
         else:
             suffix = suffix.format(null_func="IFNULL")
-    stmt += suffix
+    return suffix
+
+
+def create_view_statement(view_name, dialect, window_functions=None):
+    if dialect == "postgresql":
+        stmt = f"""
+    CREATE OR REPLACE VIEW {view_name}"""
+    else:
+        stmt = f"""
+    CREATE VIEW IF NOT EXISTS {view_name}"""
+    stmt += view_select(view_name, dialect, window_functions)
     return stmt
@@ -1,7 +1,10 @@
 import abc
 import boto3
 import logging
+import os
+from botocore.exceptions import ClientError
 from pathlib import Path
+from zamboni.landing import landing_path
 
 logger = logging.getLogger(__name__)
 
@@ -30,8 +33,20 @@ class S3Storage(Storage):
         if not self.all_source or not self.all_local:
             raise ValueError("Need both a source and local for all file")
 
+        self.landing_format = config.get("landing_format", "txt")
+
         self.s3 = boto3.client("s3")
 
+    def games_files(self):
+        """
+        Pairs of S3 source and local path of the games text files
+        """
+        return [
+            (self.completed_source, self.completed_local),
+            (self.today_source, self.today_local),
+            (self.all_source, self.all_local),
+        ]
+
     def get_file(self, bucket, source, local):
         try:
             self.s3.download_file(bucket, source, local)
@@ -39,17 +54,55 @@ class S3Storage(Storage):
             logger.info(f"No file {source} found on S3, creating at {local}...")
             Path(local).touch()
 
+    def get_optional_file(self, bucket, source, local):
+        """
+        Download a file that may not exist yet, e.g. a checkpoint sidecar,
+        without creating an empty local file when it is missing
+        """
+        try:
+            self.s3.download_file(bucket, source, local)
+        except ClientError:
+            logger.info(f"No file {source} found on S3, skipping")
+
     def upload_file(self, bucket, local, source):
         self.s3.upload_file(local, bucket, source)
 
+    def get_dir(self, bucket, source, local):
+        """
+        Download every object under a prefix, e.g. a Parquet landing dataset
+        """
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=f"{source}/"):
+            for item in page.get("Contents", []):
+                relative = item["Key"][len(source) + 1 :]
+                local_path = os.path.join(local, relative)
+                os.makedirs(os.path.dirname(local_path), exist_ok=True)
+                self.s3.download_file(bucket, item["Key"], local_path)
+
+    def upload_dir(self, bucket, local, source):
+        """
+        Upload every file below a local directory under a prefix
+        """
+        for root, _, files in os.walk(local):
+            for name in files:
+                local_path = os.path.join(root, name)
+                relative = os.path.relpath(local_path, local).replace(os.sep, "/")
+                self.upload_file(bucket, local_path, f"{source}/{relative}")
+
     def get_files(self):
         self.get_file(self.bucket, self.db_source, self.db_local)
-        self.get_file(self.bucket, self.completed_source, self.completed_local)
-        self.get_file(self.bucket, self.today_source, self.today_local)
-        self.get_file(self.bucket, self.all_source, self.all_local)
+        for source, local in self.games_files():
+            self.get_file(self.bucket, source, local)
+            # Checkpoints let a fresh host resume downloads where the last one stopped
+            self.get_optional_file(self.bucket, f"{source}.ckpt", f"{local}.ckpt")
+            if self.landing_format == "parquet":
+                self.get_dir(self.bucket, landing_path(source), landing_path(local))
 
     def upload_files(self):
         self.upload_file(self.bucket, self.db_local, self.db_source)
-        self.upload_file(self.bucket, self.completed_local, self.completed_source)
-        self.upload_file(self.bucket, self.today_local, self.today_source)
-        self.upload_file(self.bucket, self.all_local, self.all_source)
+        for source, local in self.games_files():
+            self.upload_file(self.bucket, local, source)
+            if os.path.exists(f"{local}.ckpt"):
+                self.upload_file(self.bucket, f"{local}.ckpt", f"{source}.ckpt")
+            if self.landing_format == "parquet":
+                self.upload_dir(self.bucket, landing_path(local), landing_path(source))
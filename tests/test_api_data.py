@@ -5,9 +5,8 @@ error_message = "The API output has changed"
 
 def test_player():
     caller = APICaller()
-    caller.set_url_template("player")
     test_id = 8447400
-    out = caller.query([test_id])
+    out = caller.query([test_id], record_type="player").model_dump()
     assert (
         out["firstName"]["default"] == "Wayne"
         and out["lastName"]["default"] == "Gretzky"
@@ -18,9 +17,8 @@ def test_game():
     from datetime import date
 
     caller = APICaller()
-    caller.set_url_template("game")
     test_date = date(1997, 3, 26)
-    out = caller.query([test_date])
+    out = caller.query([test_date], record_type="game").model_dump()
     assert "gameWeek" in out
     week = out["gameWeek"]
     found_day = False
@@ -16,21 +16,18 @@ def test_url_base():
 
 def test_standings_model():
     caller = APICaller()
-    caller.set_url_template("standings")
     out = caller.query(record_ids=["2024-02-07"], record_type="standings")
     assert isinstance(out, StandingsResponse)
 
 
 def test_player_url():
     caller = APICaller()
-    caller.set_url_template("player")
     out = caller.query(record_ids=[8478402], record_type="player")
     assert isinstance(out, PlayerResponse)
 
 
 def test_game_url():
     caller = APICaller()
-    caller.set_url_template("game")
     out = caller.query(record_ids=["2025-01-24"], record_type="game")
     assert (
         isinstance(out, GameScheduleResponse)
@@ -41,6 +38,5 @@ def test_game_url():
 
 def test_roster_url():
     caller = APICaller()
-    caller.set_url_template("roster")
     out = caller.query(record_ids=["EDM", 2023, 2024], record_type="roster")
     assert isinstance(out, RosterResponse)
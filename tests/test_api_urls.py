@@ -8,27 +8,46 @@ def test_url_base():
 
 def test_standings_url():
     caller = APICaller()
-    caller.set_url_template("standings")
-    url = caller.url
+    url = caller.set_url_template("standings")
     assert url == "https://api-web.nhle.com/v1/standings/{}"
 
 
 def test_player_url():
     caller = APICaller()
-    caller.set_url_template("player")
-    url = caller.url
+    url = caller.set_url_template("player")
     assert url == "https://api-web.nhle.com/v1/player/{}/landing"
 
 
 def test_game_url():
     caller = APICaller()
-    caller.set_url_template("game")
-    url = caller.url
+    url = caller.set_url_template("game")
     assert url == "https://api-web.nhle.com/v1/schedule/{}"
 
 
 def test_roster_url():
     caller = APICaller()
-    caller.set_url_template("roster")
-    url = caller.url
+    url = caller.set_url_template("roster")
     assert url == "https://api-web.nhle.com/v1/roster/{}/{}{}"
+
+
+def test_session_pool():
+    caller = APICaller(pool_size=4, connect_timeout=2.0, read_timeout=10.0)
+    adapter = caller.session.get_adapter(APICaller.url_base)
+    assert adapter._pool_maxsize == 4
+    assert caller.timeout == (2.0, 10.0)
+    assert caller.session.headers["Connection"] == "keep-alive"
+    caller.close()
+
+
+def test_query_url_does_not_share_state():
+    caller = APICaller()
+    assert caller.query_url(["EDM", 2023, 2024], record_type="roster") == (
+        "https://api-web.nhle.com/v1/roster/EDM/20232024"
+    )
+    assert caller.query_url([8478402], record_type="player") == (
+        "https://api-web.nhle.com/v1/player/8478402/landing"
+    )
+    assert caller.query_url(["standings", "now"]) == (
+        "https://api-web.nhle.com/v1/standings/now"
+    )
+    caller.close()
@@ -0,0 +1,43 @@
+from datetime import date
+
+from zamboni.checkpoint import GamesCheckpoint, read_last_line
+
+LINE = "2024020761, 20242025, 9, OTT, 6, BOS, {}, 24, 2025, 19:00:00, 2, 0, 2, REG\n"
+
+
+def test_read_last_line(tmp_path):
+    path = tmp_path / "games.txt"
+    path.write_text("a\n" + "b" * 10000 + "\nlast line\n\n")
+    assert read_last_line(path, block_size=16) == "last line"
+    path.write_text("")
+    assert read_last_line(path) is None
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = tmp_path / "games.txt"
+    checkpoint = GamesCheckpoint(path)
+    assert checkpoint.load() is None
+
+    with open(path, "a") as f:
+        f.write(LINE.format("2025-01-23"))
+        checkpoint.advance(f, "2025-01-23", 1)
+
+    restored = GamesCheckpoint(path)
+    assert restored.load() == date(2025, 1, 23)
+    assert restored.rows == 1
+    assert restored.offset == path.stat().st_size
+
+
+def test_checkpoint_falls_back_to_tail(tmp_path):
+    path = tmp_path / "games.txt"
+    checkpoint = GamesCheckpoint(path)
+    with open(path, "a") as f:
+        f.write(LINE.format("2025-01-23"))
+        checkpoint.advance(f, "2025-01-23", 1)
+    # File changed behind the checkpoint's back, e.g. restored from S3
+    with open(path, "a") as f:
+        f.write(LINE.format("2025-01-24"))
+
+    restored = GamesCheckpoint(path)
+    assert restored.load() == date(2025, 1, 24)
+    assert restored.rows == 2
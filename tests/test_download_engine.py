@@ -0,0 +1,378 @@
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from zamboni.api_download import date_range
+from zamboni.download_engine import fetch_in_order
+
+
+def test_date_range():
+    dates = date_range(date(2025, 1, 30), date(2025, 2, 2))
+    assert dates == [date(2025, 1, 30), date(2025, 1, 31), date(2025, 2, 1)]
+
+
+def test_fetch_in_order_preserves_order():
+    def fetch(key):
+        # Later keys finish first
+        time.sleep(0.01 * (5 - key))
+        return key * 2
+
+    out = list(fetch_in_order(fetch, range(5), concurrency=5, batch_size=3))
+    assert out == [(0, 0), (1, 2), (2, 4), (3, 6), (4, 8)]
+
+
+def test_fetch_in_order_sequential():
+    keys = date_range(date(2025, 1, 1), date(2025, 1, 8), timedelta(days=7))
+    out = list(fetch_in_order(str, keys, concurrency=1))
+    assert out == [(date(2025, 1, 1), "2025-01-01")]
+
+
+def test_schedule_days_week_stride():
+    from types import SimpleNamespace
+
+    from zamboni.api_download import schedule_days
+
+    def week(start):
+        days = [
+            SimpleNamespace(date=str(start + timedelta(days=i)), games=[])
+            for i in range(7)
+        ]
+        return SimpleNamespace(gameWeek=days)
+
+    stride = timedelta(days=7)
+    start = date(2025, 1, 1)
+    end = date(2025, 1, 10)
+    responses = [(start, week(start)), (start + stride, week(start + stride))]
+    days = [day.date for _, day in schedule_days(responses, end, stride)]
+    assert days == [str(start + timedelta(days=i)) for i in range(9)]
+
+
+class FakeCaller:
+    """Serve roster and player queries from memory"""
+
+    def __init__(self):
+        from zamboni.nhl_models import PlayerResponse, RosterResponse
+
+        def player(api_id, first, last):
+            return {
+                "id": api_id,
+                "firstName": {"default": first},
+                "lastName": {"default": last},
+                "sweaterNumber": 97,
+                "positionCode": "C",
+            }
+
+        self.rosters = {
+            "EDM": RosterResponse(
+                forwards=[player(8478402, "Connor", "McDavid")],
+                defensemen=[],
+                goalies=[],
+            ),
+            "TOR": RosterResponse(
+                forwards=[player(8479318, "Auston", "Matthews")],
+                defensemen=[],
+                goalies=[],
+            ),
+        }
+        self.players = {
+            8478402: PlayerResponse(
+                firstName={"default": "Connor"},
+                lastName={"default": "McDavid"},
+                sweaterNumber=97,
+                position="C",
+            ),
+            8479318: PlayerResponse(
+                firstName={"default": "Auston"}, lastName={"default": "Matthews"}
+            ),
+        }
+        self.queries = []
+
+    def query(self, record_ids, record_type=None, throw_error=True):
+        self.queries.append((record_type, tuple(record_ids)))
+        if record_type == "roster":
+            return self.rosters.get(record_ids[0])
+        return self.players.get(record_ids[0])
+
+
+def test_download_players_discovers_and_resumes(tmp_path):
+    from zamboni.api_download import download_players
+
+    teams_path = tmp_path / "teams.txt"
+    teams_path.write_text("Edmonton Oilers, EDM, W, P\nToronto Maple Leafs, TOR, E, A\n")
+    out_path = tmp_path / "players.txt"
+    out_path.write_text("8478402,Connor McDavid,Connor,McDavid,97,C\n")
+
+    caller = FakeCaller()
+    download_players(
+        out_path=out_path,
+        caller=caller,
+        start_year=date.today().year - 1,
+        teams_path=teams_path,
+        concurrency=2,
+    )
+    lines = out_path.read_text().splitlines()
+    assert lines == [
+        "8478402,Connor McDavid,Connor,McDavid,97,C",
+        "8479318,Auston Matthews,Auston,Matthews,-1,U",
+    ]
+    player_queries = [q for q in caller.queries if q[0] == "player"]
+    assert player_queries == [("player", (8479318,))]
+
+
+def test_download_rosters_resumes_without_duplicates(tmp_path):
+    from zamboni.api_download import download_rosters
+
+    teams_path = tmp_path / "teams.txt"
+    teams_path.write_text("Edmonton Oilers, EDM, W, P\nToronto Maple Leafs, TOR, E, A\n")
+    out_path = tmp_path / "rosterEntries.txt"
+    start_year = date.today().year - 3
+
+    caller = FakeCaller()
+    download_rosters(start_year, out_path, caller, teams_path, concurrency=2)
+    first_lines = out_path.read_text().splitlines()
+    first_queries = len(caller.queries)
+    assert first_lines[0].startswith(f"8478402, EDM, {start_year}")
+    assert first_lines[1].startswith(f"8479318, TOR, {start_year}")
+
+    download_rosters(start_year, out_path, caller, teams_path, concurrency=2)
+    assert out_path.read_text().splitlines() == first_lines
+    # Only the current season is queried again
+    assert len(caller.queries) - first_queries == 2
+
+
+def schedule_json(week_start, game_dates):
+    """Schedule endpoint JSON for the week starting at week_start"""
+    days = []
+    for i in range(7):
+        day_date = week_start + timedelta(days=i)
+        games = []
+        if day_date in game_dates:
+            games.append(
+                {
+                    "id": int(f"20240{day_date.strftime('%m%d')}1"),
+                    "season": 20242025,
+                    "gameType": 2,
+                    "venue": {"default": "TD Garden"},
+                    "neutralSite": False,
+                    "startTimeUTC": f"{day_date}T23:00:00Z",
+                    "easternUTCOffset": "-05:00",
+                    "venueUTCOffset": "-05:00",
+                    "venueTimezone": "US/Eastern",
+                    "gameState": "OFF",
+                    "gameScheduleState": "OK",
+                    "tvBroadcasts": [],
+                    "awayTeam": {
+                        "id": 9,
+                        "abbrev": "OTT",
+                        "commonName": {"default": "Senators"},
+                        "placeName": {"default": "Ottawa"},
+                        "placeNameWithPreposition": {"default": "Ottawa"},
+                        "score": 1,
+                    },
+                    "homeTeam": {
+                        "id": 6,
+                        "abbrev": "BOS",
+                        "commonName": {"default": "Bruins"},
+                        "placeName": {"default": "Boston"},
+                        "placeNameWithPreposition": {"default": "Boston"},
+                        "score": 2,
+                    },
+                    "periodDescriptor": {
+                        "number": 3,
+                        "periodType": "REG",
+                        "maxRegulationPeriods": 3,
+                    },
+                    "gameOutcome": {"lastPeriodType": "REG"},
+                }
+            )
+        days.append(
+            {
+                "date": str(day_date),
+                "dayAbbrev": "MON",
+                "numberOfGames": len(games),
+                "games": games,
+            }
+        )
+    return {
+        "nextStartDate": str(week_start + timedelta(days=7)),
+        "previousStartDate": str(week_start - timedelta(days=7)),
+        "gameWeek": days,
+    }
+
+
+class FakeScheduleCaller:
+    """Serve schedule queries from memory"""
+
+    def __init__(self, game_dates):
+        self.game_dates = game_dates
+        self.queries = []
+
+    def query(self, record_ids, record_type=None, throw_error=True):
+        from zamboni.nhl_models import GameScheduleResponse
+
+        self.queries.append(record_ids[0])
+        week_start = date.fromisoformat(record_ids[0])
+        return GameScheduleResponse(**schedule_json(week_start, self.game_dates))
+
+
+def test_download_games_resumes(tmp_path, monkeypatch):
+    from zamboni import api_download
+
+    monkeypatch.setattr(api_download, "today_date", date(2025, 1, 20))
+    game_dates = {date(2025, 1, 2), date(2025, 1, 9), date(2025, 1, 19)}
+    paths = {
+        "out_path_completed": tmp_path / "games_completed.txt",
+        "out_path_today": tmp_path / "games_today.txt",
+        "out_path_all": tmp_path / "games_all.txt",
+    }
+
+    caller = FakeScheduleCaller(game_dates)
+    api_download.download_games(
+        date(2025, 1, 1), date(2025, 1, 22), caller=caller, concurrency=2, **paths
+    )
+    completed = paths["out_path_completed"].read_text().splitlines()
+    assert [line.split(", ")[6] for line in completed] == [
+        "2025-01-02",
+        "2025-01-09",
+        "2025-01-19",
+    ]
+    assert len(paths["out_path_all"].read_text().splitlines()) == 3
+
+    caller.queries = []
+    api_download.download_games(
+        date(2025, 1, 1), date(2025, 1, 22), caller=caller, concurrency=2, **paths
+    )
+    assert paths["out_path_completed"].read_text().splitlines() == completed
+    assert "2025-01-01" not in caller.queries
+
+
+def test_download_games_parquet_landing(tmp_path, monkeypatch):
+    from zamboni import api_download
+    from zamboni.landing import read_games
+    from zamboni.sport import Game
+    from zamboni.sql.sql_handler import game_rows_from_table
+
+    monkeypatch.setattr(api_download, "today_date", date(2025, 1, 20))
+    game_dates = {date(2025, 1, 2), date(2025, 1, 9), date(2025, 1, 19)}
+    txt_paths = {
+        "out_path_completed": tmp_path / "games_completed.txt",
+        "out_path_today": tmp_path / "games_today.txt",
+        "out_path_all": tmp_path / "games_all.txt",
+    }
+    caller = FakeScheduleCaller(game_dates)
+    api_download.download_games(
+        date(2025, 1, 1), date(2025, 1, 22), caller=caller, **txt_paths
+    )
+    api_download.download_games(
+        date(2025, 1, 1),
+        date(2025, 1, 22),
+        caller=caller,
+        landing_format="parquet",
+        **txt_paths,
+    )
+
+    table = read_games(tmp_path / "games_completed")
+    assert table.num_rows == 3
+    assert (tmp_path / "games_completed" / "season=20242025").is_dir()
+    with open(txt_paths["out_path_completed"]) as f:
+        txt_games = [Game.from_csv_line(line) for line in f]
+    season_ids = {int(game.season_id): 1 for game in txt_games}
+    team_ids = {game.home_abbrev: 1 for game in txt_games}
+    team_ids.update({game.away_abbrev: 2 for game in txt_games})
+    rows = game_rows_from_table(table, season_ids, team_ids).to_pylist()
+    assert [row["apiID"] for row in rows] == [int(game.api_id) for game in txt_games]
+    assert [row["datePlayed"].isoformat() for row in rows] == [
+        game.date_played for game in txt_games
+    ]
+    assert [row["outcome"] for row in rows] == [game.outcome for game in txt_games]
+
+
+class FakeScheduleSession:
+    """Answer schedule URLs with the week starting at the queried date"""
+
+    def __init__(self, game_dates):
+        self.game_dates = game_dates
+
+    def get(self, url, timeout=None, headers=None):
+        week_start = date.fromisoformat(url.rsplit("/", 1)[-1])
+        return FakeJSONResponse(schedule_json(week_start, self.game_dates))
+
+    def close(self):
+        pass
+
+
+class FakeJSONResponse:
+    status_code = 200
+
+    def __init__(self, body):
+        self.body = body
+        self.headers = {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+def test_replay_from_different_start_date(tmp_path, monkeypatch):
+    from zamboni import APICaller, api_download
+    from zamboni.archive import RawArchive, ReplayCaller
+    from zamboni.rate_limit import TokenBucket
+
+    game_dates = {date(2025, 1, 2), date(2025, 1, 9), date(2025, 1, 12), date(2025, 1, 16)}
+    archive = RawArchive(tmp_path / "raw")
+    caller = APICaller(
+        session=FakeScheduleSession(game_dates),
+        archive=archive,
+        rate_limiter=TokenBucket(rate=1000.0),
+    )
+    paths = {
+        "out_path_completed": tmp_path / "games_completed.txt",
+        "out_path_today": tmp_path / "games_today.txt",
+        "out_path_all": tmp_path / "games_all.txt",
+    }
+    # An incremental run resumes after the last game, so its weeks start on 2025-01-10
+    for today in (date(2025, 1, 10), date(2025, 1, 20)):
+        monkeypatch.setattr(api_download, "today_date", today)
+        api_download.download_games(
+            date(2025, 1, 1), date(2025, 1, 22), caller=caller, **paths
+        )
+    # None of the weeks queried from a different start date were archived as such
+    replay_start = date(2025, 1, 2)
+    assert not any(
+        archive.has("game", [replay_start + timedelta(days=days)])
+        for days in range(0, 22, 7)
+    )
+
+    replay_paths = {
+        name: tmp_path / "replay" / path.name for name, path in paths.items()
+    }
+    (tmp_path / "replay").mkdir()
+    api_download.download_games(
+        replay_start, date(2025, 1, 22), caller=ReplayCaller(archive), **replay_paths
+    )
+    completed = replay_paths["out_path_completed"].read_text().splitlines()
+    assert completed == paths["out_path_completed"].read_text().splitlines()
+    assert (
+        replay_paths["out_path_all"].read_text().splitlines()
+        == paths["out_path_all"].read_text().splitlines()
+    )
+    assert [line.split(", ")[6] for line in completed] == [
+        "2025-01-02",
+        "2025-01-09",
+        "2025-01-12",
+        "2025-01-16",
+    ]
+
+
+def test_replay_partial_week_raises(tmp_path):
+    from zamboni.archive import ArchiveMissError, RawArchive
+
+    archive = RawArchive(tmp_path / "raw")
+    archive.put("game", ["2025-01-01"], schedule_json(date(2025, 1, 1), set()))
+    assert len(archive.schedule_week("2025-01-01")["gameWeek"]) == 7
+    assert archive.schedule_week("2025-02-01") is None
+    with pytest.raises(ArchiveMissError, match="2025-01-08, 2025-01-09"):
+        archive.schedule_week("2025-01-03")
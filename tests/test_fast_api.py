@@ -0,0 +1,360 @@
+import asyncio
+import gzip
+import json
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from tests import test_sqlalchemy_conversion
+from zamboni import DBConnector, SQLHandler, TableCreator
+from zamboni.fast_api import DateResponseCache, app
+from zamboni.snapshots import SnapshotStore, write_snapshots
+
+
+@pytest.fixture
+def sql_handler(tmp_path, monkeypatch):
+    """Create a test database with games and predictions and point the API at it."""
+    db_uri = f"sqlite:///{tmp_path}/api.db"
+    monkeypatch.setenv("ZAMBONI_DB_URI", db_uri)
+    engine = DBConnector(db_uri).connect_db()
+    TableCreator(engine).create_tables()
+    handler = SQLHandler(engine=engine)
+    history_tests = test_sqlalchemy_conversion.TestTeamGameHistory()
+    handler.load_games(history_tests.games(history_tests.lines))
+    handler.add_predicter_to_register("HomeTeamWins", "HomeTeamWinsPredictor")
+    yield handler
+    handler.close()
+    DBConnector(db_uri).close()
+
+
+def record_predictions(sql_handler, prediction):
+    games = sql_handler.query_games()
+    sql_handler.record_game_predictions(
+        sql_handler.predicter_id_from_name("HomeTeamWins"),
+        pd.DataFrame({"id": games["id"], "preds": prediction}),
+    )
+
+
+class TestDateEndpoint:
+    """Tests for the cached /api/{date} endpoint."""
+
+    def test_games_with_predictions(self, sql_handler):
+        """Test that the endpoint returns the games of a date with predictions."""
+        record_predictions(sql_handler, 0.75)
+        with TestClient(app) as client:
+            response = client.get("/api/2024-10-08")
+            async_available = app.state.sql_handler.async_engine is not None
+        assert response.status_code == 200
+        (game,) = response.json()
+        assert game["homeAbbrev"] == "BOS"
+        assert game["predictedWinner"] == "BOS"
+        assert game["predictedConfidence"] == 0.75
+        try:
+            import aiosqlite  # noqa: F401
+            import greenlet  # noqa: F401
+        except ImportError:
+            assert not async_available
+        else:
+            assert async_available
+
+    def test_cache_invalidated_by_new_predictions(self, sql_handler):
+        """Test that recorded predictions replace cached responses."""
+        record_predictions(sql_handler, 0.75)
+        with TestClient(app) as client:
+            assert client.get("/api/2024-10-08").json()[0]["predictedWinner"] == "BOS"
+            record_predictions(sql_handler, 0.25)
+            assert client.get("/api/2024-10-08").json()[0]["predictedWinner"] == "OTT"
+
+    def test_cache_invalidated_by_other_process(self, sql_handler):
+        """Test that changes made without notifying this process are picked up."""
+        from sqlalchemy import update
+
+        from zamboni.sql.tables import GamePredictions
+
+        record_predictions(sql_handler, 0.75)
+        with TestClient(app) as client:
+            app.state.response_cache.version_interval = 0
+            assert client.get("/api/2024-10-08").json()[0]["predictedWinner"] == "BOS"
+            # Written directly, as the daily pipeline's process would
+            with sql_handler.engine.begin() as connection:
+                connection.execute(update(GamePredictions).values(prediction=0.25))
+            assert client.get("/api/2024-10-08").json()[0]["predictedWinner"] == "OTT"
+
+    def test_cache_invalidated_by_game_load(self, sql_handler):
+        """Test that loading finished games replaces cached responses."""
+        record_predictions(sql_handler, 0.75)
+        history_tests = test_sqlalchemy_conversion.TestTeamGameHistory()
+        lines = [("5", "20242025", "BOS", "TOR", "2024-10-14", "2", "3", "REG")]
+        with TestClient(app) as client:
+            assert client.get("/api/2024-10-14").json() == []
+            cache = app.state.response_cache
+            assert cache.get(date(2024, 10, 14)) is not None
+            sql_handler.load_games(history_tests.games(lines))
+            assert cache.get(date(2024, 10, 14)) is None
+
+    def test_invalid_date(self, sql_handler):
+        """Test that a malformed date is rejected."""
+        with TestClient(app) as client:
+            assert client.get("/api/yesterday").status_code == 422
+
+
+class TestDateResponseCache:
+    """Tests for DateResponseCache."""
+
+    def test_past_dates_never_expire(self):
+        """Test that only dates near today get a TTL."""
+        cache = DateResponseCache(ttl=0, recent_days=3)
+        past = date.today() - timedelta(days=4)
+        recent = date.today() - timedelta(days=3)
+        for day in (past, recent, date.today()):
+            cache.put(day, b"[]")
+        assert cache.get(past) == b"[]"
+        assert cache.get(recent) is None
+        assert cache.get(date.today()) is None
+
+    def test_version_change_clears(self):
+        """Test that a new data version drops cached responses and the same one keeps them."""
+        cache = DateResponseCache(version_interval=60)
+        day = date(2024, 10, 8)
+        assert cache.version_check_due()
+        cache.validate((1, 2))
+        assert not cache.version_check_due()
+        cache.put(day, b"[]")
+        cache.validate((1, 2))
+        assert cache.get(day) == b"[]"
+        cache.validate((1, 3))
+        assert cache.get(day) is None
+
+    def test_least_recently_used_dropped(self):
+        """Test that the cache keeps at most max_entries dates."""
+        cache = DateResponseCache(max_entries=2)
+        days = [date(2024, 10, day) for day in (1, 2, 3)]
+        cache.put(days[0], b"1")
+        cache.put(days[1], b"2")
+        cache.get(days[0])
+        cache.put(days[2], b"3")
+        assert cache.get(days[1]) is None
+        assert json.loads(cache.get(days[0])) == 1
+
+
+class TestAsyncQueries:
+    """Tests for the asyncio query path and its sync fallback."""
+
+    def test_async_matches_sync(self, sql_handler):
+        """Test that the async query returns the same rows as the sync one."""
+        pytest.importorskip("aiosqlite")
+        pytest.importorskip("greenlet")
+        record_predictions(sql_handler, 0.75)
+        connector = DBConnector(str(sql_handler.engine.url))
+        sql_handler.async_engine = connector.connect_async_db()
+        day = date(2024, 10, 8)
+
+        async def query():
+            try:
+                return await sql_handler.query_games_with_predictions_async(day)
+            finally:
+                await connector.close_async()
+
+        assert asyncio.run(query()) == sql_handler.query_games_with_predictions(day)
+
+    def test_sync_fallback(self, sql_handler, monkeypatch):
+        """Test that the endpoint still answers without the asyncio drivers."""
+
+        def missing_driver(self):
+            raise ImportError("No module named 'aiosqlite'")
+
+        monkeypatch.setattr(DBConnector, "connect_async_db", missing_driver)
+        record_predictions(sql_handler, 0.75)
+        with TestClient(app) as client:
+            assert app.state.sql_handler.async_engine is None
+            assert client.get("/api/2024-10-08").json()[0]["predictedWinner"] == "BOS"
+
+
+class TestStreamingEndpoints:
+    """Tests for the streamed range and team endpoints."""
+
+    def test_range_ndjson(self, sql_handler):
+        """Test that the range endpoint streams one JSON line per game in date order."""
+        record_predictions(sql_handler, 0.75)
+        with TestClient(app) as client:
+            response = client.get(
+                "/api/range",
+                params={"start": "2024-10-08", "end": "2024-10-12", "predicter": "HomeTeamWins"},
+            )
+        assert response.headers["content-type"] == "application/x-ndjson"
+        games = [json.loads(line) for line in response.text.splitlines()]
+        assert [game["datePlayed"] for game in games] == [
+            "2024-10-08",
+            "2024-10-09",
+            "2024-10-10",
+            "2024-10-12",
+        ]
+        assert games[0]["predictedWinner"] == "BOS"
+
+    def test_range_unknown_predicter(self, sql_handler):
+        """Test that filtering on another predicter returns nothing."""
+        record_predictions(sql_handler, 0.75)
+        with TestClient(app) as client:
+            response = client.get(
+                "/api/range",
+                params={"start": "2024-10-08", "end": "2024-10-12", "predicter": "Other"},
+            )
+        assert response.text == ""
+
+    def test_range_rejects_bad_params(self, sql_handler):
+        """Test that invalid ranges and formats are rejected."""
+        with TestClient(app) as client:
+            params = {"start": "2024-10-12", "end": "2024-10-08"}
+            assert client.get("/api/range", params=params).status_code == 422
+            params = {"start": "2024-10-08", "end": "2024-10-12", "format": "csv"}
+            assert client.get("/api/range", params=params).status_code == 422
+
+    def test_team_arrow(self, sql_handler):
+        """Test that the team endpoint streams an Arrow IPC stream of the team's games."""
+        import pyarrow as pa
+
+        record_predictions(sql_handler, 0.75)
+        with TestClient(app) as client:
+            response = client.get("/api/team/tor", params={"format": "arrow"})
+        table = pa.ipc.open_stream(response.content).read_all()
+        assert table.schema.field("datePlayed").type == pa.date32()
+        assert table.column("datePlayed").to_pylist() == [
+            date(2024, 10, 9),
+            date(2024, 10, 10),
+        ]
+        assert all("TOR" in pair for pair in zip(
+            table.column("homeAbbrev").to_pylist(), table.column("awayAbbrev").to_pylist()
+        ))
+
+    def test_range_sync_fallback(self, sql_handler, monkeypatch):
+        """Test that the range endpoint streams from the sync engine without asyncio drivers."""
+
+        def missing_driver(self):
+            raise ImportError("No module named 'aiosqlite'")
+
+        monkeypatch.setattr(DBConnector, "connect_async_db", missing_driver)
+        record_predictions(sql_handler, 0.75)
+        with TestClient(app) as client:
+            response = client.get(
+                "/api/range", params={"start": "2024-10-08", "end": "2024-10-12"}
+            )
+        assert len(response.text.splitlines()) == 4
+
+
+class TestSnapshots:
+    """Tests for static snapshots of the /api/{date} payload."""
+
+    def test_snapshot_matches_api(self, sql_handler, tmp_path):
+        """Test that a snapshot holds the exact payload of the endpoint plus a season index."""
+        record_predictions(sql_handler, 0.75)
+        store = SnapshotStore(tmp_path / "snapshots")
+        day = date(2024, 10, 8)
+        assert write_snapshots(sql_handler, store, [day, day]) == 1
+
+        with TestClient(app) as client:
+            response = client.get("/api/2024-10-08")
+        body, encoding = store.read_date(day)
+        assert encoding is None
+        assert body == response.content
+        assert gzip.decompress(store.read_date(day, "gzip, deflate")[0]) == body
+
+        with open(store.season_path(20242025)) as f:
+            index = json.load(f)
+        assert [entry["date"] for entry in index["dates"]] == [
+            "2024-10-08",
+            "2024-10-09",
+            "2024-10-10",
+            "2024-10-12",
+        ]
+
+    def test_snapshot_served_first(self, sql_handler, tmp_path, monkeypatch):
+        """Test that the endpoint serves snapshots and falls back to the db on a miss."""
+        record_predictions(sql_handler, 0.75)
+        store = SnapshotStore(str(tmp_path / "snapshots"))
+        store.write(store.date_path(date(2024, 10, 8)), b'["snapshot"]')
+        store.write_version(sql_handler.content_version())
+        monkeypatch.setenv("ZAMBONI_SNAPSHOT_DIR", store.snapshot_dir)
+
+        with TestClient(app) as client:
+            response = client.get("/api/2024-10-08", headers={"Accept-Encoding": "gzip"})
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.json() == ["snapshot"]
+            assert client.get("/api/2024-10-09").json()[0]["homeAbbrev"] == "OTT"
+
+    def test_stale_snapshot_not_served(self, sql_handler, tmp_path, monkeypatch):
+        """Test that snapshots are skipped once the db changes until they are rewritten."""
+        from sqlalchemy import update
+
+        from zamboni.sql.tables import GamePredictions
+
+        record_predictions(sql_handler, 0.75)
+        store = SnapshotStore(str(tmp_path / "snapshots"))
+        day = date(2024, 10, 8)
+        monkeypatch.setenv("ZAMBONI_SNAPSHOT_DIR", store.snapshot_dir)
+        with TestClient(app) as client:
+            app.state.response_cache.version_interval = 0
+            store.write(store.date_path(day), b'["snapshot"]')
+            assert client.get("/api/2024-10-08").json()[0]["predictedWinner"] == "BOS"
+
+            write_snapshots(sql_handler, store, [])
+            store.write(store.date_path(day), b'["snapshot"]')
+            assert client.get("/api/2024-10-08").json() == ["snapshot"]
+
+            # Written directly, as the daily pipeline's process would
+            with sql_handler.engine.begin() as connection:
+                connection.execute(update(GamePredictions).values(prediction=0.25))
+            assert client.get("/api/2024-10-08").json()[0]["predictedWinner"] == "OTT"
+
+            write_snapshots(sql_handler, store, [day])
+            response = client.get("/api/2024-10-08")
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.json()[0]["predictedWinner"] == "OTT"
+
+    def test_refused_encodings(self, sql_handler, tmp_path):
+        """Test that encodings refused with q=0 are not served and q-values set the order."""
+        record_predictions(sql_handler, 0.75)
+        store = SnapshotStore(tmp_path / "snapshots")
+        day = date(2024, 10, 8)
+        # Stands in for a brotli sibling, which needs the optional encoder
+        store.write(store.date_path(day), b"[]")
+        with open(store.date_path(day) + ".br", "wb") as f:
+            f.write(b"br")
+
+        assert store.read_date(day, "br;q=0, gzip")[1] == "gzip"
+        assert store.read_date(day, "br;q=0.5, gzip;q=0.8")[1] == "gzip"
+        assert store.read_date(day, "gzip;q=0.5, br")[1] == "br"
+        assert store.read_date(day, "gzip;q=0, br;q=0") == (b"[]", None)
+        assert store.read_date(day, "*;q=0") == (b"[]", None)
+        assert store.read_date(day, "*")[1] == "br"
+
+    def test_changed_dates(self, sql_handler):
+        """Test that game loads and predicter changes report the dates whose snapshots changed."""
+        record_predictions(sql_handler, 0.75)
+        history_tests = test_sqlalchemy_conversion.TestTeamGameHistory()
+        finished = [("5", "20242025", "BOS", "TOR", "2024-10-14", "2", "3", "REG")]
+        assert sql_handler.load_games(history_tests.games(history_tests.lines)) == set()
+        assert sql_handler.load_games(history_tests.games(finished)) == {date(2024, 10, 14)}
+
+        predicters = [{"name": "HomeTeamWins", "class_name": "HomeTeamWinsPredictor"}]
+        assert sql_handler.load_predicters(predicters) == []
+        predicters[0]["active"] = False
+        changed = sql_handler.load_predicters(predicters)
+        assert changed == [sql_handler.predicter_id_from_name("HomeTeamWins")]
+        assert date(2024, 10, 8) in sql_handler.get_prediction_dates(changed)
+
+    def test_deactivated_predicter_rewritten(self, sql_handler, tmp_path):
+        """Test that rewriting after deactivating the only predicter empties its snapshots."""
+        record_predictions(sql_handler, 0.75)
+        store = SnapshotStore(tmp_path / "snapshots")
+        day = date(2024, 10, 8)
+        write_snapshots(sql_handler, store, [day])
+
+        changed = sql_handler.load_predicters(
+            [{"name": "HomeTeamWins", "class_name": "HomeTeamWinsPredictor", "active": False}]
+        )
+        write_snapshots(sql_handler, store, sql_handler.get_prediction_dates(changed))
+        assert json.loads(store.read_date(day)[0]) == []
+        with open(store.season_path(20242025)) as f:
+            assert json.load(f)["dates"] == []
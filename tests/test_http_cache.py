@@ -0,0 +1,71 @@
+from datetime import date
+
+from zamboni import APICaller
+from zamboni.http_cache import ResponseCache, ttl_for_record
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, body=None, headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, timeout=None, headers=None):
+        self.requests.append((url, headers))
+        return self.responses.pop(0)
+
+
+def test_ttl_rules():
+    today = date(2025, 1, 20)
+    assert ttl_for_record("game", ["2025-01-01"], today) is None
+    assert ttl_for_record("game", ["2025-01-18"], today) is not None
+    assert ttl_for_record("standings", ["2024-12-31"], today) is None
+    assert ttl_for_record("standings", ["2025-01-20"], today) is not None
+    assert ttl_for_record("roster", ["EDM", 2023, 2024], today) is None
+    assert ttl_for_record("roster", ["EDM", 2024, 2025], today) is not None
+
+
+def test_cache_skips_network_for_final_records(tmp_path):
+    session = FakeSession([FakeResponse(body={"a": 1}, headers={"ETag": "x"})])
+    caller = APICaller(session=session, cache=ResponseCache(tmp_path))
+    url = caller.query_url(["2001-01-01"], "game")
+    assert caller._fetch_json(url, "game", ["2001-01-01"]) == {"a": 1}
+    assert caller._fetch_json(url, "game", ["2001-01-01"]) == {"a": 1}
+    assert len(session.requests) == 1
+
+
+def test_cache_revalidates_stale_records(tmp_path):
+    cache = ResponseCache(tmp_path)
+    session = FakeSession([FakeResponse(status_code=304)])
+    caller = APICaller(session=session, cache=cache)
+    url = caller.query_url([8478402], "player")
+    cache.put(url, {"b": 2}, {"ETag": "tag"}, ttl=0)
+    assert caller._fetch_json(url, "player", [8478402]) == {"b": 2}
+    assert session.requests[0][1] == {"If-None-Match": "tag"}
+
+
+def test_archive_replay(tmp_path):
+    from zamboni.archive import RawArchive, ReplayCaller
+
+    archive = RawArchive(tmp_path / "raw")
+    session = FakeSession([FakeResponse(body={"d": 4})])
+    caller = APICaller(session=session, archive=archive)
+    url = caller.query_url(["2025-01-24"], "game")
+    caller._fetch_json(url, "game", ["2025-01-24"])
+    assert (tmp_path / "raw" / "game" / "2025-01-24.json.gz").is_file()
+
+    replay = ReplayCaller(archive)
+    assert replay._fetch_json(url, "game", ["2025-01-24"]) == {"d": 4}
+    assert replay.query(["2025-01-25"], "game", throw_error=False) is None
@@ -17,7 +17,9 @@ from zamboni.nhl_models import (
     StandingsEntry,
     StandingsResponse,
     RosterResponse,
+    LeanGameScheduleResponse,
 )
+from zamboni.api_caller import APICaller
 
 
 # ============================================================================
@@ -741,3 +743,67 @@ class TestRosterResponse:
         with pytest.raises(ValidationError) as exc_info:
             RosterResponse(**roster_data)
         assert "Invalid position" in str(exc_info.value)
+
+
+# ============================================================================
+# Validation Level Tests
+# ============================================================================
+
+
+class TestValidationLevels:
+    """Test lean and sampled validation in APICaller."""
+
+    @pytest.fixture
+    def schedule_data(self):
+        """Schedule response with a field the full model rejects."""
+        return {
+            "nextStartDate": "2025-01-31",
+            "gameWeek": [
+                {
+                    "date": "2025-01-24",
+                    "dayAbbrev": "FRI",
+                    "numberOfGames": 1,
+                    "games": [
+                        {
+                            "id": 2024020761,
+                            "season": 20242025,
+                            "gameType": 2,
+                            "startTimeUTC": "2025-01-24T00:00:00Z",
+                            "venueUTCOffset": "-05:00",
+                            "gameState": "OFF",
+                            "tvBroadcasts": [{"id": 1, "network": "NESN"}],
+                            "awayTeam": {"id": 9, "abbrev": "OTT", "score": -1},
+                            "homeTeam": {"id": 6, "abbrev": "BOS", "score": 2},
+                            "gameOutcome": {"lastPeriodType": "REG"},
+                        }
+                    ],
+                }
+            ],
+        }
+
+    def test_lean_skips_unused_fields(self, schedule_data):
+        """Test that lean validation ignores fields that are never written."""
+        caller = APICaller(validation="lean")
+        schedule = caller._validate_response(schedule_data, "game")
+        assert isinstance(schedule, LeanGameScheduleResponse)
+        game = schedule.gameWeek[0].games[0]
+        assert game.homeTeam.abbrev == "BOS"
+        assert game.gameOutcome.lastPeriodType == "REG"
+
+        with pytest.raises(ValidationError):
+            APICaller(validation="full")._validate_response(schedule_data, "game")
+
+    def test_sampled_validates_one_in_n(self, schedule_data):
+        """Test that sampled validation fully checks every Nth response."""
+        caller = APICaller(validation="sampled", sample_rate=3)
+        with pytest.raises(ValidationError):
+            caller._validate_response(schedule_data, "game")
+        caller._validate_response(schedule_data, "game")
+        caller._validate_response(schedule_data, "game")
+        with pytest.raises(ValidationError):
+            caller._validate_response(schedule_data, "game")
+
+    def test_unknown_validation_level(self):
+        """Test that an unknown validation level is rejected."""
+        with pytest.raises(ValueError):
+            APICaller(validation="none")
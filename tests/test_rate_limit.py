@@ -0,0 +1,38 @@
+from tests.test_http_cache import FakeResponse, FakeSession
+from zamboni import APICaller
+from zamboni.rate_limit import RetryPolicy, TokenBucket
+
+
+def test_retry_after_429(tmp_path):
+    session = FakeSession(
+        [
+            FakeResponse(status_code=429, headers={"Retry-After": "0"}),
+            FakeResponse(status_code=503),
+            FakeResponse(body={"c": 3}),
+        ]
+    )
+    caller = APICaller(
+        session=session,
+        rate_limiter=TokenBucket(rate=1000.0),
+        retry_policy=RetryPolicy(backoff_base=0.0),
+    )
+    url = caller.query_url([8478402], "player")
+    assert caller._fetch_json(url, "player", [8478402]) == {"c": 3}
+    assert len(session.requests) == 3
+
+
+def test_retry_gives_up():
+    session = FakeSession([FakeResponse(status_code=503)] * 3)
+    caller = APICaller(session=session, retry_policy=RetryPolicy(max_retries=2, backoff_base=0.0))
+    response = caller._get_with_retry(caller.query_url([1], "player"))
+    assert response.status_code == 503
+    assert len(session.requests) == 3
+
+
+def test_retry_after_header():
+    policy = RetryPolicy(backoff_max=10.0)
+    assert policy.retry_after(FakeResponse(headers={"Retry-After": "3"})) == 3.0
+    assert policy.retry_after(FakeResponse(headers={"Retry-After": "600"})) == 10.0
+    assert policy.retry_after(FakeResponse(headers={"Retry-After": "soon"})) is None
+    assert policy.retry_after(FakeResponse()) is None
+    assert 429 in RetryPolicy.retry_statuses
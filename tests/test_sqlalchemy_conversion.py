@@ -3,15 +3,25 @@ Tests for SQLAlchemy conversion in sql_handler and sql_helpers.
 Tests cover upsert, parameterized queries, Core/ORM expressions, and allow-list validation.
 """
 
-import pytest
 import os
 from datetime import date
-from sqlalchemy import select, text, insert, func
+
+import pytest
+from sqlalchemy import event, func, insert, select, text
 
 from zamboni import DBConnector, SQLHandler, TableCreator
 from zamboni.sport import Game
-from zamboni.sql.tables import Teams, Games, PredicterRegister, GamePredictions, LastTraining
-from zamboni.sql.sql_helpers import upsert
+from zamboni.sql.sql_helpers import upsert, upsert_many
+from zamboni.sql.tables import (
+    GamePredictions,
+    Games,
+    GamesHistoryView,
+    GamesPrevSameOppView,
+    LastTraining,
+    PredicterRegister,
+    TeamGameHistory,
+    Teams,
+)
 
 
 @pytest.fixture
@@ -30,7 +40,7 @@ def test_db(tmp_path):
 
     yield db_con
 
-    db_con.dispose()
+    db_connector.close()
     if os.path.exists(test_db_path):
         os.remove(test_db_path)
 
@@ -40,6 +50,7 @@ def sql_handler(test_db):
     """Create a SQLHandler instance with test database."""
     handler = SQLHandler(engine=test_db)
     yield handler
+    handler.close()
 
 def insert_test_team(sql_handler):
     stmt = insert(Teams).values(name="Test Team", nameAbbrev="TT", conferenceAbbrev="E", divisionAbbrev="A")
@@ -471,3 +482,641 @@ class TestRecordCreation:
             out = conn.execute(select_stmt)
         out = out.fetchone()[0]
         assert out == 1
+
+
+class TestBulkGameLoad:
+    """Tests for loading game files with SQLHandler.load_games_to_db."""
+
+    completed_lines = (
+        "2024020001, 20242025, 6, BOS, 9, OTT, 2024-10-08, 282, 2024, 23:00:00, 3, 2, 2, REG\n",
+        "2024020002, 20242025, 9, OTT, 6, BOS, 2024-10-10, 284, 2024, 23:00:00, 1, 2, 2, OT\n",
+    )
+    today_lines = (
+        "2024020003, 20242025, 6, BOS, 10, TOR, 2024-10-12, 286, 2024, 23:00:00, , , 2, \n",
+    )
+
+    def write_files(self, tmp_path, completed, today):
+        (tmp_path / "games_completed.txt").write_text("".join(completed))
+        (tmp_path / "games_today.txt").write_text("".join(today))
+        (tmp_path / "games_all.txt").write_text("".join([*completed, *today]))
+
+    def games(self, sql_handler):
+        stmt = select(
+            Games.apiID, Games.outcome, Games.inOT, Games.homeTeamPointsAwarded
+        ).order_by(Games.apiID)
+        with sql_handler.engine.connect() as conn:
+            return conn.execute(stmt).all()
+
+    def test_load_inserts_new_games(self, sql_handler, tmp_path):
+        """Test that games, seasons and teams are created in one load."""
+        self.write_files(tmp_path, self.completed_lines, self.today_lines)
+        sql_handler.txt_dir = tmp_path
+        sql_handler.load_games_to_db()
+
+        assert self.games(sql_handler) == [
+            (2024020001, 1, False, 2),
+            (2024020002, 0, True, 1),
+            (2024020003, -1, None, 0),
+        ]
+        assert sql_handler.team_ids([]).keys() == {"BOS", "OTT", "TOR"}
+        assert list(sql_handler.season_ids([]).keys()) == [20242025]
+
+    def test_reload_updates_finished_games(self, sql_handler, tmp_path):
+        """Test that a reload updates games that finished and inserts nothing twice."""
+        self.write_files(tmp_path, self.completed_lines, self.today_lines)
+        sql_handler.txt_dir = tmp_path
+        sql_handler.load_games_to_db()
+
+        finished = "2024020003, 20242025, 6, BOS, 10, TOR, 2024-10-12, 286, 2024, 23:00:00, 2, 4, 2, SO\n"
+        self.write_files(tmp_path, [*self.completed_lines, finished], [])
+        sql_handler.load_games_to_db()
+
+        assert self.games(sql_handler)[-1] == (2024020003, 0, True, 1)
+        assert len(self.games(sql_handler)) == 3
+
+    def write_landing(self, tmp_path, completed, today):
+        from datetime import time
+
+        from zamboni.landing import ParquetGameWriter
+
+        def record(line):
+            fields = [field.strip() for field in line.split(",")]
+            return {
+                "apiID": int(fields[0]),
+                "seasonID": int(fields[1]),
+                "homeTeamApiID": int(fields[2]),
+                "homeAbbrev": fields[3],
+                "awayTeamApiID": int(fields[4]),
+                "awayAbbrev": fields[5],
+                "datePlayed": date.fromisoformat(fields[6]),
+                "dayOfYrPlayed": int(fields[7]),
+                "yrPlayed": int(fields[8]),
+                "timePlayed": time.fromisoformat(fields[9]),
+                "homeTeamGoals": int(fields[10]) if fields[10] else None,
+                "awayTeamGoals": int(fields[11]) if fields[11] else None,
+                "gameTypeID": int(fields[12]),
+                "lastPeriodType": fields[13] or None,
+            }
+
+        for name, lines in (
+            ("games_completed", completed),
+            ("games_today", today),
+            ("games_all", [*completed, *today]),
+        ):
+            with ParquetGameWriter(str(tmp_path / name)) as writer:
+                for line in lines:
+                    writer.append(record(line))
+
+    def test_parquet_load_matches_txt(self, sql_handler, tmp_path):
+        """Test that loading the Arrow landing dataset writes the same rows as the text files."""
+        txt_dir = tmp_path / "txt"
+        txt_dir.mkdir()
+        self.write_files(txt_dir, self.completed_lines, self.today_lines)
+        sql_handler.txt_dir = txt_dir
+        sql_handler.load_games_to_db()
+
+        parquet_dir = tmp_path / "parquet"
+        self.write_landing(parquet_dir, self.completed_lines, self.today_lines)
+        parquet_uri = f"sqlite:///{tmp_path}/parquet.db"
+        parquet_engine = DBConnector(parquet_uri).connect_db()
+        TableCreator(parquet_engine).create_tables()
+        parquet_handler = SQLHandler(txt_dir=parquet_dir, engine=parquet_engine)
+        parquet_handler.load_games_to_db(landing_format="parquet")
+
+        stmt = select(Games.__table__).order_by(Games.apiID)
+        with sql_handler.engine.connect() as conn:
+            txt_rows = conn.execute(stmt).all()
+        with parquet_engine.connect() as conn:
+            parquet_rows = conn.execute(stmt).all()
+        DBConnector(parquet_uri).close()
+        assert len(txt_rows) == 3
+        assert parquet_rows == txt_rows
+
+
+class TestPostgresCopy:
+    """Tests for the PostgreSQL COPY loading path that do not need a server."""
+
+    def test_row_stream_writes_csv(self):
+        """Test that rows are streamed as CSV with unquoted empty fields only for NULLs."""
+        from zamboni.sql.pg_copy import RowStream
+
+        rows = [{"a": 1, "b": None, "c": 'x,"y"'}, {"a": 2, "b": True, "c": ""}]
+        stream = RowStream(rows, ["a", "b", "c"])
+        assert stream.read(4) + stream.read() == '1,,"x,""y"""\n2,True,""\n'
+        assert stream.read() == ""
+
+    def test_roster_entries_merge_dedupes(self):
+        """Test that duplicate staged roster entries are inserted once."""
+        from sqlalchemy.dialects import postgresql
+
+        from zamboni.sql.pg_copy import roster_entries_merge_statement
+
+        sql = str(roster_entries_merge_statement().compile(dialect=postgresql.dialect()))
+        assert 'SELECT DISTINCT ON ("rosterEntries_staging"."apiID", teams.id, ' in sql
+
+    def test_games_merge_statement(self):
+        """Test that finished games are only updated when the stored game is unfinished."""
+        from sqlalchemy.dialects import postgresql
+
+        from zamboni.sql.pg_copy import games_merge_statement
+
+        sql = str(games_merge_statement().compile(dialect=postgresql.dialect()))
+        assert 'ON CONFLICT ("apiID") DO UPDATE' in sql
+        assert "games.outcome IS NULL" in sql
+
+        sql = str(
+            games_merge_statement(update_finished=False).compile(
+                dialect=postgresql.dialect()
+            )
+        )
+        assert 'ON CONFLICT ("apiID") DO NOTHING' in sql
+
+    def test_staging_tables_are_session_local(self):
+        """Test that staging tables are temporary and dropped with the load's transaction."""
+        from sqlalchemy.dialects import postgresql
+        from sqlalchemy.schema import CreateTable
+
+        from zamboni.sql.pg_copy import games_staging
+
+        sql = str(
+            CreateTable(games_staging, if_not_exists=True).compile(
+                dialect=postgresql.dialect()
+            )
+        )
+        assert sql.strip().startswith("CREATE TEMPORARY TABLE IF NOT EXISTS games_staging")
+        assert sql.strip().endswith("ON COMMIT DROP")
+
+
+class TestUpsertMany:
+    """Tests for the upsert_many() helper and batched prediction recording."""
+
+    def test_upsert_many_inserts_and_updates(self, sql_handler):
+        """Test that existing rows are updated and new rows inserted across chunks."""
+        rows = [
+            {
+                "gameID": game_id,
+                "predicterID": 1,
+                "prediction": 0.25,
+                "predictionBinary": 0,
+                "predictionDate": date.today(),
+            }
+            for game_id in range(5)
+        ]
+        upsert_many(
+            sql_handler.engine, GamePredictions.__table__, rows[:3], ["gameID", "predicterID"]
+        )
+        for row in rows:
+            row["prediction"] = 0.75
+        written = upsert_many(
+            sql_handler.engine,
+            GamePredictions.__table__,
+            rows,
+            ["gameID", "predicterID"],
+            chunk_size=2,
+        )
+
+        stmt = select(GamePredictions.gameID, GamePredictions.prediction)
+        with sql_handler.engine.connect() as conn:
+            results = conn.execute(stmt.order_by(GamePredictions.gameID)).all()
+        assert written == 5
+        assert results == [(game_id, 0.75) for game_id in range(5)]
+
+    def test_upsert_many_bound_parameter_limit(self, sql_handler, monkeypatch):
+        """Test that chunks are sized so no statement exceeds the bound parameter limit."""
+        from zamboni.sql import sql_helpers
+
+        monkeypatch.setitem(sql_helpers.max_bound_parameters, "sqlite", 12)
+        statements = []
+
+        def count_parameters(conn, cursor, statement, parameters, context, executemany):
+            statements.append(len(parameters))
+
+        event.listen(sql_handler.engine, "before_cursor_execute", count_parameters)
+        try:
+            rows = [
+                {
+                    "gameID": game_id,
+                    "predicterID": 1,
+                    "prediction": 0.5,
+                    "predictionBinary": 1,
+                    "predictionDate": date.today(),
+                }
+                for game_id in range(5)
+            ]
+            upsert_many(
+                sql_handler.engine, GamePredictions.__table__, rows, ["gameID", "predicterID"]
+            )
+        finally:
+            event.remove(sql_handler.engine, "before_cursor_execute", count_parameters)
+        assert statements == [10, 10, 5]
+
+    def test_record_game_predictions(self, sql_handler):
+        """Test recording a whole predicter run from a DataFrame."""
+        import pandas as pd
+
+        games = pd.DataFrame({"id": [200, 201], "preds": [0.4, 0.9]})
+        sql_handler.record_game_predictions(3, games)
+
+        stmt = select(
+            GamePredictions.gameID, GamePredictions.predictionBinary
+        ).where(GamePredictions.predicterID == 3)
+        with sql_handler.engine.connect() as conn:
+            results = conn.execute(stmt.order_by(GamePredictions.gameID)).all()
+        assert results == [(200, False), (201, True)]
+
+
+class TestTeamGameHistory:
+    """Tests for the incrementally maintained team_game_history table."""
+
+    lines = (
+        # apiID, season, home, away, date, goals and last period of each game
+        ("1", "20242025", "BOS", "OTT", "2024-10-08", "3", "2", "REG"),
+        ("2", "20242025", "OTT", "TOR", "2024-10-09", "1", "2", "OT"),
+        ("3", "20242025", "TOR", "BOS", "2024-10-10", "4", "1", "REG"),
+        ("4", "20242025", "OTT", "BOS", "2024-10-12", "2", "5", "SO"),
+        ("5", "20242025", "BOS", "TOR", "2024-10-14", "", "", ""),
+        ("6", "20232024", "BOS", "OTT", "2024-04-01", "1", "0", "REG"),
+    )
+
+    def games(self, lines):
+        return [
+            Game.from_csv_line(
+                f"{api_id}, {season}, 0, {home}, 0, {away}, {date_played}, 1, 2024, "
+                f"19:00:00, {home_goals}, {away_goals}, 2, {last_period}"
+            )
+            for api_id, season, home, away, date_played, home_goals, away_goals, last_period in lines
+        ]
+
+    def history(self, sql_handler):
+        stmt = select(
+            TeamGameHistory.gameID,
+            TeamGameHistory.teamID,
+            TeamGameHistory.prevWonNum,
+            TeamGameHistory.prevNum,
+            TeamGameHistory.prevWonPercentage,
+            TeamGameHistory.prevGoalsPerGame,
+            TeamGameHistory.prevOppGoalsPerGame,
+            TeamGameHistory.pointsToDate,
+        ).order_by(TeamGameHistory.gameID, TeamGameHistory.teamID)
+        with sql_handler.engine.connect() as conn:
+            return conn.execute(stmt).all()
+
+    def view_history(self, sql_handler):
+        stmt = select(
+            GamesHistoryView.gameID,
+            GamesHistoryView.teamID,
+            GamesHistoryView.prevWonNum,
+            GamesHistoryView.prevNum,
+            GamesHistoryView.prevWonPercentage,
+            GamesHistoryView.prevGoalsPerGame,
+            GamesHistoryView.prevOppGoalsPerGame,
+            GamesHistoryView.pointsToDate,
+        ).order_by(GamesHistoryView.gameID, GamesHistoryView.teamID)
+        with sql_handler.engine.connect() as conn:
+            return conn.execute(stmt).all()
+
+    def test_history_matches_views(self, sql_handler):
+        """Test that the table holds the same values as the games_history view."""
+        sql_handler.load_games(self.games(self.lines))
+
+        assert self.history(sql_handler) == self.view_history(sql_handler)
+        with sql_handler.engine.connect() as conn:
+            matchups = dict(
+                conn.execute(
+                    select(TeamGameHistory.gameID, TeamGameHistory.prevMatchupGameID)
+                    .where(TeamGameHistory.prevMatchupGameID.is_not(None))
+                    .distinct()
+                ).all()
+            )
+            view_matchups = dict(
+                conn.execute(
+                    select(GamesPrevSameOppView.gameID, GamesPrevSameOppView.prevGameID)
+                ).all()
+            )
+        assert matchups == view_matchups == {4: 1, 5: 3}
+
+    def test_games_without_type_have_no_previous_games(self, sql_handler):
+        """Test that games with a NULL gameTypeID are not matched to each other, as in the views."""
+        games = self.games(self.lines)
+        for game in games[:4]:
+            game.game_type = None
+        sql_handler.load_games(games)
+
+        with sql_handler.engine.connect() as conn:
+            matchups = dict(
+                conn.execute(
+                    select(TeamGameHistory.gameID, TeamGameHistory.prevMatchupGameID)
+                    .where(TeamGameHistory.prevMatchupGameID.is_not(None))
+                    .distinct()
+                ).all()
+            )
+            prev_nums = conn.execute(
+                select(TeamGameHistory.prevNum).where(TeamGameHistory.gameID <= 4)
+            ).scalars().all()
+        assert matchups == {}
+        assert set(prev_nums) == {0}
+        assert self.history(sql_handler) == self.view_history(sql_handler)
+
+    def test_incremental_update_matches_rebuild(self, sql_handler):
+        """Test that loading games in steps gives the same history as one load."""
+        sql_handler.load_games(self.games(self.lines[:2]))
+        sql_handler.load_games(self.games(self.lines[2:]))
+        finished = ("5", "20242025", "BOS", "TOR", "2024-10-14", "3", "2", "REG")
+        sql_handler.load_games(self.games([finished]))
+        incremental = self.history(sql_handler)
+
+        with sql_handler.engine.begin() as conn:
+            conn.execute(TeamGameHistory.__table__.delete())
+        sql_handler.backfill_team_game_history()
+
+        assert incremental == self.history(sql_handler)
+        assert incremental == self.view_history(sql_handler)
+
+
+class TestWindowViews:
+    """Tests that the window function views match the self-join views."""
+
+    def test_views_match_self_join_versions(self, sql_handler):
+        """Test games_history and games_prev_same_opp against the original definitions."""
+        from zamboni.sql.view_statements import view_select
+
+        games = TestTeamGameHistory().games(TestTeamGameHistory.lines)
+        for game in games[1:3]:
+            game.game_type = None
+        sql_handler.load_games(games)
+
+        order_by = {
+            "games_history": '"gameID", "teamID"',
+            "games_prev_same_opp": '"gameID"',
+        }
+        with sql_handler.engine.connect() as conn:
+            for view_name, columns in order_by.items():
+                self_join = view_select(view_name, "sqlite", window_functions=False)
+                self_join = self_join.strip()[len("AS"):]
+                expected = conn.execute(
+                    text(f"SELECT * FROM ({self_join}) ORDER BY {columns}")
+                ).all()
+                window = conn.execute(
+                    text(f"SELECT * FROM {view_name} ORDER BY {columns}")
+                ).all()
+                assert window == expected
+                assert len(window) > 0
+
+
+class TestViewCreation:
+    """Tests that views are only recreated when their definition changed."""
+
+    def test_unchanged_views_are_kept(self, test_db):
+        """Test that create_tables leaves views with the current definition alone."""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(test_db, "before_cursor_execute", record)
+        try:
+            TableCreator(test_db).create_tables()
+        finally:
+            event.remove(test_db, "before_cursor_execute", record)
+        assert not [stmt for stmt in statements if "VIEW" in stmt]
+
+    def test_changed_views_are_recreated(self, test_db):
+        """Test that a stale view and the views after it are recreated."""
+        with test_db.begin() as conn:
+            conn.execute(text("DROP VIEW games_history"))
+            conn.execute(text("DROP VIEW games_prev_same_opp"))
+            conn.execute(
+                text('CREATE VIEW games_prev_same_opp AS SELECT 1 AS "gameID"')
+            )
+        table_creator = TableCreator(test_db)
+        assert not table_creator.view_is_current("games_prev_same_opp")
+        table_creator.create_tables()
+        for view_name in ["games_prev_same_opp", "games_history"]:
+            assert table_creator.view_is_current(view_name)
+
+
+class TestIndexes:
+    """Tests for the indexes declared on the models."""
+
+    def test_missing_indexes_are_created(self, test_db):
+        """Test that create_tables adds indexes to tables created without them."""
+        from sqlalchemy import inspect
+
+        with test_db.begin() as conn:
+            conn.execute(text('DROP INDEX "uq_games_apiID"'))
+            conn.execute(text('DROP INDEX "ix_games_datePlayed"'))
+        TableCreator(test_db).create_tables()
+
+        indexes = {index["name"]: index for index in inspect(test_db).get_indexes("games")}
+        assert indexes["uq_games_apiID"]["unique"]
+        assert indexes["ix_games_datePlayed"]["column_names"] == ["datePlayed"]
+        assert indexes["ix_games_home_season_date"]["column_names"] == [
+            "homeTeamID",
+            "seasonID",
+            "datePlayed",
+        ]
+
+
+class TestDataVersion:
+    """Tests for detecting db changes made elsewhere."""
+
+    def test_version_changes_with_other_writes(self, sql_handler):
+        """Test that the version changes after a write from any other connection."""
+        import threading
+
+        version = sql_handler.data_version()
+        assert sql_handler.data_version() == version
+        insert_test_team(sql_handler)
+        changed = sql_handler.data_version()
+        assert changed != version
+
+        # The version connection is used from the API's threadpool
+        versions = []
+        thread = threading.Thread(target=lambda: versions.append(sql_handler.data_version()))
+        thread.start()
+        thread.join()
+        assert versions == [changed]
+
+    def test_version_reads_no_tables(self, sql_handler):
+        """Test that checking the version on SQLite does not scan the tables."""
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(sql_handler.engine, "before_cursor_execute", record)
+        try:
+            sql_handler.data_version()
+        finally:
+            event.remove(sql_handler.engine, "before_cursor_execute", record)
+        assert statements == ["PRAGMA data_version"]
+
+
+class TestChunkedQueries:
+    """Tests for streaming query results in chunks."""
+
+    def test_query_games_in_chunks(self, sql_handler):
+        """Test that chunks hold the same games as a full query."""
+        import pandas as pd
+
+        sql_handler.load_games(TestTeamGameHistory().games(TestTeamGameHistory.lines))
+        full = sql_handler.query_games()
+        chunks = list(sql_handler.query_games(chunksize=2))
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+        pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), full)
+
+        batches = list(sql_handler.query_games(chunksize=2, as_arrow=True))
+        assert sum(batch.num_rows for batch in batches) == len(full)
+        assert batches[0].schema == batches[-1].schema
+
+    def test_arrow_chunks_keep_column_types(self, sql_handler):
+        """Test that a column that is all NULL in the first chunk keeps its type."""
+        import pyarrow as pa
+
+        games = TestTeamGameHistory().games(TestTeamGameHistory.lines)
+        for game in games[:2]:
+            game.game_type = None
+        sql_handler.load_games(games)
+        stmt = select(Games.id, Games.gameTypeID, Games.datePlayed).order_by(Games.id)
+        batches = list(sql_handler.query_chunks(stmt, chunksize=2, as_arrow=True))
+        assert batches[0].column(1).null_count == 2
+        for batch in batches:
+            assert batch.schema.field("gameTypeID").type == pa.int64()
+            assert batch.schema.field("datePlayed").type == pa.date32()
+
+    def test_get_earliest_date_played(self, sql_handler):
+        """Test that the earliest date is taken from finished games."""
+        import pandas as pd
+
+        sql_handler.load_games(TestTeamGameHistory().games(TestTeamGameHistory.lines))
+        assert sql_handler.get_earliest_date_played() == pd.Timestamp("2024-04-01")
+
+
+class TestArrowReads:
+    """Tests for Arrow-native query results."""
+
+    def test_query_arrow_matches_pandas(self, sql_handler, monkeypatch):
+        """Test that native and fallback reads give the same typed table."""
+        import pyarrow as pa
+
+        from zamboni.sql import arrow_reader
+
+        sql_handler.load_games(TestTeamGameHistory().games(TestTeamGameHistory.lines))
+        table = sql_handler.query_games(as_arrow=True)
+        assert table.schema.field("datePlayed").type == pa.date32()
+        assert table.schema.field("inOT").type == pa.bool_()
+        assert table.column("id").to_pylist() == sql_handler.query_games()["id"].tolist()
+
+        monkeypatch.setattr(arrow_reader, "native_readers", [])
+        fallback = sql_handler.query_games(as_arrow=True)
+        assert fallback.equals(table)
+
+    def test_failing_native_reader_falls_back(self, sql_handler, monkeypatch, caplog):
+        """Test that a driver error at query time falls back to pandas with a warning."""
+        from zamboni.sql import arrow_reader
+
+        def failing_reader(engine, query_sql):
+            raise arrow_reader.NativeReadError("unsupported statement")
+
+        sql_handler.load_games(TestTeamGameHistory().games(TestTeamGameHistory.lines))
+        monkeypatch.setattr(arrow_reader, "native_readers", [])
+        expected = sql_handler.query_games(as_arrow=True)
+
+        monkeypatch.setattr(arrow_reader, "native_readers", [("failing", failing_reader)])
+        with caplog.at_level("WARNING", logger="zamboni.sql.arrow_reader"):
+            table = sql_handler.query_games(as_arrow=True)
+        assert table.equals(expected)
+        assert "Reading with failing failed" in caplog.text
+
+    def test_unexpected_reader_error_is_raised(self, sql_handler, monkeypatch):
+        """Test that errors other than driver errors are not swallowed."""
+        from zamboni.sql import arrow_reader
+
+        def broken_reader(engine, query_sql):
+            raise KeyError("bug in reader")
+
+        monkeypatch.setattr(arrow_reader, "native_readers", [("broken", broken_reader)])
+        with pytest.raises(KeyError):
+            sql_handler.query_games(as_arrow=True)
+
+    def test_export_games(self, sql_handler, tmp_path):
+        """Test that Exporter writes the queried games to Parquet."""
+        import pyarrow.parquet as pq
+
+        from zamboni.exporter import Exporter
+
+        sql_handler.load_games(TestTeamGameHistory().games(TestTeamGameHistory.lines))
+        dest = tmp_path / "games.parquet"
+        Exporter(sql_handler.engine, sql_handler).export_games(dest=dest)
+        assert pq.read_table(dest).num_rows == len(sql_handler.query_games())
+
+    def test_export_sql(self, sql_handler, tmp_path):
+        """Test that Exporter writes the result of arbitrary SQL to Parquet."""
+        import pyarrow.parquet as pq
+
+        from zamboni.exporter import Exporter
+
+        sql_handler.load_games(TestTeamGameHistory().games(TestTeamGameHistory.lines))
+        dest = tmp_path / "games.parquet"
+        Exporter(sql_handler.engine, sql_handler).export(
+            "SELECT homeTeamID, awayTeamID, outcome FROM games", dest
+        )
+        assert pq.read_table(dest).column_names == ["homeTeamID", "awayTeamID", "outcome"]
+
+
+class TestDBConnector:
+    """Tests for the engine registry in DBConnector."""
+
+    def test_engine_is_cached_per_uri(self, tmp_path):
+        """Test that connectors for the same URI share one engine."""
+        uri = f"sqlite:///{tmp_path}/cached.db"
+        engine = DBConnector(uri).connect_db()
+        assert DBConnector(uri).connect_db() is engine
+        assert DBConnector(f"sqlite:///{tmp_path}/other.db").connect_db() is not engine
+
+        DBConnector(uri).close()
+        assert DBConnector(uri).connect_db() is not engine
+
+    def test_differing_settings_warn(self, tmp_path, caplog):
+        """Test that reusing an engine created with other pool settings logs a warning."""
+        uri = f"sqlite:///{tmp_path}/settings.db"
+        engine = DBConnector(uri).connect_db()
+        with caplog.at_level("WARNING", logger="zamboni.db_con"):
+            assert DBConnector(uri).connect_db() is engine
+            assert caplog.text == ""
+            assert DBConnector(uri, pool_size=20).connect_db() is engine
+        assert "'pool_size': 20" in caplog.text
+        DBConnector(uri).close()
+
+    def test_sqlite_pragmas(self, test_db):
+        """Test that SQLite file connections get the tuned pragmas."""
+        with test_db.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+            assert connection.exec_driver_sql("PRAGMA cache_size").scalar() == -65536
+
+    def test_checkpoint_empties_wal(self, tmp_path):
+        """Test that checkpointing leaves every commit in the db file."""
+        import sqlite3
+
+        uri = f"sqlite:///{tmp_path}/wal.db"
+        connector = DBConnector(uri)
+        with connector.connect_db().begin() as connection:
+            connection.execute(text("CREATE TABLE t (x INTEGER)"))
+            connection.execute(text("INSERT INTO t VALUES (1)"))
+        assert os.path.getsize(tmp_path / "wal.db-wal") > 0
+
+        assert connector.checkpoint()
+        assert os.path.getsize(tmp_path / "wal.db-wal") == 0
+        # A copy of the db file alone holds the table
+        (tmp_path / "copy.db").write_bytes((tmp_path / "wal.db").read_bytes())
+        copy = sqlite3.connect(tmp_path / "copy.db")
+        assert copy.execute("SELECT x FROM t").fetchall() == [(1,)]
+        copy.close()
+        connector.close()
+
+    def test_memory_db(self):
+        """Test that in-memory SQLite still connects without pool sizing."""
+        engine = DBConnector("sqlite://").connect_db()
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql("SELECT 1").scalar() == 1